@@ -0,0 +1,195 @@
+"""
+批量分析 - 基于清单文件并发分析多个项目
+
+清单文件每行一个项目路径，空行和以 # 开头的行会被忽略。
+每个项目在独立进程中运行 ImportAnalyzer，报告写入各自的目录，
+所有项目的第三方依赖汇总后只解析、获取一次。
+"""
+
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import fileprocess
+from vibehacks.analyzer import ImportAnalyzer
+from vibehacks.reporter import AnalysisReporter
+
+
+def read_manifest(manifest_path):
+    """
+    读取清单文件中的项目路径
+
+    Args:
+        manifest_path (str): 清单文件路径
+
+    Returns:
+        list: 去重后的项目路径列表
+    """
+    projects = []
+    seen = set()
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            key = os.path.abspath(line)
+            if key not in seen:
+                seen.add(key)
+                projects.append(line)
+    return projects
+
+
+def _analyze_project(project_path):
+    """在子进程中分析单个项目"""
+    analyzer = ImportAnalyzer(project_path, verbose=False)
+    imports_data, usage_data = analyzer.analyze_project()
+    return imports_data, usage_data
+
+
+def _project_dir_names(projects):
+    """为每个项目生成唯一的输出目录名"""
+    names = {}
+    used = defaultdict(int)
+    for project_path in projects:
+        base = Path(project_path).resolve().name or "project"
+        used[base] += 1
+        names[project_path] = base if used[base] == 1 else f"{base}_{used[base]}"
+    return names
+
+
+def analyze_projects(projects, max_workers=None):
+    """
+    使用进程池并发分析多个项目
+
+    Args:
+        projects (list): 项目路径列表
+        max_workers (int, optional): 最大进程数，默认为CPU核数
+
+    Returns:
+        dict: 项目路径 -> (imports_data, usage_data)，分析失败的项目不包含在内
+    """
+    results = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            project_path: executor.submit(_analyze_project, project_path)
+            for project_path in projects
+        }
+        for project_path, future in futures.items():
+            try:
+                results[project_path] = future.result()
+                print(f"  ✓ {project_path}")
+            except Exception as e:
+                print(f"  ⚠ {project_path} 分析失败: {e}")
+    return results
+
+
+def aggregate_dependencies(results):
+    """
+    汇总所有项目的第三方依赖
+
+    Args:
+        results (dict): analyze_projects 的返回值
+
+    Returns:
+        dict: 包名 -> {"projects": 使用该包的项目列表, "total_usage": 总使用次数}
+    """
+    aggregate = defaultdict(lambda: {"projects": [], "total_usage": 0})
+    for project_path, (imports_data, usage_data) in results.items():
+        for package in imports_data:
+            aggregate[package]["projects"].append(project_path)
+            aggregate[package]["total_usage"] += usage_data.get(package, {}).get(
+                "total_usage", 0
+            )
+    return dict(aggregate)
+
+
+def export_aggregate_summary(aggregate, project_count, output_file):
+    """
+    导出跨项目依赖汇总报告
+
+    Args:
+        aggregate (dict): aggregate_dependencies 的返回值
+        project_count (int): 成功分析的项目数
+        output_file (str): 输出的Markdown文件路径
+
+    Returns:
+        str: 报告内容
+    """
+    sorted_packages = sorted(
+        aggregate.items(),
+        key=lambda x: (len(x[1]["projects"]), x[1]["total_usage"]),
+        reverse=True,
+    )
+
+    lines = [
+        "# 跨项目第三方依赖汇总报告",
+        "",
+        "## 📊 总体统计",
+        "",
+        "| 指标 | 数量 |",
+        "|------|------|",
+        f"| 分析项目数 | {project_count} |",
+        f"| 不重复第三方包数 | {len(aggregate)} |",
+        "",
+        "## 📦 依赖使用情况",
+        "",
+        "| 包名 | 使用项目数 | 总使用次数 | 使用项目 |",
+        "|------|------------|------------|----------|",
+    ]
+    for package, data in sorted_packages:
+        projects = ", ".join(sorted(data["projects"]))
+        lines.append(
+            f"| {package} | {len(data['projects'])} | {data['total_usage']} | {projects} |"
+        )
+
+    content = "\n".join(lines) + "\n"
+    with open(output_file, "w", encoding="utf-8") as f:
+        f.write(content)
+    return content
+
+
+async def run_batch(
+    manifest_path,
+    output_dir=os.path.join("output", "batch"),
+    max_workers=None,
+    ingest=True,
+):
+    """
+    批量分析清单中的所有项目，跳过交互式问卷
+
+    Args:
+        manifest_path (str): 清单文件路径
+        output_dir (str): 批量报告输出目录
+        max_workers (int, optional): 最大进程数
+        ingest (bool): 是否获取依赖仓库的上下文
+
+    Returns:
+        dict: 跨项目依赖汇总
+    """
+    projects = read_manifest(manifest_path)
+    print(f"  • 清单包含 {len(projects)} 个项目")
+
+    results = analyze_projects(projects, max_workers=max_workers)
+
+    # 每个项目的报告写入独立目录
+    os.makedirs(output_dir, exist_ok=True)
+    dir_names = _project_dir_names(list(results))
+    for project_path, (imports_data, usage_data) in results.items():
+        project_dir = os.path.join(output_dir, dir_names[project_path])
+        os.makedirs(project_dir, exist_ok=True)
+        reporter = AnalysisReporter(imports_data, usage_data)
+        reporter.export_to_markdown(os.path.join(project_dir, "report.md"))
+
+    aggregate = aggregate_dependencies(results)
+    summary_file = os.path.join(output_dir, "summary.md")
+    summary_content = export_aggregate_summary(aggregate, len(results), summary_file)
+    print(f"  • 跨项目依赖汇总: {summary_file}")
+
+    if ingest and aggregate:
+        # 所有项目共享一次依赖解析，每个依赖仓库只获取一次
+        github_links = fileprocess.resolve_github_links(summary_content)
+        print(f"  • 获取 {len(github_links)} 个依赖仓库上下文")
+        await fileprocess.get_all_repos_context(github_links)
+
+    return aggregate
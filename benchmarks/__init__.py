@@ -0,0 +1,3 @@
+"""
+VibehHacks 基准测试套件
+"""
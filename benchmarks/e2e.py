@@ -0,0 +1,129 @@
+"""
+端到端性能测试 - 在离线LLM替身与gitingest替身上运行完整 main.py 流程
+
+用法:
+    python -m benchmarks.e2e --latency 0.2 --jitter 0.05 --ingest-latency 0.5
+    python -m benchmarks.e2e --project /path/to/project --error-rate 0.1
+    python -m benchmarks.e2e --latency 0.2 --token-latency 0.005 --question-fanout 5
+    python -m benchmarks.e2e --latency 0.2 --question-bank /tmp/question_bank.db
+    python -m benchmarks.e2e --latency 0.2 --token-latency 0.005 --gap-parallel
+
+所有输出写入临时工作目录，运行结束后打印各阶段剖析表，
+从而在不依赖网络的情况下衡量编排开销、并发与缓存效果。
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from .stub_llm import StubLLMServer
+from .synthetic import generate_project
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def run(project=None, latency=0.0, jitter=0.0, error_rate=0.0, ingest_latency=0.0,
+        ingest_files=50, files=200, workdir=None, seed=0, token_latency=0.0, question_fanout=0,
+        question_bank=None, gap_parallel=False):
+    """
+    运行一次完整的离线端到端流程
+
+    Returns:
+        dict: 总耗时、LLM请求数和工作目录
+    """
+    server = StubLLMServer(latency=latency, jitter=jitter, error_rate=error_rate, seed=seed,
+                           token_latency=token_latency).start()
+    os.environ.update({
+        "BASE_URL": server.url, "API_KEY": "stub", "MODEL": "stub-model",
+        "QUESTION_FANOUT": str(question_fanout),
+        # 指定问题库文件时，多次运行共用其中的问题
+        "QUESTION_BANK": str(Path(question_bank).resolve()) if question_bank else "",
+        "GAP_PARALLEL": "1" if gap_parallel else "0",
+    })
+
+    workdir = Path(workdir or tempfile.mkdtemp(prefix="vibedock-e2e-"))
+    workdir.mkdir(parents=True, exist_ok=True)
+    if project is None:
+        project = workdir / "project"
+        generate_project(str(project), n_files=files, seed=seed)
+    project = str(Path(project).resolve())
+
+    answers_file = workdir / "answers.json"
+    answers_file.write_text(
+        json.dumps([{"user": "bench", "purpose": 1, "answers": [1] * 20}]), encoding="utf-8"
+    )
+
+    # 切换工作目录前固定仓库根路径，保证模块可导入
+    sys.path.insert(0, str(REPO_ROOT))
+    previous_cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        import html_report_generator
+        import main as vibedock_main
+
+        from . import fake_gitingest
+
+        fake_gitingest.install(latency=ingest_latency, files=ingest_files)
+        html_report_generator.webbrowser.open = lambda *args, **kwargs: True
+
+        start = time.perf_counter()
+        asyncio.run(vibedock_main.main(project, str(answers_file), profile=True))
+        elapsed = time.perf_counter() - start
+    finally:
+        os.chdir(previous_cwd)
+        server.stop()
+
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "llm_requests": server.request_count,
+        "workdir": str(workdir),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="VibeDock 离线端到端性能测试")
+    parser.add_argument("--project", type=str, help="要分析的项目，默认生成合成项目")
+    parser.add_argument("--files", type=int, default=200, help="合成项目的文件数")
+    parser.add_argument("--latency", type=float, default=0.0, help="LLM替身的固定延迟(秒)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="LLM替身的延迟抖动(秒)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="LLM替身的错误注入概率")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="LLM替身每个输出token的生成耗时(秒)")
+    parser.add_argument("--question-fanout", type=int, default=0,
+                        help="按使用次数最多的 N 个库并发生成问题（0 表示单次请求）")
+    parser.add_argument("--question-bank", type=str, help="问题库文件，多次运行时复用已生成的问题")
+    parser.add_argument("--gap-parallel", action="store_true", help="分两步并发生成差距报告")
+    parser.add_argument("--ingest-latency", type=float, default=0.0, help="gitingest替身的延迟(秒)")
+    parser.add_argument("--ingest-files", type=int, default=50, help="每个替身仓库的文件数")
+    parser.add_argument("--workdir", type=str, help="工作目录，默认使用临时目录")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    args = parser.parse_args(argv)
+
+    result = run(
+        project=args.project,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        ingest_latency=args.ingest_latency,
+        ingest_files=args.ingest_files,
+        files=args.files,
+        workdir=args.workdir,
+        seed=args.seed,
+        token_latency=args.token_latency,
+        question_fanout=args.question_fanout,
+        question_bank=args.question_bank,
+        gap_parallel=args.gap_parallel,
+    )
+    print(
+        f"\n端到端耗时 {result['elapsed_s']}s | LLM请求 {result['llm_requests']} 次 | "
+        f"工作目录 {result['workdir']}"
+    )
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+gitingest替身 - 不访问网络，按需生成格式一致的仓库摘要、目录树和内容
+
+    from benchmarks import fake_gitingest
+    fake_gitingest.install(latency=0.1, files=200)
+
+install 同时替换 gitingest.ingest 与流式导出的克隆步骤（INGEST_MODE=stream、
+INGEST_STORE=blobs 以及 gitingest 失败后的回退），端到端测试的任何路径都不会克隆真实仓库；
+流式导出与对象库本身照常运行。
+"""
+
+import os
+import time
+
+SEPARATOR = "=" * 48
+
+
+def _repo_name(source):
+    repo = source.rstrip("/").split("/")[-1]
+    return repo[:-4] if repo.endswith(".git") else repo
+
+
+def _fake_files(repo, files, file_size):
+    """替身仓库的 (路径, 内容) 列表"""
+    body = (f"def function(value):\n    return value  # {repo}\n" * (file_size // 40 + 1))[:file_size]
+    return [(f"src/{repo}/module_{i}.py", body) for i in range(files)]
+
+
+def make_fake_ingest(latency=0.0, files=50, file_size=2000):
+    """
+    构造与 gitingest.ingest 签名兼容的替身函数
+
+    Args:
+        latency: 每次获取的模拟网络延迟(秒)
+        files: 每个仓库生成的文件数
+        file_size: 每个文件的内容大小(字节)
+    """
+
+    def ingest(source, *args, **kwargs):
+        time.sleep(latency)
+        repo = _repo_name(source)
+        fake_files = _fake_files(repo, files, file_size)
+
+        summary = (
+            f"Repository: stub/{repo}\n"
+            f"Commit: {'0' * 40}\n"
+            f"Files analyzed: {files}\n\n"
+            f"Estimated tokens: {files * file_size // 4 / 1000:.1f}k"
+        )
+        tree = "Directory structure:\n" + "\n".join(f"    {path}" for path, _ in fake_files)
+        content = "".join(
+            f"{SEPARATOR}\nFILE: {path}\n{SEPARATOR}\n{body}\n\n" for path, body in fake_files
+        )
+        return summary, tree, content
+
+    return ingest
+
+
+def make_fake_clone(latency=0.0, files=50, file_size=2000):
+    """构造与 ingest_stream.clone_repository 签名兼容的替身，把替身仓库的文件写入 repo_dir"""
+
+    def clone_repository(source, repo_dir):
+        time.sleep(latency)
+        for path, body in _fake_files(_repo_name(source), files, file_size):
+            full_path = os.path.join(repo_dir, path)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            with open(full_path, "w", encoding="utf-8") as f:
+                f.write(body)
+
+    return clone_repository
+
+
+def install(latency=0.0, files=50, file_size=2000):
+    """用替身替换 fileprocess 中使用的 gitingest.ingest 与流式导出的克隆步骤"""
+    import fileprocess
+    import ingest_stream
+
+    fileprocess.ingest = make_fake_ingest(latency, files, file_size)
+    ingest_stream.clone_repository = make_fake_clone(latency, files, file_size)
+    return fileprocess.ingest
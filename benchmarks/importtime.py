@@ -0,0 +1,104 @@
+"""
+启动耗时回归检查 - 用 -X importtime 测量CLI与 main.py 的导入开销
+
+用法:
+    python -m benchmarks.importtime
+    python -m benchmarks.importtime --budget-ms 150 --repeat 5
+
+检查两点，任一失败时以非零状态码退出:
+1. 导入总耗时（多次运行取最小值）不超过预算
+2. 启动路径上没有导入重依赖（pandas、pyarrow、openai、gitingest）
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+FORBIDDEN_MODULES = ("pandas", "pyarrow", "openai", "gitingest")
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def parse_importtime(stderr):
+    """
+    解析 -X importtime 输出
+
+    Returns:
+        tuple: (顶层模块累计耗时之和(微秒), 已导入模块名集合)
+    """
+    total_us = 0
+    modules = set()
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative, indent, module = int(match.group(2)), match.group(3), match.group(4)
+        modules.add(module)
+        # 缩进为一个空格的是顶层导入，其累计耗时已包含子模块
+        if len(indent) == 1:
+            total_us += cumulative
+    return total_us, modules
+
+
+def measure_command(args, repeat=3):
+    """多次运行命令，返回最小导入耗时(毫秒)和导入的模块集合"""
+    best_us = None
+    modules = set()
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", *args],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"命令执行失败: {' '.join(args)}\n{result.stderr[-2000:]}")
+        total_us, imported = parse_importtime(result.stderr)
+        modules |= imported
+        best_us = total_us if best_us is None else min(best_us, total_us)
+    return best_us / 1000, modules
+
+
+def forbidden_imports(modules):
+    """返回启动路径上导入的重依赖"""
+    return sorted(
+        name for name in FORBIDDEN_MODULES
+        if any(module == name or module.startswith(name + ".") for module in modules)
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="VibeDock 启动耗时回归检查")
+    parser.add_argument("--budget-ms", type=float, default=200.0, help="CLI导入耗时预算(毫秒)")
+    parser.add_argument("--main-budget-ms", type=float, default=300.0, help="main.py导入耗时预算(毫秒)")
+    parser.add_argument("--repeat", type=int, default=3, help="每个命令的运行次数")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        Path(tmp, "app.py").write_text("import os\n\nos.path.join('a', 'b')\n", encoding="utf-8")
+        checks = [
+            ("vibehacks analyze", ["-m", "vibehacks.cli", "analyze", tmp, "--quiet"], args.budget_ms),
+            ("import main", ["-c", "import main"], args.main_budget_ms),
+        ]
+
+        failed = False
+        for label, command, budget in checks:
+            elapsed_ms, modules = measure_command(command, args.repeat)
+            heavy = forbidden_imports(modules)
+            ok = elapsed_ms <= budget and not heavy
+            failed |= not ok
+            status = "OK" if ok else "FAIL"
+            print(f"[{status}] {label}: {elapsed_ms:.1f} ms (预算 {budget:.0f} ms)")
+            if heavy:
+                print(f"       启动时导入了重依赖: {', '.join(heavy)}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
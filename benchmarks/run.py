@@ -0,0 +1,269 @@
+"""
+基准测试 - ImportAnalyzer 与 AnalysisReporter 的计时与内存场景
+
+用法:
+    python -m benchmarks.run --files 2000
+    python -m benchmarks.run --files 2000 --compare benchmarks/results/<commit>.json
+
+每个场景先重复计时（取最小值与中位数），再在 tracemalloc 下运行一次记录峰值内存。
+结果以JSON保存到 benchmarks/results/<commit>.json，便于跨提交比较回归。
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from vibehacks.analyzer import ImportAnalyzer
+from vibehacks.profiling import tracer
+from vibehacks.reporter import AnalysisReporter
+
+from .synthetic import generate_project, generate_results
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def measure(func, repeat=5):
+    """重复运行场景，返回耗时统计与峰值内存"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "min_ms": round(min(timings) * 1000, 3),
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+        "peak_kb": round(peak / 1024, 1),
+        "repeat": repeat,
+    }
+
+
+def _fresh_analyzer(project_root):
+    return ImportAnalyzer(str(project_root), verbose=False)
+
+
+def analyzer_scenarios(project_root):
+    """walk / parse / usage / merge / 完整分析 场景"""
+    analyzer = _fresh_analyzer(project_root)
+    files = analyzer.collect_python_files()
+    trees = [(path, analyzer.parse_file(path)) for path in files]
+    per_file = []
+    for path, tree in trees:
+        file_imports = analyzer.analyze_imports(path, tree)
+        file_usage = analyzer.analyze_usage(path, tree, file_imports)
+        per_file.append((str(path.relative_to(project_root)), file_imports, file_usage))
+
+    def walk():
+        _fresh_analyzer(project_root).collect_python_files()
+
+    def parse():
+        for path in files:
+            analyzer.parse_file(path)
+
+    def usage():
+        for path, tree in trees:
+            file_imports = analyzer.analyze_imports(path, tree)
+            analyzer.analyze_usage(path, tree, file_imports)
+
+    def merge():
+        merged = _fresh_analyzer(project_root)
+        for rel_path, file_imports, file_usage in per_file:
+            merged.merge_file_results(rel_path, file_imports, file_usage)
+        merged.update_total_usage()
+
+    def full():
+        _fresh_analyzer(project_root).analyze_project()
+
+    # 只关心一个包时的定向分析（字节预筛选后只解析候选文件）
+    target = next(iter(analyzer.analyze_project()[1]), None)
+
+    def prefilter():
+        analyzer.prefilter_files(files, [target])
+
+    def targeted():
+        ImportAnalyzer(str(project_root), verbose=False, packages=[target]).analyze_project()
+
+    return {
+        "walk": walk,
+        "parse": parse,
+        "usage": usage,
+        "merge": merge,
+        "analyze_project": full,
+        "prefilter": prefilter,
+        "analyze_targeted": targeted,
+    }
+
+
+def reporter_scenarios(imports_data, usage_data, output_dir):
+    """AnalysisReporter 每个 export_* 方法的场景"""
+    output_dir = Path(output_dir)
+
+    def reporter():
+        # 控制台输出写入内存，避免终端渲染干扰计时
+        instance = AnalysisReporter(imports_data, usage_data)
+        instance.console.file = io.StringIO()
+        return instance
+
+    scenarios = {}
+    for name in sorted(dir(AnalysisReporter)):
+        if not name.startswith("export_"):
+            continue
+        suffix = name[len("export_to_"):] if name.startswith("export_to_") else name[len("export_"):]
+        target = output_dir / suffix if suffix == "csv" else output_dir / f"report.{suffix}"
+        scenarios[name] = (
+            lambda name=name, target=target: getattr(reporter(), name)(str(target))
+        )
+    return scenarios
+
+
+def large_report_scenarios(imports_data, usage_data, output_dir):
+    """大规模分析结果上的报告场景：汇总、控制台渲染与各 export_* 方法"""
+
+    def reporter():
+        instance = AnalysisReporter(imports_data, usage_data)
+        instance.console.file = io.StringIO()
+        return instance
+
+    def summary_and_console():
+        # 同一个报告器依次渲染，汇总视图只计算一次
+        instance = reporter()
+        instance.generate_summary_report()
+        instance.print_detailed_report()
+        instance.print_package_details()
+
+    scenarios = {"large.render_all": summary_and_console}
+    for name, func in reporter_scenarios(imports_data, usage_data, output_dir).items():
+        scenarios[f"large.{name}"] = func
+    return scenarios
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(current, baseline_path):
+    """打印与基线结果的耗时对比"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    print(f"\n对比基线 {baseline.get('commit')} -> {current.get('commit')}")
+    for name, result in current["scenarios"].items():
+        old = baseline.get("scenarios", {}).get(name)
+        if not old:
+            print(f"  {name:<24} {result['min_ms']:>10.1f} ms   (新场景)")
+            continue
+        ratio = result["min_ms"] / old["min_ms"] if old["min_ms"] else float("inf")
+        print(
+            f"  {name:<24} {old['min_ms']:>10.1f} -> {result['min_ms']:>10.1f} ms   x{ratio:.2f}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="VibehHacks 基准测试")
+    parser.add_argument("--files", type=int, default=1000, help="合成项目的文件数")
+    parser.add_argument("--imports", type=int, default=5, help="每个文件的第三方导入数")
+    parser.add_argument("--alias-ratio", type=float, default=0.3, help="别名导入比例")
+    parser.add_argument("--attr-uses", type=int, default=4, help="每个导入的属性访问次数")
+    parser.add_argument("--depth", type=int, default=3, help="目录嵌套深度")
+    parser.add_argument("--repeat", type=int, default=5, help="每个场景的重复次数")
+    parser.add_argument("--report-packages", type=int, default=0,
+                        help="大规模报告场景的包数（如10000），0表示跳过")
+    parser.add_argument("--report-symbols", type=int, default=1_000_000,
+                        help="大规模报告场景的符号总数")
+    parser.add_argument("--only", action="append", help="只运行指定场景，可多次指定")
+    parser.add_argument("--output", type=str, help="结果JSON路径，默认为 benchmarks/results/<commit>.json")
+    parser.add_argument("--compare", type=str, help="与指定的基线结果JSON比较")
+    args = parser.parse_args(argv)
+
+    # 基准测试自行计时，关闭全局tracer避免区间累积影响耗时与内存
+    tracer.enabled = False
+
+    with tempfile.TemporaryDirectory(prefix="vibehacks-bench-") as tmp:
+        project_root = Path(tmp) / "project"
+        generate_project(
+            str(project_root),
+            n_files=args.files,
+            imports_per_file=args.imports,
+            alias_ratio=args.alias_ratio,
+            attr_uses_per_import=args.attr_uses,
+            depth=args.depth,
+        )
+
+        scenarios = analyzer_scenarios(project_root)
+        imports_data, usage_data = _fresh_analyzer(project_root).analyze_project()
+        export_dir = Path(tmp) / "exports"
+        export_dir.mkdir()
+        scenarios.update(reporter_scenarios(imports_data, usage_data, export_dir))
+
+        if args.report_packages:
+            large_dir = Path(tmp) / "large_exports"
+            large_dir.mkdir()
+            large_imports, large_usage = generate_results(
+                args.report_packages, args.report_symbols
+            )
+            scenarios.update(large_report_scenarios(large_imports, large_usage, large_dir))
+
+        results = {}
+        for name, func in scenarios.items():
+            if args.only and name not in args.only:
+                continue
+            with contextlib.redirect_stdout(io.StringIO()):
+                results[name] = measure(func, args.repeat)
+            print(
+                f"  {name:<24} min {results[name]['min_ms']:>10.1f} ms   "
+                f"median {results[name]['median_ms']:>10.1f} ms   "
+                f"peak {results[name]['peak_kb']:>10.1f} KB"
+            )
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "params": {
+            "files": args.files,
+            "imports": args.imports,
+            "alias_ratio": args.alias_ratio,
+            "attr_uses": args.attr_uses,
+            "depth": args.depth,
+            "report_packages": args.report_packages,
+            "report_symbols": args.report_symbols,
+        },
+        "scenarios": results,
+    }
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{report['commit']}.json"
+    os.makedirs(output.parent, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n结果已保存: {output}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+"""
+离线LLM替身服务 - 兼容OpenAI chat-completions协议（含流式输出）
+
+根据提示词类型返回符合各阶段解析格式的固定XML/HTML:
+问题生成（含按库拆分的小请求）、差距分析（含分两步的领域列表与单个领域详情）、
+第三方库GitHub链接、HTML报告。
+可配置固定延迟、抖动、按输出token计的生成耗时和错误注入，用于可复现的端到端性能测试。
+
+用法:
+    python -m benchmarks.stub_llm --port 8765 --latency 0.2 --jitter 0.05 --error-rate 0.1
+    python -m benchmarks.stub_llm --port 8765 --latency 0.2 --token-latency 0.005
+    BASE_URL=http://127.0.0.1:8765/v1 API_KEY=stub MODEL=stub-model python main.py
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+QUESTIONS_XML = """<questions>
+{items}
+</questions>"""
+
+QUESTION_ITEM = """<question>
+<text>How do you typically use {library} {aspect}?</text>
+<category>{library}</category>
+<type>multiple_choice</type>
+<options>
+<option>I rely on its advanced APIs and know its performance pitfalls</option>
+<option>I use its common APIs regularly</option>
+<option>I have basic familiarity with it</option>
+<option>Other (please specify)</option>
+<option>Not familiar with this library</option>
+</options>
+</question>"""
+
+GAP_XML = """<gap_assessment>
+<summary>The user is comfortable with the core stack but lacks depth in {first}.</summary>
+<project_tech_stack>{libraries}</project_tech_stack>
+<gaps>
+{items}
+</gaps>
+</gap_assessment>"""
+
+GAP_ITEM = """<gap>
+<area>{library}</area>
+<priority>{priority}</priority>
+<current_level>Basic</current_level>
+<required_level>Intermediate</required_level>
+<description>The project uses {library} extensively, beyond the user's current experience.</description>
+<recommendation>Read the official {library} documentation and rebuild one module of this project with it.</recommendation>
+</gap>"""
+
+GAP_AREAS_XML = """<gap_areas>
+<summary>The user is comfortable with the core stack but lacks depth in {first}.</summary>
+<project_tech_stack>{libraries}</project_tech_stack>
+{items}
+</gap_areas>"""
+
+GAP_AREA_ITEM = """<gap>
+<area>{library}</area>
+<priority>{priority}</priority>
+<current_level>Basic</current_level>
+<required_level>Intermediate</required_level>
+</gap>"""
+
+GAP_DETAIL_XML = """<gap_detail>
+<description>The project uses {library} extensively, beyond the user's current experience.</description>
+<recommendation>Read the official {library} documentation and rebuild one module of this project with it.</recommendation>
+</gap_detail>"""
+
+LIBRARY_ITEM = """  <library>
+    <name>{library}</name>
+    <github_url>https://github.com/stub/{library}</github_url>
+    <description>Stub description for {library}</description>
+  </library>"""
+
+HTML_DOC = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head><meta charset="utf-8"><title>VibeDock 智能学习路径报告</title></head>
+<body><h1>VibeDock 智能学习路径报告</h1><p>离线替身服务生成</p></body>
+</html>"""
+
+QUESTION_ASPECTS = ["in production code", "when debugging failures", "on performance-sensitive paths"]
+
+_EXACT_COUNT = re.compile(r"Generate exactly (\d+) question")
+_TABLE_ROW = re.compile(r"^\|\s*(?:\d+\s*\|\s*)?([A-Za-z_][\w.-]*)\s*\|", re.MULTILINE)
+_GAP_AREA = re.compile(r"^Gap area:\s*(.+)$", re.MULTILINE)
+_HEADER_WORDS = {"指标", "排名", "包名", "函数名", "类名", "Rank", "Library"}
+
+
+def extract_libraries(prompt, limit=5):
+    """从提示词中的Markdown表格提取包名"""
+    libraries = []
+    for name in _TABLE_ROW.findall(prompt):
+        if name not in _HEADER_WORDS and name not in libraries:
+            libraries.append(name)
+        if len(libraries) >= limit:
+            break
+    return libraries or ["requests"]
+
+
+def canned_response(messages):
+    """根据提示词类型生成固定响应"""
+    prompt = "\n".join(str(m.get("content", "")) for m in messages)
+    libraries = extract_libraries(prompt)
+
+    if "<questions>" in prompt:
+        exact = _EXACT_COUNT.search(prompt)
+        if exact:
+            # 按库拆分的请求：针对第一个库生成指定数量、措辞不同的问题
+            aspects = [
+                QUESTION_ASPECTS[i % len(QUESTION_ASPECTS)] + (f" (#{i + 1})" if i >= len(QUESTION_ASPECTS) else "")
+                for i in range(int(exact.group(1)))
+            ]
+            return QUESTIONS_XML.format(
+                items="\n".join(QUESTION_ITEM.format(library=libraries[0], aspect=aspect) for aspect in aspects)
+            )
+        return QUESTIONS_XML.format(
+            items="\n".join(QUESTION_ITEM.format(library=lib, aspect=QUESTION_ASPECTS[0]) for lib in libraries)
+        )
+    priorities = ["HIGH", "MEDIUM", "LOW"]
+    if "<gap_areas>" in prompt:
+        items = "\n".join(
+            GAP_AREA_ITEM.format(library=lib, priority=priorities[i % 3])
+            for i, lib in enumerate(libraries)
+        )
+        return GAP_AREAS_XML.format(first=libraries[0], libraries=", ".join(libraries), items=items)
+    if "<gap_detail>" in prompt:
+        area = _GAP_AREA.search(prompt)
+        return GAP_DETAIL_XML.format(library=area.group(1).strip() if area else libraries[0])
+    if "<gap_assessment>" in prompt:
+        items = "\n".join(
+            GAP_ITEM.format(library=lib, priority=priorities[i % 3])
+            for i, lib in enumerate(libraries)
+        )
+        return GAP_XML.format(first=libraries[0], libraries=", ".join(libraries), items=items)
+    if "third_party_libraries" in prompt:
+        items = "\n".join(LIBRARY_ITEM.format(library=lib) for lib in libraries)
+        return f"```xml\n<third_party_libraries>\n{items}\n</third_party_libraries>\n```"
+    if "HTML" in prompt or "html" in prompt:
+        return HTML_DOC
+    return "OK"
+
+
+class StubLLMServer:
+    """在后台线程中运行的OpenAI兼容替身服务"""
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0,
+                 error_rate=0.0, seed=None, token_latency=0.0):
+        self.latency = latency
+        self.jitter = jitter
+        # 每个输出token的生成耗时：输出越长响应越慢，流式输出时按块逐步发送
+        self.token_latency = token_latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _next_delay_and_error(self):
+        with self._lock:
+            self.request_count += 1
+            delay = max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+            failed = self.random.random() < self.error_rate
+        return delay, failed
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.rstrip("/").endswith("/models"):
+                    self._send_json(200, {"object": "list", "data": [{"id": "stub-model", "object": "model"}]})
+                else:
+                    self._send_json(404, {"error": {"message": "not found"}})
+
+            def do_POST(self):
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send_json(404, {"error": {"message": "not found"}})
+                    return
+
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                delay, failed = server._next_delay_and_error()
+                time.sleep(delay)
+
+                if failed:
+                    self._send_json(500, {"error": {"message": "injected failure", "type": "server_error"}})
+                    return
+
+                messages = body.get("messages", [])
+                content = canned_response(messages)
+                model = body.get("model") or "stub-model"
+                prompt_tokens = sum(len(str(m.get("content", ""))) for m in messages) // 4
+                completion_tokens = len(content) // 4
+
+                if body.get("stream"):
+                    self._stream(model, content, prompt_tokens, completion_tokens)
+                else:
+                    time.sleep(completion_tokens * server.token_latency)
+                    self._send_json(200, {
+                        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": model,
+                        "choices": [{
+                            "index": 0,
+                            "message": {"role": "assistant", "content": content},
+                            "finish_reason": "stop",
+                        }],
+                        "usage": {
+                            "prompt_tokens": prompt_tokens,
+                            "completion_tokens": completion_tokens,
+                            "total_tokens": prompt_tokens + completion_tokens,
+                        },
+                    })
+
+            def _stream(self, model, content, prompt_tokens, completion_tokens):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+
+                completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+                created = int(time.time())
+
+                def chunk(delta, finish_reason=None, usage=None):
+                    data = {
+                        "id": completion_id,
+                        "object": "chat.completion.chunk",
+                        "created": created,
+                        "model": model,
+                        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                    }
+                    if usage:
+                        data["usage"] = usage
+                    self.wfile.write(f"data: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+
+                chunk({"role": "assistant", "content": ""})
+                for start in range(0, len(content), 64):
+                    time.sleep(len(content[start:start + 64]) // 4 * server.token_latency)
+                    chunk({"content": content[start:start + 64]})
+                chunk({}, "stop", {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                })
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+                self.close_connection = True
+
+            def _send_json(self, status, payload):
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="离线LLM替身服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="每个请求的固定延迟(秒)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="延迟的随机抖动范围(秒)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="返回500错误的概率")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="每个输出token的生成耗时(秒)")
+    parser.add_argument("--seed", type=int, default=None, help="随机种子")
+    args = parser.parse_args(argv)
+
+    server = StubLLMServer(args.host, args.port, args.latency, args.jitter, args.error_rate, args.seed,
+                           args.token_latency)
+    print(f"Stub LLM server listening on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
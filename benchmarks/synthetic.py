@@ -0,0 +1,157 @@
+"""
+合成项目生成器 - 为基准测试生成规模可控的Python项目
+
+生成的文件包含可配置密度的第三方导入、别名导入和属性访问，
+目录深度可调，并可附带 .venv、__pycache__ 等应被忽略的目录。
+"""
+
+import random
+from collections import Counter
+from pathlib import Path
+from typing import List
+
+THIRD_PARTY_PACKAGES = [
+    "requests", "numpy", "pandas", "rich", "click", "httpx", "pydantic",
+    "sqlalchemy", "flask", "django", "celery", "redis", "boto3", "yaml",
+    "jinja2", "attr", "toml", "tqdm", "scipy", "matplotlib",
+]
+
+SYMBOLS = [
+    "Client", "Session", "DataFrame", "Series", "Table", "Console", "Model",
+    "get", "post", "load", "dump", "read_csv", "array", "command", "option",
+    "connect", "execute", "render", "validate", "parse",
+]
+
+JUNK_DIRS = [".venv", "__pycache__", "build", "node_modules", ".tox"]
+
+
+def generate_project(
+    root: str,
+    n_files: int = 1000,
+    imports_per_file: int = 5,
+    alias_ratio: float = 0.3,
+    attr_uses_per_import: int = 4,
+    depth: int = 3,
+    junk_files: int = 50,
+    seed: int = 0,
+) -> List[Path]:
+    """
+    在 root 下生成合成项目
+
+    Args:
+        root: 输出目录
+        n_files: 需要分析的Python文件数
+        imports_per_file: 每个文件的第三方导入数
+        alias_ratio: 使用 `import x as y` 别名导入的比例
+        attr_uses_per_import: 每个导入的属性访问/调用次数
+        depth: 包目录的最大嵌套深度
+        junk_files: 写入忽略目录中的文件数（不应被分析）
+        seed: 随机种子，保证多次生成结果一致
+
+    Returns:
+        生成的待分析文件路径列表
+    """
+    rng = random.Random(seed)
+    root_path = Path(root)
+    root_path.mkdir(parents=True, exist_ok=True)
+
+    files = []
+    for i in range(n_files):
+        level = rng.randint(0, depth)
+        parts = [f"pkg{rng.randint(0, 9)}" for _ in range(level)]
+        directory = root_path.joinpath(*parts)
+        directory.mkdir(parents=True, exist_ok=True)
+        file_path = directory / f"module_{i}.py"
+        file_path.write_text(
+            _render_module(rng, imports_per_file, alias_ratio, attr_uses_per_import),
+            encoding="utf-8",
+        )
+        files.append(file_path)
+
+    for i in range(junk_files):
+        directory = root_path / rng.choice(JUNK_DIRS) / f"lib{i % 5}"
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / f"junk_{i}.py").write_text(
+            _render_module(rng, imports_per_file, alias_ratio, attr_uses_per_import),
+            encoding="utf-8",
+        )
+
+    return files
+
+
+def _render_module(rng, imports_per_file, alias_ratio, attr_uses_per_import) -> str:
+    lines = ["import os", "from typing import Any", ""]
+    body = []
+    packages = rng.sample(THIRD_PARTY_PACKAGES, min(imports_per_file, len(THIRD_PARTY_PACKAGES)))
+
+    for package in packages:
+        style = rng.random()
+        if style < alias_ratio:
+            alias = f"{package[:2]}_{rng.randint(0, 99)}"
+            lines.append(f"import {package} as {alias}")
+            names = [f"{alias}.{rng.choice(SYMBOLS)}" for _ in range(attr_uses_per_import)]
+        elif style < alias_ratio + (1 - alias_ratio) / 2:
+            lines.append(f"import {package}")
+            names = [f"{package}.{rng.choice(SYMBOLS)}" for _ in range(attr_uses_per_import)]
+        else:
+            symbols = rng.sample(SYMBOLS, 2)
+            lines.append(f"from {package}.core import {', '.join(symbols)}")
+            names = [rng.choice(symbols) for _ in range(attr_uses_per_import)]
+        body.extend(names)
+
+    lines.append("")
+    lines.append("")
+    lines.append("def run(value: Any) -> Any:")
+    for idx, name in enumerate(body):
+        lines.append(f"    result_{idx} = {name}(value, os.sep)")
+    lines.append("    return value")
+    lines.append("")
+    return "\n".join(lines)
+
+
+
+def generate_results(n_packages: int = 10_000, n_symbols: int = 1_000_000, seed: int = 0):
+    """
+    直接生成 ImportAnalyzer 格式的分析结果，用于报告生成器的大规模基准
+
+    Args:
+        n_packages: 包数量
+        n_symbols: 所有包的符号（函数/类）总数
+        seed: 随机种子
+
+    Returns:
+        (imports_data, usage_data)
+    """
+    rng = random.Random(seed)
+    per_package = max(1, n_symbols // n_packages)
+    imports_data = {}
+    usage_data = {}
+
+    for p in range(n_packages):
+        package = f"package_{p}"
+        functions = Counter()
+        classes = Counter()
+        for s in range(per_package):
+            if s % 3 == 0:
+                classes[f"Class{s}"] = rng.randint(1, 500)
+            else:
+                functions[f"func_{s}"] = rng.randint(1, 500)
+        modules = Counter({package: rng.randint(0, 50)})
+
+        imports_data[package] = {
+            "functions": set(functions),
+            "classes": set(classes),
+            "modules": {package},
+            "aliases": {package: package},
+            "files": {f"src/mod_{rng.randint(0, 999)}.py" for _ in range(3)},
+        }
+        usage_data[package] = {
+            "functions": functions,
+            "classes": classes,
+            "modules": modules,
+            "total_usage": sum(functions.values())
+            + sum(classes.values())
+            + sum(modules.values()),
+        }
+
+    return imports_data, usage_data
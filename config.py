@@ -0,0 +1,137 @@
+"""
+配置 - 只加载一次 .env，按需构建AI服务客户端
+"""
+
+import os
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def load_config():
+    """
+    加载 .env 并读取AI服务配置，整个进程只执行一次
+
+    Returns:
+        dict: api_key / base_url / model / default_max_tokens
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    return {
+        "api_key": os.getenv("API_KEY"),
+        "base_url": os.getenv("BASE_URL"),
+        "model": os.getenv("MODEL"),
+        "default_max_tokens": 4096,
+    }
+
+
+@lru_cache(maxsize=None)
+def get_client():
+    """首次使用时构建同步的OpenAI兼容客户端，之后复用同一个连接池"""
+    from openai import OpenAI
+
+    config = load_config()
+    return OpenAI(api_key=config["api_key"], base_url=config["base_url"])
+
+
+def create_async_client():
+    """构建异步的OpenAI兼容客户端（异步客户端绑定事件循环，由调用方持有）"""
+    from openai import AsyncOpenAI
+
+    config = load_config()
+    return AsyncOpenAI(base_url=config["base_url"], api_key=config["api_key"])
+
+
+def _split_globs(value):
+    return [pattern.strip() for pattern in (value or "").split(",") if pattern.strip()]
+
+
+@lru_cache(maxsize=None)
+def load_ingest_config():
+    """
+    读取依赖仓库导出的配置（同样来自 .env / 环境变量）
+
+    INGEST_MODE=gitingest（默认，失败时自动改用流式导出）或 stream；
+    INGEST_MAX_FILE_SIZE / INGEST_MAX_TOTAL_BYTES 为字节数；
+    INGEST_INCLUDE / INGEST_EXCLUDE 为逗号分隔的 glob；
+    INGEST_STORE=blobs 时文件按内容哈希存入 output/.blobs（总是使用流式导出）。
+
+    Returns:
+        dict: mode / max_file_size / max_total_bytes / include / exclude / store
+    """
+    from ingest_stream import DEFAULT_MAX_FILE_SIZE, DEFAULT_MAX_TOTAL_BYTES
+
+    load_config()
+    return {
+        "mode": os.getenv("INGEST_MODE", "gitingest").strip().lower(),
+        "max_file_size": int(os.getenv("INGEST_MAX_FILE_SIZE", DEFAULT_MAX_FILE_SIZE)),
+        "max_total_bytes": int(os.getenv("INGEST_MAX_TOTAL_BYTES", DEFAULT_MAX_TOTAL_BYTES)),
+        "include": _split_globs(os.getenv("INGEST_INCLUDE")),
+        "exclude": _split_globs(os.getenv("INGEST_EXCLUDE")),
+        "store": os.getenv("INGEST_STORE", "").strip().lower(),
+    }
+
+
+@lru_cache(maxsize=None)
+def load_retrieval_config():
+    """
+    读取提示词中依赖代码片段的配置
+
+    RETRIEVAL_MAX_TOKENS 为片段的 token 总预算（0 表示不附带依赖代码），
+    RETRIEVAL_TOP_K 为每个依赖最多取的片段数。
+
+    Returns:
+        dict: max_tokens / top_k
+    """
+    from vibehacks.retrieval import DEFAULT_MAX_TOKENS, DEFAULT_TOP_K
+
+    load_config()
+    return {
+        "max_tokens": int(os.getenv("RETRIEVAL_MAX_TOKENS", DEFAULT_MAX_TOKENS)),
+        "top_k": int(os.getenv("RETRIEVAL_TOP_K", DEFAULT_TOP_K)),
+    }
+
+
+@lru_cache(maxsize=None)
+def load_question_config():
+    """
+    读取问题生成的配置
+
+    QUESTION_FANOUT=N 时对使用次数最多的 N 个库各发一个小请求并发生成问题（0 表示单次请求）；
+    QUESTION_CONCURRENCY 为并发请求数上限，QUESTION_LIMIT 为合并去重后保留的问题数。
+    QUESTION_BANK=1 时从跨项目的问题库中取题，只为库中问题不足的库调用模型；
+    也可以直接给出问题库文件的路径。
+
+    Returns:
+        dict: fanout / concurrency / limit / bank（问题库路径，""表示默认位置，None表示不使用）
+    """
+    load_config()
+    bank = os.getenv("QUESTION_BANK", "").strip()
+    if bank.lower() in ("", "0", "false", "no", "off"):
+        bank = None
+    elif bank.lower() in ("1", "true", "yes", "on"):
+        bank = ""
+    return {
+        "fanout": int(os.getenv("QUESTION_FANOUT", 0)),
+        "concurrency": max(1, int(os.getenv("QUESTION_CONCURRENCY", 4))),
+        "limit": max(1, int(os.getenv("QUESTION_LIMIT", 7))),
+        "bank": bank,
+    }
+
+
+@lru_cache(maxsize=None)
+def load_gap_config():
+    """
+    读取差距报告生成的配置
+
+    GAP_PARALLEL=1 时分两步生成：先用一个短请求列出差距领域与优先级，
+    再对每个领域并发请求描述与建议；GAP_CONCURRENCY 为并发请求数上限。
+
+    Returns:
+        dict: parallel / concurrency
+    """
+    load_config()
+    return {
+        "parallel": os.getenv("GAP_PARALLEL", "").strip().lower() in ("1", "true", "yes", "on"),
+        "concurrency": max(1, int(os.getenv("GAP_CONCURRENCY", 4))),
+    }
@@ -1,9 +1,9 @@
 import os
 import re
 
-from gitingest import ingest
-
+from config import get_client, load_config, load_ingest_config
 from vibehacks.analyzer import ImportAnalyzer
+from vibehacks.profiling import tracer
 from vibehacks.reporter import AnalysisReporter
 
 
@@ -25,7 +25,16 @@ def generate_analysis_report(project_path=".", output_file="report.md"):
 
         # 创建报告生成器并生成报告
         reporter = AnalysisReporter(imports_data, usage_data)
-        reporter.export_to_markdown(output_file)
+        with tracer.span("export_markdown", "report"):
+            reporter.export_to_markdown(output_file)
+
+        # 保存第三方包的使用数据与项目中的版本，之后的阶段按使用的符号检索依赖代码、按版本复用问题
+        from vibehacks.graph import first_party_roots
+        from vibehacks.retrieval import save_usage
+        from vibehacks.versions import import_versions, project_versions
+
+        versions = import_versions(usage_data, project_versions(project_path))
+        save_usage(usage_data, output_file, first_party_roots(analyzer), versions)
 
         return True
 
@@ -34,15 +43,18 @@ def generate_analysis_report(project_path=".", output_file="report.md"):
         return False
 
 
-def load_report():
+def load_report(report_file="report.md"):
     """
-    加载report.md文件内容作为变量
+    加载报告文件内容作为变量
+
+    Args:
+        report_file (str): 报告文件路径，默认为report.md
 
     Returns:
-        str: report.md文件内容，如果加载失败则返回None
+        str: 报告文件内容，如果加载失败则返回None
     """
     try:
-        with open("report.md", "r", encoding="utf-8") as f:
+        with open(report_file, "r", encoding="utf-8") as f:
             report_content = f.read()
         return report_content
     except FileNotFoundError:
@@ -120,15 +132,7 @@ def analyze_and_get_libraries_info(project_path=".", output_file="report.md"):
         return None
 
     # 加载生成的报告
-    report_content = load_report() if output_file == "report.md" else None
-    if not report_content and output_file != "report.md":
-        try:
-            with open(output_file, "r", encoding="utf-8") as f:
-                report_content = f.read()
-        except Exception as e:
-            print(f"[错误] 无法读取报告文件: {e}")
-            return None
-
+    report_content = load_report(output_file)
     if not report_content:
         return None
 
@@ -174,16 +178,35 @@ def analyze_and_get_libraries_info(project_path=".", output_file="report.md"):
     }
 
 
+def ingest(source, *args, **kwargs):
+    """延迟导入gitingest，只有在实际获取仓库时才加载"""
+    from gitingest import ingest as gitingest_ingest
+
+    return gitingest_ingest(source, *args, **kwargs)
+
+
 def get_repo_context(github_url, repo_name):
     """
     获取单个仓库的上下文信息并保存到对应文件夹
 
+    INGEST_MODE=stream 或 INGEST_STORE=blobs 时直接流式导出；默认使用 gitingest，
+    获取或保存失败（例如超大仓库内存不足）时改用流式导出。
+
     Args:
         github_url (str): GitHub仓库URL
         repo_name (str): 仓库名称，用作文件夹名
+
+    Returns:
+        tuple: (summary, tree, content)，流式导出时内容不在内存中保留，tree 和 content 为None
     """
+    ingest_config = load_ingest_config()
+    if ingest_config["mode"] == "stream" or ingest_config["store"] == "blobs":
+        return stream_repo_context(github_url, repo_name, ingest_config)
+
     try:
-        summary, tree, content = ingest(github_url)
+        with tracer.span("ingest", "network", repo=repo_name) as span:
+            summary, tree, content = ingest(github_url)
+            span.attrs["bytes"] = len(content.encode("utf-8"))
 
         # 为每个仓库创建独立的输出目录
         output_dir = os.path.join("output", repo_name)
@@ -193,19 +216,77 @@ def get_repo_context(github_url, repo_name):
         # 将三个字符串分别保存到txt文件
         files_data = {"summary.txt": summary, "tree.txt": tree, "content.txt": content}
 
-        for filename, data in files_data.items():
-            filepath = os.path.join(output_dir, filename)
-            try:
-                with open(filepath, "w", encoding="utf-8") as f:
-                    f.write(data)
-            except Exception as e:
-                print(f"  ⚠ {repo_name} 保存异常: {e}")
-
+        saved = True
+        with tracer.span("ingest.save", "io", repo=repo_name) as span:
+            for filename, data in files_data.items():
+                filepath = os.path.join(output_dir, filename)
+                try:
+                    with open(filepath, "w", encoding="utf-8") as f:
+                        f.write(data)
+                    span.attrs["bytes"] = span.attrs.get("bytes", 0) + len(
+                        data.encode("utf-8")
+                    )
+                except Exception as e:
+                    print(f"  ⚠ {repo_name} 保存异常: {e}")
+                    saved = False
+
+        if not saved:
+            return stream_repo_context(github_url, repo_name, ingest_config)
         return summary, tree, content
+    except Exception as e:
+        print(f"  ⚠ {repo_name} 获取失败，改用流式导出")
+        return stream_repo_context(github_url, repo_name, ingest_config)
+
+
+def stream_repo_context(github_url, repo_name, ingest_config=None):
+    """
+    流式导出单个仓库到 output/<仓库名>/，内存占用与仓库大小无关
+
+    INGEST_STORE=blobs 时文件内容存入共享的 output/.blobs 对象库，只写入有变化的文件。
+
+    Args:
+        github_url (str): GitHub仓库URL（也可以是本地目录）
+        repo_name (str): 仓库名称，用作文件夹名
+        ingest_config (dict, optional): 导出限额，默认读取 load_ingest_config()
+
+    Returns:
+        tuple: (summary, None, None)，失败时全部为None
+    """
+    from ingest_stream import stream_ingest
+
+    config = ingest_config or load_ingest_config()
+    output_dir = os.path.join("output", repo_name)
+    store = None
+    if config["store"] == "blobs":
+        from vibehacks.blob_store import BlobStore
+
+        store = BlobStore(os.path.join("output", ".blobs"))
+    try:
+        with tracer.span("ingest.stream", "network", repo=repo_name) as span:
+            manifest = stream_ingest(
+                github_url,
+                output_dir,
+                max_file_size=config["max_file_size"],
+                max_total_bytes=config["max_total_bytes"],
+                include=config["include"],
+                exclude=config["exclude"],
+                store=store,
+            )
+            span.attrs["bytes"] = manifest["bytes"]
+        with open(os.path.join(output_dir, "summary.txt"), "r", encoding="utf-8") as f:
+            summary = f.read()
     except Exception as e:
         print(f"  ⚠ {repo_name} 获取失败")
         return None, None, None
 
+    if manifest["truncated"]:
+        skipped = len(manifest["skipped"]["too_large"]) + len(manifest["skipped"]["budget"])
+        print(f"  • {repo_name} 超出导出限额，{skipped} 个文件未写入（见 manifest.json）")
+    if store is not None:
+        reused = manifest["files"] - manifest["blobs_written"]
+        print(f"  • {repo_name} 复用 {reused} 个已存储的文件，新写入 {manifest['blobs_written']} 个")
+    return summary, None, None
+
 
 async def get_all_repos_context(github_links):
     """
@@ -230,27 +311,13 @@ async def get_all_repos_context(github_links):
     if not os.path.exists("output"):
         os.makedirs("output")
 
-    # 并发处理所有仓库
-    tasks = [process_repo(url) for url in github_links]
+    # 并发处理所有仓库，同一仓库只获取一次
+    tasks = [process_repo(url) for url in dedupe_github_links(github_links)]
     results = await asyncio.gather(*tasks, return_exceptions=True)
 
     return results
 
 
-# AI配置信息 - 从环境变量读取
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-AI_CONFIG = {
-    "api_key": os.getenv("API_KEY"),
-    "base_url": os.getenv("BASE_URL"),
-    "model": os.getenv("MODEL"),
-    "default_max_tokens": 4096,
-}
-
-
 def send_ai_request(prompt, max_tokens=None, system_message=None):
     """
     发送AI请求的通用函数
@@ -264,13 +331,9 @@ def send_ai_request(prompt, max_tokens=None, system_message=None):
         str: AI响应内容
     """
     try:
-        from openai import OpenAI
-        
-        # 初始化OpenAI兼容客户端
-        client = OpenAI(
-            api_key=AI_CONFIG["api_key"],
-            base_url=AI_CONFIG["base_url"],
-        )
+        # 首次调用时加载配置并构建客户端，之后复用
+        ai_config = load_config()
+        client = get_client()
 
         # 准备消息列表
         messages = []
@@ -279,11 +342,13 @@ def send_ai_request(prompt, max_tokens=None, system_message=None):
         messages.append({"role": "user", "content": prompt})
 
         # 发送请求
-        response = client.chat.completions.create(
-            model=AI_CONFIG["model"],
-            max_tokens=max_tokens or AI_CONFIG["default_max_tokens"],
-            messages=messages,
-        )
+        with tracer.span("llm.chat", "llm", model=ai_config["model"]) as span:
+            response = client.chat.completions.create(
+                model=ai_config["model"],
+                max_tokens=max_tokens or ai_config["default_max_tokens"],
+                messages=messages,
+            )
+            tracer.record_llm_usage(span, response)
 
         # 提取响应内容
         return response.choices[0].message.content
@@ -292,27 +357,17 @@ def send_ai_request(prompt, max_tokens=None, system_message=None):
         return None
 
 
-async def run_complete_analysis(project_path=".", output_file="report.md"):
+def build_github_links_prompt(report_content):
     """
-    运行完整的项目分析流程
+    构造根据依赖分析报告获取第三方库GitHub链接的提示词
 
     Args:
-        project_path (str): 要分析的项目路径，默认为当前目录
-        output_file (str): 输出文件名，默认为report.md
+        report_content (str): 依赖分析报告内容
 
     Returns:
-        list: GitHub链接列表
+        str: 提示词
     """
-    # 使用默认参数
-    project_path = "."
-    output_file = "report.md"
-
-    # 生成项目分析报告并获取库信息
-    result = analyze_and_get_libraries_info(project_path, output_file)
-
-    # 加载report.md内容
-    report_content = load_report()
-    prompt = f"""
+    return f"""
 这个是一个Python项目的依赖分析报告，内容如下：
 {report_content}
 请基于以上内容，帮我生成用户如果维护需要了解的第三方库的GitHub链接
@@ -348,7 +403,21 @@ async def run_complete_analysis(project_path=".", output_file="report.md"):
 </third_party_libraries>
 ```
 """
-    response = send_ai_request(prompt, max_tokens=1024)
+
+
+def resolve_github_links(report_content):
+    """
+    根据依赖分析报告获取第三方库的GitHub链接
+
+    Args:
+        report_content (str): 依赖分析报告内容
+
+    Returns:
+        list: 去重后的GitHub链接列表
+    """
+    response = send_ai_request(
+        build_github_links_prompt(report_content), max_tokens=1024
+    )
 
     json_data = extract_json_from_response(response)
     github_links = []
@@ -357,11 +426,64 @@ async def run_complete_analysis(project_path=".", output_file="report.md"):
         for lib in json_data["third_party_libraries"]:
             github_links.append(lib["github_url"])
 
-    # 移除调试输出
+    return dedupe_github_links(github_links)
+
+
+def dedupe_github_links(github_links):
+    """
+    去除重复的GitHub链接，保证每个仓库只获取一次
+
+    Args:
+        github_links (list): GitHub链接列表
+
+    Returns:
+        list: 保持原有顺序的去重链接列表
+    """
+    seen = set()
+    unique_links = []
+    for url in github_links:
+        if not url:
+            continue
+        key = url.strip().rstrip("/").lower()
+        if key.endswith(".git"):
+            key = key[:-4]
+        if key not in seen:
+            seen.add(key)
+            unique_links.append(url.strip())
+    return unique_links
+
+
+async def run_complete_analysis(project_path=".", output_file="report.md"):
+    """
+    运行完整的项目分析流程
+
+    Args:
+        project_path (str): 要分析的项目路径，默认为当前目录
+        output_file (str): 输出文件名，默认为report.md
+
+    Returns:
+        list: GitHub链接列表
+    """
+    # 生成项目分析报告并获取库信息
+    result = analyze_and_get_libraries_info(project_path, output_file)
+
+    # 加载报告内容并获取第三方库的GitHub链接
+    report_content = load_report(output_file)
+    github_links = resolve_github_links(report_content)
 
     # 异步获取所有仓库上下文
     await get_all_repos_context(github_links)
 
+    # 为导出的仓库建立检索索引（内容没有变化的仓库跳过）
+    try:
+        from vibehacks.retrieval import build_indexes
+
+        rebuilt = [repo for repo, updated in build_indexes("output").items() if updated]
+        if rebuilt:
+            print(f"  • 已为 {len(rebuilt)} 个依赖仓库建立代码检索索引")
+    except Exception as e:
+        print(f"  ⚠ 代码检索索引建立失败: {e}")
+
     return github_links
 
 
@@ -377,4 +499,6 @@ if __name__ == "__main__":
     if not output_file:
         output_file = "report.md"
 
-    run_complete_analysis(project_path, output_file)
+    import asyncio
+
+    asyncio.run(run_complete_analysis(project_path, output_file))
@@ -1,24 +1,23 @@
 import os
 import webbrowser
 from datetime import datetime
-from dotenv import load_dotenv
-import openai
-
-load_dotenv()
+from config import get_client, load_config, load_retrieval_config
+from vibehacks.profiling import tracer
 
 class HTMLReportGenerator:
     def __init__(self):
-        self.api_key = os.getenv('API_KEY')
-        self.base_url = os.getenv('BASE_URL')
-        self.model = os.getenv('MODEL')
+        config = load_config()
+        self.api_key = config['api_key']
+        self.base_url = config['base_url']
+        self.model = config['model']
 
         if not all([self.api_key, self.base_url, self.model]):
             raise ValueError("Missing required environment variables: API_KEY, BASE_URL, MODEL")
 
-        self.client = openai.OpenAI(
-            api_key=self.api_key,
-            base_url=self.base_url
-        )
+    @property
+    def client(self):
+        """首次调用大模型时才构建客户端"""
+        return get_client()
 
     def read_markdown_files(self):
         """读取 gap_summary.md 和 report.md 文件内容"""
@@ -39,8 +38,24 @@ class HTMLReportGenerator:
 
         return gap_content, report_content
 
-    def generate_html_prompt(self, gap_content, report_content):
+    def read_dependency_context(self):
+        """按 report.md 旁保存的使用数据检索依赖代码片段，供学习资源引用真实的API"""
+        from vibehacks.retrieval import context_for_report
+
+        try:
+            return context_for_report('report.md', **load_retrieval_config())
+        except Exception as e:
+            print(f"⚠️ 依赖代码检索失败: {e}")
+            return ""
+
+    def generate_html_prompt(self, gap_content, report_content, code_context=""):
         """Generate prompt for LLM to create HTML report"""
+        source_section = ""
+        if code_context:
+            source_section = f"""
+### Dependency Source Excerpts (APIs this project actually uses):
+{code_context}
+"""
         prompt = f"""
 Please generate a professional HTML learning path report based on the following documents. This is the core output of VibeDock's AI-driven intelligent adaptation system.
 
@@ -102,6 +117,7 @@ Please generate a professional HTML learning path report based on the following
 
 ### Project Tech Stack Analysis:
 {report_content}
+{source_section}
 
 Please generate a complete HTML file with the following requirements:
 - Modern white minimalist style, avoid dark/purple themes
@@ -110,6 +126,7 @@ Please generate a complete HTML file with the following requirements:
 - Smooth interactive animations
 - Report title: "VibeDock 智能学习路径报告"
 - Ensure all learning resources have clickable beautiful buttons
+- When dependency source excerpts are provided, ground learning resources in the APIs they show
 - **IMPORTANT: All content in the HTML report must be in Chinese language**
 
 Focus: White premium feel + actionability, allowing users to see action paths at a glance.
@@ -142,14 +159,16 @@ Output requirements:
 - Responsive design compatible with various devices
 - **CRITICAL: All text content in the generated HTML must be in Chinese language**"""
 
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3
-            )
+            with tracer.span("llm.generate_html", "llm", model=self.model) as span:
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0.3
+                )
+                tracer.record_llm_usage(span, response)
             return response.choices[0].message.content
         except Exception as e:
             print(f"❌ 调用大模型失败: {e}")
@@ -164,8 +183,9 @@ Output requirements:
         filename = f'output/VibeDock_智能学习路径_{timestamp}.html'
 
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(html_content)
+            with tracer.span("html.save", "io", bytes=len(html_content.encode('utf-8'))):
+                with open(filename, 'w', encoding='utf-8') as f:
+                    f.write(html_content)
             print(f"✅ HTML报告已保存: {filename}")
             return filename
         except Exception as e:
@@ -192,8 +212,8 @@ Output requirements:
             print("❌ 无法读取任何源文件，无法生成报告")
             return False
 
-        # 生成提示词
-        prompt = self.generate_html_prompt(gap_content, report_content)
+        # 生成提示词，附带与项目用法相关的依赖代码片段
+        prompt = self.generate_html_prompt(gap_content, report_content, self.read_dependency_context())
 
         # 调用大模型
         html_content = self.call_llm(prompt)
@@ -216,7 +236,8 @@ Output requirements:
 async def generate_html_report():
     """异步包装函数，用于在main.py中调用"""
     generator = HTMLReportGenerator()
-    return generator.generate_and_display_report()
+    with tracer.span("html_report", "stage"):
+        return generator.generate_and_display_report()
 
 if __name__ == "__main__":
     import asyncio
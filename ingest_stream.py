@@ -0,0 +1,305 @@
+"""
+流式仓库导出 - 边遍历克隆下来的仓库边写入磁盘，内存占用与仓库大小无关
+
+输出与 gitingest 相同格式的 summary.txt / tree.txt / content.txt，
+另外写入 manifest.json，记录限额以及因超限、二进制等原因未写入的文件。
+
+限额：
+- max_file_size: 单个文件超过该字节数时整个跳过
+- max_total_bytes: content.txt 中源文件字节数的总预算，放不下的文件跳过（后续更小的文件仍会写入）
+- include / exclude: 相对路径或文件名的 glob，指定 include 时只导出匹配的文件
+
+写入的文件始终完整，不会在中间截断，导出结果可以直接交给 vibehacks 的 IngestProvider 分析。
+
+指定 BlobStore 时不写 content.txt：文件按内容哈希存入共享的对象库，manifest.json 中的
+entries 列出 [路径, 哈希, 大小]，重复导出或版本升级只写入有变化的文件。
+"""
+
+import codecs
+import contextlib
+import fnmatch
+import hashlib
+import json
+import os
+import subprocess
+import tempfile
+
+SEPARATOR = "=" * 48
+
+DEFAULT_MAX_FILE_SIZE = 1024 * 1024
+DEFAULT_MAX_TOTAL_BYTES = 64 * 1024 * 1024
+
+# 与 gitingest 默认忽略规则相近：版本控制、虚拟环境、缓存、构建产物和常见二进制文件
+DEFAULT_EXCLUDE = [
+    ".git", ".hg", ".svn", "__pycache__", "node_modules", ".venv", "venv", ".tox", ".nox",
+    ".mypy_cache", ".pytest_cache", ".ruff_cache", "build", "dist", "*.egg-info",
+    "*.pyc", "*.pyo", "*.so", "*.dll", "*.dylib", "*.exe", "*.o", "*.a",
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.ico", "*.pdf", "*.zip", "*.gz", "*.tar", "*.whl",
+    "*.woff", "*.woff2", "*.ttf", "*.mp3", "*.mp4", "*.lock",
+]
+
+_CHUNK_SIZE = 64 * 1024
+
+
+def _matches(rel_path, name, patterns):
+    return any(
+        fnmatch.fnmatch(rel_path, pattern) or fnmatch.fnmatch(name, pattern)
+        for pattern in patterns
+    )
+
+
+def _repository_name(source):
+    """https://github.com/Textualize/rich.git -> textualize/rich"""
+    parts = source.rstrip("/").split("/")
+    name = parts[-1][:-4] if parts[-1].endswith(".git") else parts[-1]
+    owner = parts[-2] if len(parts) > 1 else ""
+    return f"{owner}/{name}".lower() if owner else name.lower()
+
+
+def clone_repository(source, repo_dir):
+    """浅克隆远程仓库到 repo_dir（离线测试替换此函数，见 benchmarks.fake_gitingest）"""
+    result = subprocess.run(
+        ["git", "clone", "--depth", "1", "--quiet", source, repo_dir],
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"克隆失败: {result.stderr.strip()}")
+
+
+def _head_commit(repo_dir):
+    result = subprocess.run(
+        ["git", "-C", repo_dir, "rev-parse", "HEAD"], capture_output=True, text=True
+    )
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+class StreamingIngestWriter:
+    """
+    把一个目录树流式写成 gitingest 格式的三个文件和 manifest.json
+
+    Args:
+        output_dir (str): 输出目录
+        max_file_size (int): 单个文件的字节上限
+        max_total_bytes (int): 内容总字节预算
+        include (list): 只导出匹配的文件（glob），为空时导出全部
+        exclude (list): 额外排除的目录或文件（glob），在默认规则之外追加
+        store (BlobStore, optional): 内容寻址对象库，指定时文件存入对象库而不写 content.txt
+    """
+
+    def __init__(self, output_dir, max_file_size=DEFAULT_MAX_FILE_SIZE,
+                 max_total_bytes=DEFAULT_MAX_TOTAL_BYTES, include=None, exclude=None, store=None):
+        self.output_dir = output_dir
+        self.store = store
+        self.max_file_size = max_file_size
+        self.max_total_bytes = max_total_bytes
+        self.include = list(include or [])
+        self.exclude = DEFAULT_EXCLUDE + list(exclude or [])
+
+        self.files_written = 0
+        self.bytes_written = 0
+        self.excluded = 0
+        self.skipped = {"too_large": [], "budget": [], "binary": [], "unreadable": []}
+        # 对象库模式下的清单条目和新写入的对象
+        self.entries = []
+        self.blobs_written = 0
+        self.blob_bytes_written = 0
+
+    def _walk(self, root, rel_dir, prefix, tree):
+        """深度优先遍历，同时写出目录树，产出 (相对路径, 绝对路径, 大小)"""
+        path = os.path.join(root, rel_dir) if rel_dir else root
+        try:
+            with os.scandir(path) as it:
+                entries = list(it)
+        except OSError:
+            return
+
+        kept = []
+        for entry in entries:
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            # 符号链接可能指向仓库之外或形成环，不跟随
+            if entry.is_symlink() or _matches(rel_path, entry.name, self.exclude):
+                self.excluded += 1
+                continue
+            is_dir = entry.is_dir(follow_symlinks=False)
+            if not is_dir and self.include and not _matches(rel_path, entry.name, self.include):
+                self.excluded += 1
+                continue
+            kept.append((is_dir, entry.name, rel_path, entry))
+        # 同一目录下文件在前、子目录在后，各自按名称排序
+        kept.sort(key=lambda item: (item[0], item[1]))
+
+        for index, (is_dir, name, rel_path, entry) in enumerate(kept):
+            last = index == len(kept) - 1
+            tree.write(f"{prefix}{'└── ' if last else '├── '}{name}{'/' if is_dir else ''}\n")
+            if is_dir:
+                yield from self._walk(root, rel_path, prefix + ("    " if last else "│   "), tree)
+            else:
+                try:
+                    size = entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    self.skipped["unreadable"].append({"path": rel_path})
+                    continue
+                yield rel_path, entry.path, size
+
+    def _copy(self, rel_path, path, content):
+        """把单个文件按块写入 content.txt，二进制文件（前64KB含空字节）跳过"""
+        try:
+            with open(path, "rb") as f:
+                chunk = f.read(_CHUNK_SIZE)
+                if b"\0" in chunk:
+                    self.skipped["binary"].append({"path": rel_path})
+                    return 0
+                content.write(f"{SEPARATOR}\nFILE: {rel_path}\n{SEPARATOR}\n")
+                # 非UTF-8字节替换为U+FFFD，与 gitingest 的文本输出一致
+                decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+                copied = 0
+                while chunk:
+                    copied += len(chunk)
+                    content.write(decoder.decode(chunk))
+                    chunk = f.read(_CHUNK_SIZE)
+                content.write(decoder.decode(b"", final=True))
+                content.write("\n\n")
+                return copied
+        except OSError as e:
+            self.skipped["unreadable"].append({"path": rel_path, "error": str(e)})
+            return 0
+
+    def _store(self, rel_path, path):
+        """把单个文件存入对象库，返回字节数；二进制或无法读取的文件返回None"""
+        try:
+            with open(path, "rb") as f:
+                if b"\0" in f.read(_CHUNK_SIZE):
+                    self.skipped["binary"].append({"path": rel_path})
+                    return None
+            digest, size, written = self.store.put_file(path)
+        except OSError as e:
+            self.skipped["unreadable"].append({"path": rel_path, "error": str(e)})
+            return None
+        self.entries.append((rel_path, digest, size))
+        if written:
+            self.blobs_written += 1
+            self.blob_bytes_written += size
+        return size
+
+    def write(self, root, repository, commit=None, source=None):
+        """
+        导出目录树
+
+        Args:
+            root (str): 仓库根目录
+            repository (str): 摘要中显示的仓库名
+            commit (str): 摘要中显示的提交
+            source (str): 记录在 manifest 中的来源
+
+        Returns:
+            dict: manifest 内容
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        top = os.path.basename(os.path.abspath(root)) or repository
+        content_path = os.path.join(self.output_dir, "content.txt")
+        if self.store is not None:
+            # 旧的 content.txt 会被优先读取，改用对象库后删除
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(content_path)
+            content_file = contextlib.nullcontext()
+        else:
+            content_file = open(content_path, "w", encoding="utf-8")
+        with open(os.path.join(self.output_dir, "tree.txt"), "w", encoding="utf-8") as tree, \
+                content_file as content:
+            tree.write(f"Directory structure:\n└── {top}/\n")
+            for rel_path, path, size in self._walk(root, "", "    ", tree):
+                if size > self.max_file_size:
+                    self.skipped["too_large"].append({"path": rel_path, "size": size})
+                    continue
+                if self.bytes_written + size > self.max_total_bytes:
+                    self.skipped["budget"].append({"path": rel_path, "size": size})
+                    continue
+                if self.store is not None:
+                    stored = self._store(rel_path, path)
+                    if stored is not None:
+                        self.files_written += 1
+                        self.bytes_written += stored
+                    continue
+                copied = self._copy(rel_path, path, content)
+                if copied or size == 0:
+                    self.files_written += 1
+                    self.bytes_written += copied
+
+        truncated = bool(self.skipped["too_large"] or self.skipped["budget"])
+        summary = (
+            f"Repository: {repository}\n"
+            + (f"Commit: {commit}\n" if commit else "")
+            + f"Files analyzed: {self.files_written}\n\n"
+            + f"Estimated tokens: {_format_tokens(self.bytes_written // 4)}"
+        )
+        with open(os.path.join(self.output_dir, "summary.txt"), "w", encoding="utf-8") as f:
+            f.write(summary)
+
+        manifest = {
+            "source": source or root,
+            "repository": repository,
+            "commit": commit,
+            "limits": {
+                "max_file_size": self.max_file_size,
+                "max_total_bytes": self.max_total_bytes,
+                "include": self.include,
+                "exclude": self.exclude,
+            },
+            "files": self.files_written,
+            "bytes": self.bytes_written,
+            "excluded": self.excluded,
+            "truncated": truncated,
+            "skipped": self.skipped,
+        }
+        if self.store is not None:
+            # 没有提交信息（本地目录）时按文件列表的哈希区分版本
+            ref = commit or "tree-" + hashlib.sha256(
+                json.dumps(self.entries).encode("utf-8")
+            ).hexdigest()[:16]
+            self.store.save_manifest(repository, ref, self.entries, commit=commit, source=manifest["source"])
+            manifest.update(
+                store=os.path.relpath(self.store.root, self.output_dir),
+                ref=ref,
+                blobs_written=self.blobs_written,
+                blob_bytes_written=self.blob_bytes_written,
+                entries=[list(entry) for entry in self.entries],
+            )
+        with open(os.path.join(self.output_dir, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        return manifest
+
+
+def _format_tokens(tokens):
+    if tokens >= 1_000_000:
+        return f"{tokens / 1_000_000:.1f}M"
+    if tokens >= 1000:
+        return f"{tokens / 1000:.1f}k"
+    return str(tokens)
+
+
+def stream_ingest(source, output_dir, max_file_size=DEFAULT_MAX_FILE_SIZE,
+                  max_total_bytes=DEFAULT_MAX_TOTAL_BYTES, include=None, exclude=None, store=None):
+    """
+    流式导出一个仓库（本地目录，或先浅克隆的远程地址）
+
+    Args:
+        source (str): 本地目录或git仓库地址
+        output_dir (str): 输出目录，写入 summary.txt / tree.txt / content.txt / manifest.json
+        max_file_size (int): 单个文件的字节上限
+        max_total_bytes (int): 内容总字节预算
+        include (list): 只导出匹配的文件（glob）
+        exclude (list): 额外排除的目录或文件（glob）
+        store (BlobStore, optional): 内容寻址对象库，指定时不写 content.txt
+
+    Returns:
+        dict: manifest 内容
+    """
+    writer = StreamingIngestWriter(output_dir, max_file_size, max_total_bytes, include, exclude, store)
+    if os.path.isdir(source):
+        return writer.write(source, _repository_name(os.path.abspath(source)),
+                            _head_commit(source), source)
+
+    with tempfile.TemporaryDirectory(prefix="vibehacks-ingest-") as workdir:
+        repo_dir = os.path.join(workdir, _repository_name(source).split("/")[-1])
+        clone_repository(source, repo_dir)
+        return writer.write(repo_dir, _repository_name(source), _head_commit(repo_dir), source)
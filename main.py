@@ -1,10 +1,16 @@
+import argparse
 import asyncio
+import os
 from tech_stack_questionnaire import run_questionnaire
 import fileprocess
 from html_report_generator import generate_html_report
+from batch import run_batch
+from vibehacks.profiling import tracer
 
-async def main():
+async def main(project_path=".", answers=None, profile=False):
     """VibeDock - AI-Driven Intelligent Adaptation Engine"""
+    if profile:
+        tracer.enabled = True
     print("\n" + "─" * 60)
     print(" VibeDock | AI驱动的智能适配引擎")
     print(" 重新定义项目理解与技术栈学习")
@@ -12,11 +18,22 @@ async def main():
     
     # Stage 1: Technical Stack Analysis
     print("\n→ 智能项目分析")
-    await fileprocess.run_complete_analysis()
+    with tracer.span("project_analysis"):
+        await fileprocess.run_complete_analysis(project_path)
     
     # Stage 2: Personalized Gap Analysis
     print("\n→ 个性化差距评估")
-    results = await run_questionnaire('report.md')
+    with tracer.span("questionnaire"):
+        results = await run_questionnaire('report.md', answers)
+    
+    if results and 'users_count' in results:
+        print(f"  ✓ 已完成 {results['users_count']} 位用户的评估")
+        print(f"  • 共享 {results['questions_count']} 个评估问题")
+        print("\n" + "─" * 60)
+        print(" 批量评估完成 | 报告位于 output/assessments")
+        print("─" * 60)
+        report_profile()
+        return
     
     if results:
         print("  ✓ 适配完成")
@@ -38,6 +55,50 @@ async def main():
     else:
         print(" 核心分析完成 | 可视化报告生成异常")
     print("─" * 60)
+    report_profile()
+
+async def main_batch(manifest, output_dir, workers=None, ingest=True, profile=False):
+    """VibeDock batch mode - analyze every project listed in a manifest"""
+    if profile:
+        tracer.enabled = True
+    print("\n" + "─" * 60)
+    print(" VibeDock | 批量项目分析")
+    print("─" * 60)
+
+    print("\n→ 批量项目分析")
+    with tracer.span("batch"):
+        aggregate = await run_batch(manifest, output_dir, max_workers=workers, ingest=ingest)
+
+    print("\n" + "─" * 60)
+    print(f" 批量分析完成 | 共 {len(aggregate)} 个不重复依赖")
+    print("─" * 60)
+    report_profile()
+
+def report_profile():
+    """Print the per-stage timing table and export this run's profile (only with --profile)"""
+    if not tracer.enabled:
+        return
+    tracer.print_summary()
+    profile_file = tracer.export_run_profile("output")
+    print(f"  • 运行剖析已导出: {profile_file}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="vibedock", description="VibeDock - AI驱动的智能适配引擎")
+    parser.add_argument("--project", default=".", help="要分析的项目路径，默认为当前目录")
+    parser.add_argument("--answers", default=None, help="从JSON/YAML文件读取问卷答案（'-' 表示标准输入），跳过交互式问卷")
+    parser.add_argument("--profile", action="store_true", help="记录各阶段耗时，结束时打印汇总表并导出剖析文件")
+    subparsers = parser.add_subparsers(dest="command")
+
+    batch_parser = subparsers.add_parser("batch", help="基于清单文件批量分析多个项目")
+    batch_parser.add_argument("manifest", help="清单文件，每行一个项目路径")
+    batch_parser.add_argument("--output-dir", default=os.path.join("output", "batch"), help="批量报告输出目录")
+    batch_parser.add_argument("--workers", type=int, default=None, help="并发分析的进程数")
+    batch_parser.add_argument("--skip-ingest", action="store_true", help="不获取依赖仓库上下文")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    args = parse_args()
+    if args.command == "batch":
+        asyncio.run(main_batch(args.manifest, args.output_dir, args.workers, not args.skip_ingest, args.profile))
+    else:
+        asyncio.run(main(args.project, args.answers, args.profile))
@@ -0,0 +1,153 @@
+"""
+Cross-project question bank
+
+Questions generated for one library are reused by every later assessment of a project
+using the same library, keyed by (library, version range, depth tier):
+
+    bank = QuestionBank()
+    key = bank.key("pandas", "deep", "2.2.3")     # ("pandas", ">=2,<3", "deep")
+    cached = bank.sample(*key, count=3)           # earliest stored questions first
+    bank.add(*key, new_questions, model="gpt-4o")
+
+The version is the analyzed project's own (its virtualenv, lock file or pins, see
+vibehacks.versions), recorded next to the analysis report; libraries whose version is
+unknown share the "*" range. Sampling is deterministic, so everyone assessed on the
+same stack answers the same questions. The bank lives in the vibehacks cache directory
+(VIBEHACKS_CACHE_DIR overrides it) and can be deleted at any time.
+"""
+
+import json
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from vibehacks.cache import cache_path
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS questions (
+    id INTEGER PRIMARY KEY,
+    library TEXT NOT NULL,
+    version_range TEXT NOT NULL,
+    tier TEXT NOT NULL,
+    text TEXT NOT NULL,
+    question TEXT NOT NULL,
+    model TEXT,
+    created REAL NOT NULL,
+    UNIQUE (library, version_range, tier, text)
+);
+"""
+
+ANY_VERSION = "*"
+
+_RELEASE = re.compile(r'^(\d+)\.(\d+)')
+
+
+def version_range(version: Optional[str]) -> str:
+    """
+    The compatible release series a version belongs to.
+
+    1.x and later releases are grouped by major version (2.1.3 -> ">=2,<3"); 0.x releases,
+    where minor versions routinely break APIs, by minor version (0.14.1 -> ">=0.14,<0.15").
+    Versions that are not dotted release numbers (e.g. commit hashes) map to "*".
+    """
+    match = _RELEASE.match(version or "")
+    if not match:
+        return ANY_VERSION
+    major, minor = int(match.group(1)), int(match.group(2))
+    if major == 0:
+        return f">=0.{minor},<0.{minor + 1}"
+    return f">={major},<{major + 1}"
+
+
+class QuestionBank:
+    """Persistent store of generated questions shared across projects"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = Path(db_path).expanduser() if db_path else cache_path("question_bank.db")
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.conn = self._connect()
+        self._init_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_path))
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _init_schema(self):
+        version = None
+        try:
+            row = self.conn.execute(
+                "SELECT value FROM meta WHERE key = 'schema_version'"
+            ).fetchone()
+            version = int(row[0]) if row else None
+        except sqlite3.OperationalError:
+            pass
+
+        if version is not None and version != SCHEMA_VERSION:
+            # The bank is a cache of LLM output; an incompatible one is simply started afresh
+            self.conn.close()
+            self.db_path.unlink()
+            self.conn = self._connect()
+
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta(key, value) VALUES ('schema_version', ?)",
+                (str(SCHEMA_VERSION),),
+            )
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def key(self, library: str, tier: str, version: Optional[str] = None) -> Tuple[str, str, str]:
+        """Bank key for a library at the analyzed project's `version` (None when unknown)"""
+        return library, version_range(version), tier
+
+    def sample(self, library: str, version_range: str, tier: str, count: int) -> List[Dict]:
+        """Up to `count` stored questions for a key, earliest first"""
+        rows = self.conn.execute(
+            "SELECT question FROM questions WHERE library = ? AND version_range = ? AND tier = ?"
+            " ORDER BY id LIMIT ?",
+            (library, version_range, tier, count),
+        )
+        return [json.loads(question) for question, in rows]
+
+    def add(self, library: str, version_range: str, tier: str, questions: List[Dict],
+            model: Optional[str] = None) -> int:
+        """Store questions under a key, ignoring ones already stored; returns how many were new"""
+        now = time.time()
+        with self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO questions(library, version_range, tier, text, question, model, created)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (library, version_range, tier, question['question'],
+                     json.dumps(question, ensure_ascii=False), model, now)
+                    for question in questions
+                ],
+            )
+            return self.conn.total_changes - before
+
+    def stats(self) -> List[Tuple[str, str, str, int]]:
+        """(library, version range, tier, question count) for every key in the bank"""
+        return self.conn.execute(
+            "SELECT library, version_range, tier, COUNT(*) FROM questions"
+            " GROUP BY library, version_range, tier ORDER BY library, version_range, tier"
+        ).fetchall()
@@ -1,24 +1,219 @@
 import re
-import os
-from typing import List, Dict
+import sys
+import json
+import asyncio
+from typing import TYPE_CHECKING, Any, List, Dict, Optional, Tuple
 from rich.console import Console
 from rich.prompt import Prompt
-from openai import AsyncOpenAI
-from dotenv import load_dotenv
+from config import create_async_client, load_config, load_question_config
+from vibehacks.profiling import tracer
+
+if TYPE_CHECKING:
+    from question_bank import QuestionBank
+
+USER_PURPOSES = [
+    "Active development - I want to contribute code to this project",
+    "Learning - I want to understand how this project works",
+    "Maintenance - I need to maintain/debug existing code",
+    "Integration - I want to integrate this project into my work",
+    "Evaluation - I'm evaluating this project for potential use",
+    "Other (please specify)"
+]
+
+# Per-library fan-out: questions per call are kept small so every call finishes quickly
+MAX_QUESTIONS_PER_LIBRARY = 3
+TOKENS_PER_QUESTION = 300
+# Libraries covered per assessment when the question bank is used without QUESTION_FANOUT
+BANK_LIBRARIES = 5
+
+_RANKING_ROW = re.compile(r'^\|\s*\d+\s*\|\s*([^|\s]+)\s*\|\s*(\d+)\s*\|')
+
+QUESTION_FORMAT = """<questions>
+<question>
+<text>In-depth question targeting specific library</text>
+<category>Category (e.g., Data Processing, Web Framework, AI/ML, etc.)</category>
+<type>multiple_choice</type>
+<options>
+<option>Technical Option A (demonstrates deep understanding)</option>
+<option>Technical Option B (common knowledge)</option>
+<option>Technical Option C (basic familiarity)</option>
+<option>Other (please specify)</option>
+<option>Not familiar with this library</option>
+</options>
+</question>
+</questions>"""
+
+QUESTION_SYSTEM_MESSAGE = """You are a skill assessment expert for VibeDock's intelligent adaptation system.
+
+Your expertise:
+- Designing layered questions based on library popularity and complexity
+- Common libraries (pandas, numpy, requests, django, etc.): Deep technical questions testing best practices
+- Specialized libraries (domain-specific tools): Basic knowledge questions understanding application scenarios
+- Question design reflects progressive learning paths, helping identify real skill levels
+
+Design principles:
+- Option design should have clear differentiation, reflecting different proficiency levels
+- Deep questions should include common scenarios from actual development
+- Avoid purely theoretical questions, focus on practical application abilities"""
+
+
+def load_answer_records(source: str) -> List[Dict[str, Any]]:
+    """Load scripted answer records from a JSON/YAML file, or stdin when source is '-'
+
+    Accepts a single record, a list of records, or {"records": [...]}. Each record looks like:
+        {"user": "alice", "purpose": 2, "answers": [1, 3, "free text"]}
+    where answers may also be a mapping keyed by question number or question text.
+    """
+    if source == '-':
+        raw = sys.stdin.read()
+    else:
+        with open(source, 'r', encoding='utf-8') as f:
+            raw = f.read()
+
+    if source.endswith(('.yaml', '.yml')):
+        data = _load_yaml(raw)
+    else:
+        try:
+            data = json.loads(raw)
+        except json.JSONDecodeError:
+            data = _load_yaml(raw)
+
+    if isinstance(data, dict) and 'records' in data:
+        data = data['records']
+    if isinstance(data, dict):
+        data = [data]
+    if not isinstance(data, list) or not all(isinstance(r, dict) for r in data):
+        raise ValueError(f"Invalid answer records in '{source}'")
+
+    for idx, record in enumerate(data, 1):
+        record.setdefault('user', f"user{idx}")
+    return data
+
+
+def ranked_libraries(markdown_content: str) -> List[Tuple[str, int]]:
+    """Read (library, total usage) pairs from the ranking table of an analysis report"""
+    libraries = []
+    for line in markdown_content.splitlines():
+        match = _RANKING_ROW.match(line)
+        if match:
+            libraries.append((match.group(1), int(match.group(2))))
+        elif libraries:
+            break
+    return libraries
+
+
+def _library_section(markdown_content: str, library: str) -> str:
+    """The report's detail section for one library, or an empty string when it has none"""
+    match = re.search(rf'^### {re.escape(library)}\n(.*?)(?=^---$|^## |^### |\Z)',
+                      markdown_content, re.DOTALL | re.MULTILINE)
+    return match.group(1).strip() if match else ""
+
+
+def depth_tier(count: int) -> str:
+    """Depth tier of a per-library request: several questions probe deeply, a single one covers basics"""
+    return "deep" if count > 1 else "basic"
+
+
+def allocate_questions(libraries: List[Tuple[str, int]], total: int) -> List[Tuple[str, int, int]]:
+    """
+    Split `total` questions across libraries in proportion to their usage.
+
+    Every library gets at least one question (so at most `total` libraries are kept) and
+    none gets more than MAX_QUESTIONS_PER_LIBRARY. Remaining questions go to the largest
+    fractional shares, ties broken by rank. Returns (library, usage, question count).
+    """
+    libraries = libraries[:total]
+    if not libraries:
+        return []
+    weights = [max(usage, 1) for _, usage in libraries]
+    spare = total - len(libraries)
+    shares = [spare * weight / sum(weights) for weight in weights]
+    counts = [1 + int(share) for share in shares]
+    leftover = total - sum(counts)
+    for i in sorted(range(len(libraries)), key=lambda i: (-(shares[i] - int(shares[i])), i))[:leftover]:
+        counts[i] += 1
+    # Questions above the per-library cap move to the next libraries that still have room
+    overflow = sum(max(count - MAX_QUESTIONS_PER_LIBRARY, 0) for count in counts)
+    counts = [min(count, MAX_QUESTIONS_PER_LIBRARY) for count in counts]
+    for i in range(len(counts)):
+        extra = min(overflow, MAX_QUESTIONS_PER_LIBRARY - counts[i])
+        counts[i] += extra
+        overflow -= extra
+    return [(name, usage, count) for (name, usage), count in zip(libraries, counts)]
+
+
+def _question_key(text: str) -> List[str]:
+    return re.sub(r'[^a-z0-9]+', ' ', text.lower()).split()
+
+
+def dedupe_questions(questions: List[Dict], similarity: float = 0.8) -> List[Dict]:
+    """Drop questions whose wording repeats an earlier one (word-set Jaccard >= similarity)"""
+    kept, seen = [], []
+    for question in questions:
+        words = set(_question_key(question['question']))
+        if any(
+            words == other or (words and len(words & other) / len(words | other) >= similarity)
+            for other in seen
+        ):
+            continue
+        seen.append(words)
+        kept.append(question)
+    return kept
+
+
+def _load_yaml(raw: str) -> Any:
+    try:
+        import yaml
+    except ImportError:
+        raise ValueError("YAML answer files require PyYAML (pip install pyyaml)")
+    return yaml.safe_load(raw)
 
-load_dotenv()
 
 class UniversalStage1Processor:
     def __init__(self):
         self.console = Console()
-        self.client = AsyncOpenAI(
-            base_url=os.getenv("BASE_URL"),
-            api_key=os.getenv("API_KEY")
-        )
-        self.model = os.getenv("MODEL")
+        self.model = load_config()["model"]
+        self._client = None
+        self._bank = None
+
+    @property
+    def client(self):
+        """API client, built on first use"""
+        if self._client is None:
+            self._client = create_async_client()
+        return self._client
+
+    def question_bank(self, path: str = "") -> "QuestionBank":
+        """Cross-project question bank, opened on first use"""
+        if self._bank is None:
+            from question_bank import QuestionBank
+
+            self._bank = QuestionBank(path or None)
+        return self._bank
         
-    async def generate_questions(self, markdown_content: str) -> List[Dict[str, str]]:
-        """Generate questions from markdown content using XML tags"""
+    async def generate_questions(self, markdown_content: str,
+                                 libraries: Optional[List[Tuple[str, int]]] = None,
+                                 versions: Optional[Dict[str, str]] = None) -> List[Dict[str, str]]:
+        """
+        Generate questions from markdown content using XML tags
+
+        With QUESTION_FANOUT=N the top-N libraries are queried concurrently instead of in
+        one large call (see generate_questions_fanout). With QUESTION_BANK enabled questions
+        are taken from the cross-project question bank per library as well. `libraries` lists
+        (name, total usage) pairs, most used first; by default they are read from the report's
+        ranking table. `versions` maps libraries to the analyzed project's versions for the
+        question bank key.
+        """
+        settings = load_question_config()
+        if settings["fanout"] > 0 or settings["bank"] is not None:
+            if libraries is None:
+                libraries = ranked_libraries(markdown_content)
+            if libraries:
+                bank = self.question_bank(settings["bank"]) if settings["bank"] is not None else None
+                return await self.generate_questions_fanout(
+                    markdown_content, libraries[:settings["fanout"] or BANK_LIBRARIES],
+                    settings["limit"], settings["concurrency"], bank, versions
+                )
         
         prompt = f"""Based on the project tech stack analysis report, generate targeted skill assessment questions. For common libraries, test deep understanding; for specialized libraries, focus on basic knowledge assessment.
 
@@ -45,20 +240,7 @@ Please generate 5-7 questions based on library usage in the analysis report. Pri
 
 Output format requirements:
 
-<questions>
-<question>
-<text>In-depth question targeting specific library</text>
-<category>Category (e.g., Data Processing, Web Framework, AI/ML, etc.)</category>
-<type>multiple_choice</type>
-<options>
-<option>Technical Option A (demonstrates deep understanding)</option>
-<option>Technical Option B (common knowledge)</option>
-<option>Technical Option C (basic familiarity)</option>
-<option>Other (please specify)</option>
-<option>Not familiar with this library</option>
-</options>
-</question>
-</questions>
+{QUESTION_FORMAT}
 
 ## Project Tech Stack Usage Analysis:
 {markdown_content}
@@ -66,32 +248,121 @@ Output format requirements:
 Focus: Generate in-depth questions for frequently used libraries, reflecting VibeDock's intelligent adaptation professionalism.
 """
 
-        system_message = """You are a skill assessment expert for VibeDock's intelligent adaptation system.
-
-Your expertise:
-- Designing layered questions based on library popularity and complexity
-- Common libraries (pandas, numpy, requests, django, etc.): Deep technical questions testing best practices
-- Specialized libraries (domain-specific tools): Basic knowledge questions understanding application scenarios
-- Question design reflects progressive learning paths, helping identify real skill levels
-
-Design principles:
-- Option design should have clear differentiation, reflecting different proficiency levels
-- Deep questions should include common scenarios from actual development
-- Avoid purely theoretical questions, focus on practical application abilities"""
-
-        response = await self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=1500,
-            temperature=0.6
-        )
+        with tracer.span("llm.generate_questions", "llm", model=self.model) as span:
+            response = await self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": QUESTION_SYSTEM_MESSAGE},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=1500,
+                temperature=0.6
+            )
+            tracer.record_llm_usage(span, response)
         
         response_text = response.choices[0].message.content
         return self._extract_questions(response_text)
     
+    async def generate_questions_fanout(self, markdown_content: str, libraries: List[Tuple[str, int]],
+                                        limit: int = 7, max_concurrency: int = 4,
+                                        bank: Optional["QuestionBank"] = None,
+                                        versions: Optional[Dict[str, str]] = None) -> List[Dict[str, str]]:
+        """
+        Generate questions with one small concurrent request per library.
+
+        Questions are allocated by usage (allocate_questions), results are merged in rank
+        order, deduplicated (near-duplicates within a library, exact repeats across
+        libraries) and capped at `limit`. A failed library is skipped; the error is
+        raised only when every request fails.
+
+        With a question bank, libraries whose (version range, depth tier) already has enough
+        stored questions are served from it without a request; the others only ask for the
+        missing questions and store what they get back.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        plan = allocate_questions(libraries, limit)
+        versions = versions or {}
+        keys = {
+            library: bank.key(library, depth_tier(count), versions.get(library)) for library, _, count in plan
+        } if bank else {}
+        served = []
+
+        async def generate(library: str, usage: int, count: int) -> List[Dict]:
+            cached = bank.sample(*keys[library], count) if bank else []
+            if len(cached) >= count:
+                served.append(library)
+                return cached
+            missing = count - len(cached)
+            async with semaphore:
+                with tracer.span("llm.generate_questions", "llm", model=self.model, library=library) as span:
+                    response = await self.client.chat.completions.create(
+                        model=self.model,
+                        messages=[
+                            {"role": "system", "content": QUESTION_SYSTEM_MESSAGE},
+                            {"role": "user", "content": self._library_prompt(
+                                markdown_content, library, usage, missing, depth_tier(count)
+                            )}
+                        ],
+                        max_tokens=TOKENS_PER_QUESTION * missing,
+                        temperature=0.6
+                    )
+                    tracer.record_llm_usage(span, response)
+            generated = self._extract_questions(response.choices[0].message.content)
+            new = [q for q in dedupe_questions(cached + generated) if q not in cached][:missing]
+            if bank:
+                bank.add(*keys[library], new, model=self.model)
+            return cached + new
+
+        results = await asyncio.gather(
+            *(generate(library, usage, count) for library, usage, count in plan),
+            return_exceptions=True
+        )
+
+        questions = []
+        errors = []
+        for (library, _, _), result in zip(plan, results):
+            if isinstance(result, BaseException):
+                self.console.print(f"[yellow]Question generation for {library} failed: {result}[/yellow]")
+                errors.append(result)
+            else:
+                questions.extend(dedupe_questions(result))
+        if errors and len(errors) == len(plan):
+            raise errors[0]
+        if served:
+            self.console.print(f"[dim]Question bank: reused questions for {', '.join(served)}[/dim]")
+        # Questions about different libraries legitimately share wording; across libraries only
+        # identical questions are dropped
+        return dedupe_questions(questions, similarity=1.0)[:limit]
+
+    def _library_prompt(self, markdown_content: str, library: str, usage: int, count: int,
+                        tier: Optional[str] = None) -> str:
+        """Prompt asking for `count` questions about a single library at the given depth tier"""
+        details = _library_section(markdown_content, library)
+        depth = (
+            "This is one of the project's most used libraries: test deep understanding, best practices and pitfalls."
+            if (tier or depth_tier(count)) == "deep" else
+            "Focus on basic usage and application scenarios."
+        )
+        return f"""Based on how this project uses {library}, generate targeted skill assessment questions about {library} only.
+
+{depth}
+Cover different question types (conceptual understanding, practical application, problem solving, best practices) and refer to the APIs the project actually uses.
+
+Generate exactly {count} question{'s' if count > 1 else ''}.
+
+Output format requirements:
+
+{QUESTION_FORMAT}
+
+## {library} Usage in This Project:
+
+| Rank | Library | Usage Count |
+|------|---------|-------------|
+| 1 | {library} | {usage} |
+
+{details}
+"""
+
     def _extract_questions(self, response_text: str) -> List[Dict]:
         """Extract questions from XML tags using regex"""
         questions = []
@@ -129,14 +400,7 @@ Design principles:
         self.console.print("\n[bold blue]Before we start the technical assessment...[/bold blue]")
         self.console.print("[yellow]What is your primary goal with this project?[/yellow]")
         
-        purposes = [
-            "Active development - I want to contribute code to this project",
-            "Learning - I want to understand how this project works", 
-            "Maintenance - I need to maintain/debug existing code",
-            "Integration - I want to integrate this project into my work",
-            "Evaluation - I'm evaluating this project for potential use",
-            "Other (please specify)"
-        ]
+        purposes = USER_PURPOSES
         
         self.console.print("\n[dim]Options:[/dim]")
         for idx, purpose in enumerate(purposes, 1):
@@ -160,6 +424,46 @@ Design principles:
             except ValueError:
                 self.console.print("[red]Please enter a valid number[/red]")
     
+    def resolve_purpose(self, purpose: Any) -> str:
+        """Resolve a scripted purpose given as an option number or free text"""
+        if purpose is None or purpose == '':
+            return ""
+        if isinstance(purpose, int) or (isinstance(purpose, str) and purpose.strip().isdigit()):
+            choice_idx = int(purpose) - 1
+            if 0 <= choice_idx < len(USER_PURPOSES):
+                return USER_PURPOSES[choice_idx]
+            raise ValueError(f"Purpose must be between 1 and {len(USER_PURPOSES)}, got {purpose}")
+        return str(purpose).strip()
+
+    def answers_from_record(self, questions: List[Dict], record_answers: Any) -> Dict[str, str]:
+        """Map scripted answers onto questions without prompting
+
+        Answers are matched by position (list), by 1-based question number or by question
+        text (mapping). Numeric answers to multiple choice questions select an option.
+        """
+        answers = {}
+        for i, q_data in enumerate(questions, 1):
+            if isinstance(record_answers, list):
+                value = record_answers[i - 1] if i <= len(record_answers) else None
+            elif isinstance(record_answers, dict):
+                value = record_answers.get(str(i), record_answers.get(i, record_answers.get(q_data['question'])))
+            else:
+                value = None
+
+            if value is None:
+                answers[q_data['question']] = "No answer provided"
+            elif q_data['type'] == 'multiple_choice' and q_data['options'] and (
+                isinstance(value, int) or (isinstance(value, str) and value.strip().isdigit())
+            ):
+                choice_idx = int(value) - 1
+                if not 0 <= choice_idx < len(q_data['options']):
+                    raise ValueError(f"Question {i}: option must be between 1 and {len(q_data['options'])}, got {value}")
+                answers[q_data['question']] = q_data['options'][choice_idx]
+            else:
+                answers[q_data['question']] = str(value).strip()
+
+        return answers
+
     def collect_answers(self, questions: List[Dict]) -> Dict[str, str]:
         """Collect user answers interactively"""
         answers = {}
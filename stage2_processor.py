@@ -1,30 +1,51 @@
 import re
-import os
-from typing import List, Dict
-from openai import AsyncOpenAI
-from dotenv import load_dotenv
+import asyncio
+from typing import Callable, List, Dict, Optional
+from rich.console import Console
+from config import create_async_client, load_config, load_gap_config
+from vibehacks.profiling import tracer
+
+PRIORITY_ORDER = {'HIGH': 1, 'MEDIUM': 2, 'LOW': 3}
+PRIORITY_EMOJI = {'HIGH': '🔴', 'MEDIUM': '🟡', 'LOW': '🟢'}
+
+GAP_ANALYSIS_TASK = """You are a senior tech lead. Your task is to perform a comprehensive gap analysis. You will be given:
+1. A technical stack usage analysis (showing specific libraries, usage counts, methods, classes)
+2. A Q&A record of a user's technical proficiency
+3. The user's stated purpose for engaging with this project"""
 
-load_dotenv()
 
 class UniversalStage2Processor:
     def __init__(self):
-        self.client = AsyncOpenAI(
-            base_url=os.getenv("BASE_URL"),
-            api_key=os.getenv("API_KEY")
-        )
-        self.model = os.getenv("MODEL")
-        
-    async def generate_gap_report(self, markdown_content: str, qa_markdown: str, user_purpose: str = "") -> Dict:
-        """Generate gap assessment report using XML tags"""
-        
-        purpose_context = ""
-        if user_purpose:
-            purpose_context = f"\n\n## User's Purpose\n{user_purpose}\n\nIMPORTANT: Tailor your gap analysis and recommendations specifically to this user's stated purpose. Focus on the skills and knowledge most relevant to their goals."
+        self.console = Console()
+        self.model = load_config()["model"]
+        self._client = None
+
+    @property
+    def client(self):
+        """API client, built on first use"""
+        if self._client is None:
+            self._client = create_async_client()
+        return self._client
         
-        prompt = f"""You are a senior tech lead. Your task is to perform a comprehensive gap analysis. You will be given:
-1. A technical stack usage analysis (showing specific libraries, usage counts, methods, classes)
-2. A Q&A record of a user's technical proficiency
-3. The user's stated purpose for engaging with this project
+    async def generate_gap_report(self, markdown_content: str, qa_markdown: str, user_purpose: str = "",
+                                  code_context: str = "",
+                                  on_gap: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """
+        Generate gap assessment report using XML tags
+
+        `code_context` holds dependency source excerpts retrieved for the symbols the
+        project uses (see vibehacks.retrieval); it is appended to the prompt when given.
+        With GAP_PARALLEL=1 the report is built in two phases instead (see
+        generate_gap_report_parallel); `on_gap` is then called with each gap as it completes.
+        """
+        settings = load_gap_config()
+        if settings["parallel"]:
+            return await self.generate_gap_report_parallel(
+                markdown_content, qa_markdown, user_purpose, code_context,
+                settings["concurrency"], on_gap
+            )
+
+        prompt = f"""{GAP_ANALYSIS_TASK}
 
 Your analysis should:
 - Identify what technologies are actually used in the project (from the usage analysis)
@@ -53,25 +74,177 @@ List the key technologies/libraries actually used in this project based on the u
 </gaps>
 </gap_assessment>
 
-## Project Technical Stack Usage Analysis
+{self._analysis_inputs(markdown_content, qa_markdown, user_purpose, code_context)}
+
+Analyze the actual usage patterns in the project and provide priority-ranked, purpose-specific recommendations."""
+
+        with tracer.span("llm.generate_gap_report", "llm", model=self.model) as span:
+            response = await self.client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=2000,
+                temperature=0.7
+            )
+            tracer.record_llm_usage(span, response)
+        
+        response_text = response.choices[0].message.content
+        return self._extract_gap_assessment(response_text)
+
+    def _analysis_inputs(self, markdown_content: str, qa_markdown: str, user_purpose: str = "",
+                         code_context: str = "") -> str:
+        """Prompt sections holding the usage analysis, Q&A record, purpose and source excerpts"""
+        purpose_context = ""
+        if user_purpose:
+            purpose_context = f"\n\n## User's Purpose\n{user_purpose}\n\nIMPORTANT: Tailor your gap analysis and recommendations specifically to this user's stated purpose. Focus on the skills and knowledge most relevant to their goals."
+
+        source_context = ""
+        if code_context:
+            source_context = f"\n\n## Relevant Dependency Source Excerpts\n\nThese excerpts come from the dependencies' own source code and match the symbols this project uses. Refer to the actual APIs shown here when describing gaps and recommendations.\n\n{code_context}"
+
+        return f"""## Project Technical Stack Usage Analysis
 
 {markdown_content}
 
 ## User Q&A Record
 
-{qa_markdown}{purpose_context}
+{qa_markdown}{purpose_context}{source_context}"""
 
-Analyze the actual usage patterns in the project and provide priority-ranked, purpose-specific recommendations."""
+    async def generate_gap_report_parallel(self, markdown_content: str, qa_markdown: str, user_purpose: str = "",
+                                           code_context: str = "", max_concurrency: int = 4,
+                                           on_gap: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """
+        Generate the gap report in two phases.
+
+        A short first call lists the gap areas with priorities and levels; then one call per
+        area writes its description and recommendation, concurrently. The per-area prompts
+        share one prefix (task and analysis inputs) so provider-side prompt caching applies.
+        `on_gap` receives each completed gap in completion order; the returned dict keeps the
+        outline's order and has the shape format_gap_report expects. A failed area is
+        skipped; the error is raised only when every area fails.
+        """
+        inputs = self._analysis_inputs(markdown_content, qa_markdown, user_purpose, code_context)
+        outline = await self._generate_gap_areas(inputs)
+        if not outline["gaps"]:
+            return outline
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def describe(gap: Dict):
+            async with semaphore:
+                with tracer.span("llm.gap_detail", "llm", model=self.model, area=gap["area"]) as span:
+                    response = await self.client.chat.completions.create(
+                        model=self.model,
+                        messages=[{"role": "user", "content": self._gap_detail_prompt(inputs, gap)}],
+                        max_tokens=600,
+                        temperature=0.7
+                    )
+                    tracer.record_llm_usage(span, response)
+            response_text = response.choices[0].message.content
+            desc_match = re.search(r'<description>(.*?)</description>', response_text, re.DOTALL)
+            rec_match = re.search(r'<recommendation>(.*?)</recommendation>', response_text, re.DOTALL)
+            if not (desc_match and rec_match):
+                raise ValueError(f"No description or recommendation returned for {gap['area']}")
+            gap["gap_description"] = desc_match.group(1).strip()
+            gap["recommendation"] = rec_match.group(1).strip()
+
+        async def detail(index: int, gap: Dict):
+            try:
+                await describe(gap)
+            except Exception as e:
+                self.console.print(f"[yellow]Gap detail generation for {gap['area']} failed: {e}[/yellow]")
+                errors.append(e)
+            else:
+                completed.add(index)
+                if on_gap:
+                    on_gap(gap)
+
+        completed, errors = set(), []
+        await asyncio.gather(*(detail(i, gap) for i, gap in enumerate(outline["gaps"])))
+        if errors and not completed:
+            raise errors[0]
+
+        outline["gaps"] = [gap for i, gap in enumerate(outline["gaps"]) if i in completed]
+        return outline
+
+    async def _generate_gap_areas(self, inputs: str) -> Dict:
+        """Phase one: summary, tech stack and the gap areas with priorities, without details"""
+        prompt = f"""{GAP_ANALYSIS_TASK}
+
+In this first step only identify the gaps: do not write descriptions or recommendations yet.
+Identify what technologies are actually used in the project (from the usage analysis), compare the user's proficiency with them and rank the gaps by what's most critical for the user's stated purpose.
+
+Please provide your response in the following XML format:
+
+<gap_areas>
+<summary>
+A high-level summary of the gap analysis tailored to the user's purpose (2-3 sentences)
+</summary>
+<project_tech_stack>
+List the key technologies/libraries actually used in this project based on the usage analysis
+</project_tech_stack>
+<gap>
+<area>Technical area name (e.g., Frontend Framework)</area>
+<priority>HIGH/MEDIUM/LOW based on user's purpose</priority>
+<current_level>User's current proficiency level in this area</current_level>
+<required_level>Level needed for user's stated purpose</required_level>
+</gap>
+</gap_areas>
+
+{inputs}"""
+
+        with tracer.span("llm.gap_areas", "llm", model=self.model) as span:
+            response = await self.client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=800,
+                temperature=0.7
+            )
+            tracer.record_llm_usage(span, response)
 
-        response = await self.client.chat.completions.create(
-            model=self.model,
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=2000,
-            temperature=0.7
-        )
-        
         response_text = response.choices[0].message.content
-        return self._extract_gap_assessment(response_text)
+        result = {"summary": "", "project_tech_stack": "", "gaps": []}
+        summary_match = re.search(r'<summary>(.*?)</summary>', response_text, re.DOTALL)
+        if summary_match:
+            result["summary"] = summary_match.group(1).strip()
+        tech_stack_match = re.search(r'<project_tech_stack>(.*?)</project_tech_stack>', response_text, re.DOTALL)
+        if tech_stack_match:
+            result["project_tech_stack"] = tech_stack_match.group(1).strip()
+
+        for gap_block in re.findall(r'<gap>(.*?)</gap>', response_text, re.DOTALL):
+            area_match = re.search(r'<area>(.*?)</area>', gap_block, re.DOTALL)
+            priority_match = re.search(r'<priority>(.*?)</priority>', gap_block, re.DOTALL)
+            current_level_match = re.search(r'<current_level>(.*?)</current_level>', gap_block, re.DOTALL)
+            required_level_match = re.search(r'<required_level>(.*?)</required_level>', gap_block, re.DOTALL)
+            if area_match:
+                result["gaps"].append({
+                    "area": area_match.group(1).strip(),
+                    "priority": priority_match.group(1).strip() if priority_match else "MEDIUM",
+                    "current_level": current_level_match.group(1).strip() if current_level_match else "Unknown",
+                    "required_level": required_level_match.group(1).strip() if required_level_match else "Unknown",
+                })
+        return result
+
+    def _gap_detail_prompt(self, inputs: str, gap: Dict) -> str:
+        """Phase two: description and recommendation for one gap area"""
+        return f"""{GAP_ANALYSIS_TASK}
+
+{inputs}
+
+## Gap Area
+
+Gap area: {gap['area']}
+Priority: {gap['priority']}
+Current level: {gap['current_level']}
+Required level: {gap['required_level']}
+
+Describe this one gap between the project's needs and the user's skills, and give a specific, actionable recommendation with learning resources/steps. Refer to how the project actually uses the technology.
+
+Please provide your response in the following XML format:
+
+<gap_detail>
+<description>Description of the gap between project needs and user skills</description>
+<recommendation>Specific, actionable recommendation with learning resources/steps</recommendation>
+</gap_detail>"""
     
     def _extract_gap_assessment(self, response_text: str) -> Dict:
         """Extract gap assessment from XML tags using regex"""
@@ -130,25 +303,29 @@ Analyze the actual usage patterns in the project and provide priority-ranked, pu
             markdown += "## Assessment Results\n\nNo specific gaps were identified.\n"
         else:
             # Sort gaps by priority (HIGH > MEDIUM > LOW)
-            priority_order = {'HIGH': 1, 'MEDIUM': 2, 'LOW': 3}
-            sorted_gaps = sorted(gaps, key=lambda x: priority_order.get(x.get('priority', 'MEDIUM'), 2))
+            sorted_gaps = sorted(gaps, key=lambda x: PRIORITY_ORDER.get(x.get('priority', 'MEDIUM'), 2))
             
             markdown += "## Gap Analysis Results\n\n"
             
             for gap in sorted_gaps:
-                priority = gap.get('priority', 'MEDIUM')
-                priority_emoji = {'HIGH': '🔴', 'MEDIUM': '🟡', 'LOW': '🟢'}.get(priority, '🟡')
-                
-                markdown += f"### {priority_emoji} {gap.get('area', 'N/A')} [{priority} Priority]\n\n"
-                
-                # Skill levels comparison
-                current = gap.get('current_level', 'Unknown')
-                required = gap.get('required_level', 'Unknown')
-                if current != 'Unknown' and required != 'Unknown':
-                    markdown += f"**Current Level:** {current} | **Required Level:** {required}\n\n"
-                
-                markdown += f"**Gap:** {gap.get('gap_description', 'N/A')}\n\n"
-                markdown += f"**Action Plan:** {gap.get('recommendation', 'N/A')}\n\n"
+                markdown += self.format_gap(gap)
                 markdown += "---\n\n"
         
-        return markdown.strip()
\ No newline at end of file
+        return markdown.strip()
+
+    def format_gap(self, gap: Dict) -> str:
+        """Format one gap as a markdown section"""
+        priority = gap.get('priority', 'MEDIUM')
+        priority_emoji = PRIORITY_EMOJI.get(priority, '🟡')
+        
+        markdown = f"### {priority_emoji} {gap.get('area', 'N/A')} [{priority} Priority]\n\n"
+        
+        # Skill levels comparison
+        current = gap.get('current_level', 'Unknown')
+        required = gap.get('required_level', 'Unknown')
+        if current != 'Unknown' and required != 'Unknown':
+            markdown += f"**Current Level:** {current} | **Required Level:** {required}\n\n"
+        
+        markdown += f"**Gap:** {gap.get('gap_description', 'N/A')}\n\n"
+        markdown += f"**Action Plan:** {gap.get('recommendation', 'N/A')}\n\n"
+        return markdown
\ No newline at end of file
@@ -6,21 +6,114 @@ and user proficiency assessment.
 """
 
 import asyncio
+import hashlib
+import json
 import os
-from typing import Dict, Optional
+import re
+from typing import Any, Dict, List, Optional, Tuple
 from rich.console import Console
-from stage1_processor import UniversalStage1Processor
+from config import load_config, load_retrieval_config
+from stage1_processor import UniversalStage1Processor, load_answer_records
 from stage2_processor import UniversalStage2Processor
 
 
 class TechStackQuestionnaire:
     """Main class for conducting tech stack questionnaire and gap analysis"""
     
-    def __init__(self, input_file: str = 'report.md'):
+    def __init__(self, input_file: str = 'report.md', answers_source: Optional[str] = None,
+                 questions_file: str = 'questions.json', output_dir: str = os.path.join('output', 'assessments')):
         self.console = Console()
         self.input_file = input_file
+        self.questions_file = questions_file
+        self.output_dir = output_dir
         self.stage1 = UniversalStage1Processor()
         self.stage2 = UniversalStage2Processor()
+        # Scripted answers make the assessment non-interactive
+        self.answer_records = load_answer_records(answers_source) if answers_source else None
+        self._code_context = None
+
+    def code_context(self) -> str:
+        """
+        Dependency source excerpts for the Stage-2 prompt, retrieved once per run.
+
+        Uses the usage data saved next to the analysis report and the ingested
+        repositories under `output/`; empty when either is missing.
+        """
+        if self._code_context is None:
+            from vibehacks.retrieval import context_for_report
+
+            try:
+                self._code_context = context_for_report(self.input_file, **load_retrieval_config())
+            except Exception as e:
+                self.console.print(f"[yellow]Dependency source retrieval skipped: {e}[/yellow]")
+                self._code_context = ""
+        return self._code_context
+
+    def saved_usage(self) -> Optional[Dict[str, Dict]]:
+        """Third-party usage data saved next to the analysis report, or None when missing"""
+        from vibehacks.retrieval import usage_path
+
+        try:
+            with open(usage_path(self.input_file), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def ranked_libraries(self) -> Optional[List[Tuple[str, int]]]:
+        """
+        Third-party libraries with their total usage, most used first.
+
+        Read from the usage data saved next to the analysis report, which unlike the
+        report's ranking table excludes standard-library and project modules.
+        """
+        usage_data = self.saved_usage()
+        if usage_data is None:
+            return None
+        return sorted(
+            ((package, entry.get('total_usage', 0)) for package, entry in usage_data.items()),
+            key=lambda item: -item[1]
+        )
+
+    async def get_questions(self, markdown_content: str) -> List[Dict]:
+        """
+        Generate questions once per project analysis and reuse them across users.
+
+        Questions are cached in `questions_file` keyed by the hash of the analysis report,
+        so every user answering the same project shares one Stage-1 LLM call.
+        """
+        report_hash = hashlib.sha256(markdown_content.encode('utf-8')).hexdigest()
+
+        if os.path.exists(self.questions_file):
+            try:
+                with open(self.questions_file, 'r', encoding='utf-8') as f:
+                    cached = json.load(f)
+                if cached.get('report_sha256') == report_hash and cached.get('questions'):
+                    self.console.print(f"[dim]Reusing {len(cached['questions'])} questions from '{self.questions_file}'[/dim]")
+                    return cached['questions']
+            except (OSError, json.JSONDecodeError):
+                pass
+
+        versions = {
+            package: entry['version'] for package, entry in (self.saved_usage() or {}).items() if entry.get('version')
+        }
+        questions = await self.stage1.generate_questions(markdown_content, self.ranked_libraries(), versions)
+        if questions:
+            with open(self.questions_file, 'w', encoding='utf-8') as f:
+                json.dump({'report_sha256': report_hash, 'questions': questions}, f, indent=2, ensure_ascii=False)
+        return questions
+
+    def show_gap(self, gap: Dict) -> None:
+        """Render one gap as soon as it is ready (two-phase gap reports, GAP_PARALLEL=1)"""
+        from rich.markdown import Markdown
+
+        self.console.print(Markdown(self.stage2.format_gap(gap)))
+
+    def _user_dir(self, user: str) -> str:
+        """Output directory for one user's assessment files"""
+        safe_name = re.sub(r'[^\w.-]+', '_', str(user)).strip('._') or 'user'
+        path = os.path.join(self.output_dir, safe_name)
+        os.makedirs(path, exist_ok=True)
+        return path
         
     async def run_full_assessment(self) -> Dict[str, str]:
         """
@@ -36,8 +129,8 @@ class TechStackQuestionnaire:
         self.console.print("[bold green]Starting the Tech Stack Questionnaire...[/bold green]")
         
         # Show current configuration
-        self.console.print(f"[dim]Using API: {os.getenv('BASE_URL')}[/dim]")
-        self.console.print(f"[dim]Model: {os.getenv('MODEL')}[/dim]")
+        self.console.print(f"[dim]Using API: {load_config()['base_url']}[/dim]")
+        self.console.print(f"[dim]Model: {load_config()['model']}[/dim]")
 
         # Check input file
         if not os.path.exists(self.input_file):
@@ -48,8 +141,16 @@ class TechStackQuestionnaire:
         with open(self.input_file, 'r', encoding='utf-8') as f:
             markdown_content = f.read()
 
+        if self.answer_records and len(self.answer_records) > 1:
+            return await self.run_assessments(markdown_content)
+
+        record = self.answer_records[0] if self.answer_records else None
+
         # Get user purpose
-        user_purpose = self.stage1.ask_user_purpose()
+        if record:
+            user_purpose = self.stage1.resolve_purpose(record.get('purpose'))
+        else:
+            user_purpose = self.stage1.ask_user_purpose()
         self.console.print(f"[dim]Your purpose: {user_purpose}[/dim]")
 
         # Stage 1: Generate questions and collect answers
@@ -58,7 +159,7 @@ class TechStackQuestionnaire:
         try:
             # Generate questions
             self.console.print("Generating tailored questions from tech stack analysis...")
-            questions = await self.stage1.generate_questions(markdown_content)
+            questions = await self.get_questions(markdown_content)
             
             if not questions:
                 self.console.print("[bold red]Could not generate any questions from the document.[/bold red]")
@@ -67,7 +168,10 @@ class TechStackQuestionnaire:
             self.console.print(f"[bold green]Generated {len(questions)} questions[/bold green]")
             
             # Collect answers
-            answers = self.stage1.collect_answers(questions)
+            if record:
+                answers = self.stage1.answers_from_record(questions, record.get('answers'))
+            else:
+                answers = self.stage1.collect_answers(questions)
             qa_markdown = self.stage1.format_qa_markdown(answers)
             
             # Save Q&A record
@@ -85,7 +189,9 @@ class TechStackQuestionnaire:
         
         try:
             self.console.print("Analyzing gaps and generating personalized recommendations...")
-            report = await self.stage2.generate_gap_report(markdown_content, qa_markdown, user_purpose)
+            report = await self.stage2.generate_gap_report(
+                markdown_content, qa_markdown, user_purpose, self.code_context(), on_gap=self.show_gap
+            )
             
             if not report:
                 self.console.print("[bold red]Could not generate the gap assessment report.[/bold red]")
@@ -127,14 +233,18 @@ class TechStackQuestionnaire:
         with open(self.input_file, 'r', encoding='utf-8') as f:
             markdown_content = f.read()
 
-        user_purpose = self.stage1.ask_user_purpose()
+        record = self.answer_records[0] if self.answer_records else None
+        user_purpose = self.stage1.resolve_purpose(record.get('purpose')) if record else self.stage1.ask_user_purpose()
         
         try:
-            questions = await self.stage1.generate_questions(markdown_content)
+            questions = await self.get_questions(markdown_content)
             if not questions:
                 return None
                 
-            answers = self.stage1.collect_answers(questions)
+            if record:
+                answers = self.stage1.answers_from_record(questions, record.get('answers'))
+            else:
+                answers = self.stage1.collect_answers(questions)
             qa_markdown = self.stage1.format_qa_markdown(answers)
             
             qa_file = 'qa_record.md'
@@ -147,12 +257,25 @@ class TechStackQuestionnaire:
             self.console.print(f"[bold red]Stage 1 failed: {str(e)}[/bold red]")
             return None
 
-    async def run_stage2_only(self, qa_file: str = 'qa_record.md', user_purpose: str = "") -> Optional[str]:
-        """Run only stage 2 (gap analysis) with existing Q&A data"""
+    async def run_stage2_only(self, qa_file: str = 'qa_record.md', user_purpose: str = "",
+                              qa_records: Optional[List[Dict[str, Any]]] = None,
+                              max_concurrency: int = 8) -> Optional[Any]:
+        """
+        Run only stage 2 (gap analysis) with existing Q&A data
+
+        When `qa_records` is given, every record ({'user', 'qa_markdown' or 'qa_file', 'user_purpose'})
+        is analyzed concurrently against the same project analysis, and a mapping of
+        user -> gap report path is returned instead of a single path.
+        """
         
         if not os.path.exists(self.input_file):
             self.console.print(f"[bold red]Error: Input file '{self.input_file}' not found.[/bold red]")
             return None
+
+        if qa_records is not None:
+            with open(self.input_file, 'r', encoding='utf-8') as f:
+                markdown_content = f.read()
+            return await self._run_stage2_records(markdown_content, qa_records, max_concurrency)
             
         if not os.path.exists(qa_file):
             self.console.print(f"[bold red]Error: Q&A file '{qa_file}' not found.[/bold red]")
@@ -165,7 +288,9 @@ class TechStackQuestionnaire:
             qa_markdown = f.read()
 
         try:
-            report = await self.stage2.generate_gap_report(markdown_content, qa_markdown, user_purpose)
+            report = await self.stage2.generate_gap_report(
+                markdown_content, qa_markdown, user_purpose, self.code_context(), on_gap=self.show_gap
+            )
             if not report:
                 return None
                 
@@ -181,19 +306,93 @@ class TechStackQuestionnaire:
             self.console.print(f"[bold red]Stage 2 failed: {str(e)}[/bold red]")
             return None
 
+    async def _run_stage2_records(self, markdown_content: str, qa_records: List[Dict[str, Any]],
+                                  max_concurrency: int = 8) -> Dict[str, str]:
+        """Generate gap reports for many Q&A records concurrently"""
+        semaphore = asyncio.Semaphore(max_concurrency)
+        code_context = self.code_context()
+
+        async def process(record: Dict[str, Any]) -> Optional[str]:
+            user = record.get('user', 'user')
+            qa_markdown = record.get('qa_markdown')
+            if qa_markdown is None:
+                with open(record['qa_file'], 'r', encoding='utf-8') as f:
+                    qa_markdown = f.read()
+
+            async with semaphore:
+                try:
+                    report = await self.stage2.generate_gap_report(
+                        markdown_content, qa_markdown, record.get('user_purpose', ""), code_context
+                    )
+                except Exception as e:
+                    self.console.print(f"[bold red]Stage 2 failed for {user}: {str(e)}[/bold red]")
+                    return None
+
+            if not report:
+                return None
+
+            report_file = os.path.join(self._user_dir(user), 'gap_summary.md')
+            with open(report_file, 'w', encoding='utf-8') as f:
+                f.write(self.stage2.format_gap_report(report))
+            self.console.print(f"[green]✓ {user}: {len(report.get('gaps', []))} gaps -> {report_file}[/green]")
+            return report_file
+
+        results = await asyncio.gather(*(process(record) for record in qa_records))
+        return {
+            record.get('user', 'user'): report_file
+            for record, report_file in zip(qa_records, results)
+            if report_file
+        }
+
+    async def run_assessments(self, markdown_content: str, max_concurrency: int = 8) -> Dict[str, Any]:
+        """
+        Run a headless assessment for every scripted answer record.
+
+        Questions are generated once and shared by all users; each user's Q&A record and
+        gap report are written to their own directory under `output_dir`.
+        """
+        questions = await self.get_questions(markdown_content)
+        if not questions:
+            self.console.print("[bold red]Could not generate any questions from the document.[/bold red]")
+            return {}
+
+        qa_records = []
+        for record in self.answer_records:
+            user = record['user']
+            answers = self.stage1.answers_from_record(questions, record.get('answers'))
+            qa_markdown = self.stage1.format_qa_markdown(answers)
+            qa_file = os.path.join(self._user_dir(user), 'qa_record.md')
+            with open(qa_file, 'w', encoding='utf-8') as f:
+                f.write(qa_markdown)
+            qa_records.append({
+                'user': user,
+                'qa_markdown': qa_markdown,
+                'user_purpose': self.stage1.resolve_purpose(record.get('purpose')),
+            })
+
+        self.console.print(f"[bold blue]Analyzing gaps for {len(qa_records)} users...[/bold blue]")
+        reports = await self._run_stage2_records(markdown_content, qa_records, max_concurrency)
+
+        return {
+            'questions_count': len(questions),
+            'users_count': len(qa_records),
+            'gap_reports': reports,
+        }
+
 
 # Convenience function for the main workflow
-async def run_questionnaire(input_file: str = 'report.md') -> Dict[str, str]:
+async def run_questionnaire(input_file: str = 'report.md', answers_source: Optional[str] = None) -> Dict[str, Any]:
     """
     Convenience function to run the complete questionnaire workflow
     
     Args:
         input_file: Path to the tech stack analysis markdown file
+        answers_source: Optional JSON/YAML answers file ('-' for stdin) for headless runs
         
     Returns:
         Dictionary with results and file paths
     """
-    questionnaire = TechStackQuestionnaire(input_file)
+    questionnaire = TechStackQuestionnaire(input_file, answers_source)
     return await questionnaire.run_full_assessment()
 
 """
@@ -206,4 +405,7 @@ results = await run_questionnaire('report.md')
 # 或使用类
 questionnaire = TechStackQuestionnaire('report.md')
 results = await questionnaire.run_full_assessment()
+
+# 非交互模式：从JSON/YAML文件或标准输入('-')读取答案，问题按项目只生成一次
+results = await run_questionnaire('report.md', answers_source='answers.json')
 """
\ No newline at end of file
@@ -0,0 +1,42 @@
+"""相对导入属于项目自身，同名的第三方包不被排除"""
+
+import json
+
+from vibehacks.analyzer import ImportAnalyzer
+from vibehacks.graph import first_party_roots
+from vibehacks.retrieval import save_usage, usage_path
+
+
+def _project(root):
+    package = root / "myapp"
+    (package / "clients").mkdir(parents=True)
+    (package / "__init__.py").write_text("")
+    (package / "clients" / "__init__.py").write_text("")
+    # 项目中的封装模块与第三方包同名
+    (package / "clients" / "rich.py").write_text("from rich.console import Console\n\nConsole().print('x')\n")
+    (package / "main.py").write_text(
+        "from .clients.rich import Console\nfrom .clients import rich as wrapper\n\nwrapper.Console()\n"
+    )
+
+
+def test_relative_imports_are_first_party(tmp_path):
+    _project(tmp_path)
+    imports_data, usage_data = ImportAnalyzer(str(tmp_path), verbose=False).analyze_project()
+
+    assert list(imports_data) == ["rich"]
+    assert imports_data["rich"]["files"] == {"myapp/clients/rich.py"}
+    assert usage_data["rich"]["total_usage"] == 1
+
+
+def test_same_named_module_keeps_dependency(tmp_path):
+    _project(tmp_path)
+    analyzer = ImportAnalyzer(str(tmp_path), verbose=False)
+    imports_data, usage_data = analyzer.analyze_project()
+
+    exclude = first_party_roots(analyzer)
+    assert exclude == {"myapp"}
+
+    report = tmp_path / "report.md"
+    save_usage(usage_data, str(report), exclude)
+    with open(usage_path(str(report)), encoding="utf-8") as f:
+        assert list(json.load(f)) == ["rich"]
@@ -0,0 +1,54 @@
+"""footprint_report 按顶级包合并导入与使用"""
+
+from vibehacks.analyzer import ImportAnalyzer
+from vibehacks.footprint import footprint_report
+
+
+class _Index:
+    """只提供 footprint() 的体积索引替身，每个包 50 MB"""
+
+    def footprint(self, import_name):
+        return {
+            "distributions": [f"{import_name.split('.')[0]}==1.0"],
+            "bytes": 50 * 1024 * 1024,
+            "files": 10,
+            "transitive_bytes": 50 * 1024 * 1024,
+            "transitive_files": 10,
+            "dependencies": [],
+        }
+
+
+def _report(tmp_path, files):
+    for name, text in files.items():
+        (tmp_path / name).write_text(text)
+    imports_data, usage_data = ImportAnalyzer(str(tmp_path), verbose=False).analyze_project()
+    return {row["package"]: row for row in footprint_report(imports_data, usage_data, _Index())}
+
+
+def test_dotted_import_alias(tmp_path):
+    rows = _report(tmp_path, {"plot.py": "import matplotlib.pyplot as plt\n\nplt.plot([1])\nplt.show()\n"})
+
+    row = rows["matplotlib"]
+    assert row["usage"] == 2
+    assert row["symbols"] == ["plot", "show"]
+    assert row["bytes_per_usage"] == 25 * 1024 * 1024
+    assert row["heavy"]
+
+
+def test_merges_keys_of_one_top_level(tmp_path):
+    rows = _report(tmp_path, {
+        "a.py": "import rich.console as rc\n\nrc.Console()\n",
+        "b.py": "import rich\nfrom rich.table import Table\n\nTable()\nrich.print()\n",
+    })
+
+    assert list(rows) == ["rich"]
+    assert rows["rich"]["usage"] == 3
+    assert rows["rich"]["files_using"] == ["a.py", "b.py"]
+
+
+def test_unused_package_is_not_heavy(tmp_path):
+    rows = _report(tmp_path, {"a.py": "import numpy\n"})
+
+    assert rows["numpy"]["usage"] == 0
+    assert rows["numpy"]["bytes_per_usage"] is None
+    assert not rows["numpy"]["heavy"]
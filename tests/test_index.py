@@ -0,0 +1,101 @@
+"""ProjectIndex 增量索引与文件监听"""
+
+import os
+import threading
+
+from benchmarks.synthetic import generate_project
+from vibehacks.analyzer import ImportAnalyzer
+from vibehacks.index import ProjectIndex
+from vibehacks.watch import watch
+
+
+def _write(path, text):
+    """写入文件并推后 mtime，保证签名变化"""
+    path.write_text(text)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def _mutate(root):
+    """修改、新增、删除各一个文件，返回变化的相对路径"""
+    files = sorted(path for path in root.rglob("*.py"))
+    modified, removed = files[0], files[-1]
+    _write(modified, modified.read_text() + "\nimport polars as pl\npl.DataFrame({})\n")
+    removed.unlink()
+    added = root / "pkg_new" / "added.py"
+    added.parent.mkdir()
+    _write(added, "from rich.console import Console\nimport requests\n\nConsole().print(requests.get)\n")
+    return {
+        "modified": [str(modified.relative_to(root))],
+        "added": [str(added.relative_to(root))],
+        "removed": [str(removed.relative_to(root))],
+    }
+
+
+def test_refresh_matches_full_analysis(tmp_path):
+    generate_project(str(tmp_path), n_files=30, alias_ratio=0.5, junk_files=0)
+    index = ProjectIndex(str(tmp_path))
+    index.refresh()
+    assert index.refresh() == {"added": [], "modified": [], "removed": []}
+
+    expected_changes = _mutate(tmp_path)
+    assert index.refresh() == expected_changes
+    assert index.results() == ImportAnalyzer(str(tmp_path), verbose=False).analyze_project()
+    assert "polars" in index.imports_data
+
+    # 撤销修改后，只由该文件贡献的数据也随之消失
+    modified = tmp_path / expected_changes["modified"][0]
+    _write(modified, modified.read_text().split("\nimport polars")[0])
+    assert index.refresh()["modified"] == expected_changes["modified"]
+    assert "polars" not in index.imports_data
+    assert index.results() == ImportAnalyzer(str(tmp_path), verbose=False).analyze_project()
+
+
+def test_update_paths_matches_full_analysis(tmp_path):
+    generate_project(str(tmp_path), n_files=30, alias_ratio=0.5, junk_files=0)
+    index = ProjectIndex(str(tmp_path))
+    index.refresh()
+
+    expected_changes = _mutate(tmp_path)
+    changed = [path for paths in expected_changes.values() for path in paths]
+    assert index.update_paths(changed) == expected_changes
+    assert index.results() == ImportAnalyzer(str(tmp_path), verbose=False).analyze_project()
+
+
+def test_relative_project_path(tmp_path, monkeypatch):
+    generate_project(str(tmp_path), n_files=10, junk_files=0)
+    monkeypatch.chdir(tmp_path)
+
+    index = ProjectIndex(".", ImportAnalyzer(".", verbose=False))
+    changes = index.refresh()
+
+    assert len(changes["added"]) == len(index.files) > 0
+    assert all(not path.startswith("/") for path in index.files)
+    assert index.results() == ImportAnalyzer(".", verbose=False).analyze_project()
+
+
+def test_watch_relative_project_path(tmp_path, monkeypatch):
+    generate_project(str(tmp_path), n_files=5, junk_files=0)
+    monkeypatch.chdir(tmp_path)
+    index = ProjectIndex(".", ImportAnalyzer(".", verbose=False))
+    index.refresh()
+
+    stop = threading.Event()
+    seen = []
+
+    def on_change(changes):
+        seen.append(changes)
+        stop.set()
+
+    thread = threading.Thread(
+        target=watch, args=(index, on_change),
+        kwargs={"debounce": 0.05, "poll_interval": 0.05, "use_inotify": False, "stop_event": stop},
+    )
+    thread.start()
+    (tmp_path / "added_module.py").write_text("import tqdm\ntqdm.tqdm([])\n")
+    stop.wait(10)
+    stop.set()
+    thread.join(10)
+
+    assert seen and seen[0]["added"] == ["added_module.py"]
+    assert "tqdm" in index.imports_data
@@ -0,0 +1,51 @@
+"""分片结果的合并与单机分析一致，包括顺序"""
+
+import pytest
+
+from benchmarks.synthetic import generate_project
+from vibehacks.analyzer import ImportAnalyzer
+from vibehacks.partial import PartialResult, merge_partials
+
+
+def _orders(imports_data, usage_data):
+    """结果中所有字典的键顺序"""
+    return (
+        list(imports_data),
+        {package: list(data["aliases"]) for package, data in imports_data.items()},
+        list(usage_data),
+        {
+            package: {kind: list(data[kind]) for kind in ("functions", "classes", "modules")}
+            for package, data in usage_data.items()
+        },
+    )
+
+
+@pytest.fixture(scope="module")
+def project(tmp_path_factory):
+    root = tmp_path_factory.mktemp("project")
+    generate_project(str(root), n_files=60, alias_ratio=0.6, junk_files=0)
+    return root
+
+
+@pytest.mark.parametrize("shard_count", [2, 3, 5])
+def test_merge_matches_single_run(project, tmp_path, shard_count):
+    expected = ImportAnalyzer(str(project), verbose=False).analyze_project()
+
+    partials = []
+    for i in range(1, shard_count + 1):
+        path = tmp_path / f"shard-{i}.json.gz"
+        PartialResult.from_analyzer(ImportAnalyzer(str(project), verbose=False), (i, shard_count)).save(str(path))
+        partials.append(PartialResult.load(str(path)))
+
+    for ordering in (partials, partials[::-1]):
+        merged = merge_partials(ordering)
+        assert merged.missing_shards() == []
+        results = merged.to_results()
+        assert results == expected
+        assert _orders(*results) == _orders(*expected)
+
+
+def test_merge_rejects_overlap(project):
+    partial = PartialResult.from_analyzer(ImportAnalyzer(str(project), verbose=False), (1, 2))
+    with pytest.raises(ValueError):
+        partial.merge(partial)
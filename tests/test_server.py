@@ -0,0 +1,114 @@
+"""分析守护进程的认证与查询"""
+
+import stat
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from benchmarks.synthetic import generate_project
+from vibehacks.analyzer import ImportAnalyzer
+from vibehacks.client import DaemonClient, QueryError
+from vibehacks.server import AnalysisServer
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setenv("VIBEHACKS_CACHE_DIR", str(tmp_path / "cache"))
+    with AnalysisServer(port=0) as server:
+        yield server
+
+
+def _status(server, path="/health", method="GET", headers=None):
+    req = urllib.request.Request(server.url + path, method=method, headers=headers or {})
+    try:
+        with urllib.request.urlopen(req, timeout=5) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def test_token_file_is_private(server):
+    assert stat.S_IMODE(server.token_path.stat().st_mode) == 0o600
+    assert server.token_path.read_text() == server.token
+
+
+def test_rejects_requests_without_token(server):
+    assert _status(server) == 401
+    assert _status(server, "/shutdown", "POST") == 401
+    assert _status(server, headers={"Authorization": "Bearer wrong"}) == 401
+    assert server._thread.is_alive()
+
+
+def test_rejects_cross_site_and_foreign_host(server):
+    auth = {"Authorization": f"Bearer {server.token}"}
+    assert _status(server, headers=auth) == 200
+    assert _status(server, headers={**auth, "Origin": "https://example.com"}) == 403
+    assert _status(server, headers={**auth, "Host": "attacker.example:8787"}) == 403
+
+
+def test_client_reads_token(server, tmp_path):
+    project = tmp_path / "project"
+    generate_project(str(project), n_files=10, junk_files=0)
+    client = DaemonClient(port=server.httpd.server_address[1])
+
+    assert client.request("/health")["status"] == "ok"
+    assert client.analysis(str(project)) == ImportAnalyzer(str(project), verbose=False).analyze_project()
+
+
+def test_client_without_token_file(server):
+    client = DaemonClient(port=server.httpd.server_address[1])
+    server.token_path.unlink()
+    with pytest.raises(QueryError) as error:
+        client.request("/health")
+    assert error.value.status == 401
+
+
+def test_health_during_first_analysis(server, tmp_path, monkeypatch):
+    project = tmp_path / "project"
+    generate_project(str(project), n_files=5, junk_files=0)
+    client = DaemonClient(port=server.httpd.server_address[1], timeout=5)
+
+    started, release = threading.Event(), threading.Event()
+    original = ImportAnalyzer.collect_python_files
+
+    def slow_collect(self):
+        started.set()
+        release.wait(5)
+        return original(self)
+
+    monkeypatch.setattr(ImportAnalyzer, "collect_python_files", slow_collect)
+    thread = threading.Thread(target=client.request, args=("/summary",), kwargs={"project": str(project)})
+    thread.start()
+    try:
+        assert started.wait(5)
+        # 初次分析进行中，健康检查不被阻塞
+        assert client.request("/health")["status"] == "ok"
+    finally:
+        release.set()
+        thread.join(10)
+    assert str(project.resolve()) in client.request("/health")["projects"]
+
+
+def test_failed_first_analysis_is_not_cached(server, tmp_path, monkeypatch):
+    project = tmp_path / "project"
+    generate_project(str(project), n_files=5, junk_files=0)
+    client = DaemonClient(port=server.httpd.server_address[1], timeout=5)
+
+    original = ImportAnalyzer.collect_python_files
+    calls = []
+
+    def failing_once(self):
+        calls.append(1)
+        if len(calls) == 1:
+            raise OSError("磁盘错误")
+        return original(self)
+
+    monkeypatch.setattr(ImportAnalyzer, "collect_python_files", failing_once)
+    with pytest.raises(QueryError) as error:
+        client.request("/summary", project=str(project))
+    assert error.value.status == 500
+    assert str(project.resolve()) not in client.request("/health")["projects"]
+
+    assert client.analysis(str(project)) == ImportAnalyzer(str(project), verbose=False).analyze_project()
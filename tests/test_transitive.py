@@ -0,0 +1,13 @@
+"""依赖汇总按顶级包读取使用"""
+
+from vibehacks.analyzer import ImportAnalyzer
+from vibehacks.transitive import summarize_dependencies
+
+
+def test_summary_of_dotted_import_alias(tmp_path):
+    (tmp_path / "a.py").write_text("import yaml.loader as yl\n\nyl.SafeLoader('')\n")
+    (tmp_path / "b.py").write_text("import yaml.loader as yl\n\nyl.FullLoader('')\n")
+    imports_data, usage_data = ImportAnalyzer(str(tmp_path), verbose=False).analyze_project()
+
+    summary = summarize_dependencies(imports_data, usage_data)
+    assert summary == {"yaml": {"usage": 2, "symbols": ["FullLoader", "SafeLoader"], "files": 2}}
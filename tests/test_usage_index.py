@@ -0,0 +1,74 @@
+"""UsageIndex 的增量更新与重建结果一致"""
+
+import os
+
+from benchmarks.synthetic import generate_project
+from vibehacks.usage_index import UsageIndex
+
+
+def _write(path, text):
+    """写入文件并推后 mtime，保证签名变化"""
+    path.write_text(text)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def _snapshot(index):
+    """所有包的导入文件与使用位置"""
+    packages = [name for name, in index.conn.execute("SELECT name FROM packages ORDER BY name")]
+    return {
+        package: (index.importers(package), index.occurrences(package), index.symbol_counts(package))
+        for package in packages
+        if index.importers(package) or index.occurrences(package)
+    }
+
+
+def test_update_is_incremental(tmp_path, monkeypatch):
+    project = tmp_path / "project"
+    generate_project(str(project), n_files=30, alias_ratio=0.5, junk_files=0)
+
+    with UsageIndex(str(project), db_path=str(tmp_path / "usage.db")) as index:
+        files = sorted(str(path.relative_to(project)) for path in project.rglob("*.py"))
+        assert sorted(index.update()["added"]) == files
+
+        parsed = []
+        original = index.analyzer.parse_file
+        monkeypatch.setattr(index.analyzer, "parse_file", lambda path: parsed.append(path) or original(path))
+
+        # 没有变化的文件不重新解析
+        assert index.update() == {"added": [], "modified": [], "removed": []}
+        assert parsed == []
+
+        modified, removed = project / files[0], project / files[-1]
+        _write(modified, "import polars as pl\n\npl.DataFrame({})\n")
+        removed.unlink()
+        _write(project / "added.py", "from attrs import Factory\n\n\nFactory(list)\n")
+
+        changes = index.update()
+        assert changes == {"added": ["added.py"], "modified": [files[0]], "removed": [files[-1]]}
+        assert sorted(path.name for path in parsed) == sorted(["added.py", modified.name])
+
+        assert index.file_occurrences(files[0]) == [(3, 0, "polars", "classes", "DataFrame")]
+        assert index.file_occurrences("added.py") == [(4, 0, "attrs", "classes", "Factory")]
+        assert index.file_occurrences(files[-1]) == []
+        assert index.stats()["files"] == len(files)
+
+        incremental = _snapshot(index)
+
+    with UsageIndex(str(project), db_path=str(tmp_path / "rebuilt.db")) as rebuilt:
+        rebuilt.update()
+        assert incremental == _snapshot(rebuilt)
+
+
+def test_reopened_index_skips_unchanged(tmp_path):
+    project = tmp_path / "project"
+    generate_project(str(project), n_files=10, junk_files=0)
+    db_path = str(tmp_path / "usage.db")
+
+    with UsageIndex(str(project), db_path=db_path) as index:
+        index.update()
+        before = _snapshot(index)
+
+    with UsageIndex(str(project), db_path=db_path) as index:
+        assert index.update() == {"added": [], "modified": [], "removed": []}
+        assert _snapshot(index) == before
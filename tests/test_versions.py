@@ -0,0 +1,43 @@
+"""版本取自被分析项目，而不是当前解释器"""
+
+from vibehacks.versions import import_versions, project_versions
+
+
+def test_lock_file_before_pins(tmp_path):
+    (tmp_path / "requirements.txt").write_text("requests==2.0.0\nrich>=13\nPyYAML==6.0.1\n")
+    (tmp_path / "uv.lock").write_text(
+        'version = 1\n\n[[package]]\nname = "requests"\nversion = "2.32.3"\n'
+    )
+
+    versions = project_versions(str(tmp_path))
+    assert versions["requests"]["version"] == "2.32.3"
+    assert versions["requests"]["source"] == "lock"
+    assert versions["pyyaml"]["source"] == "pinned"
+    # 只有下限的依赖没有确定的版本
+    assert "rich" not in versions
+
+
+def test_pyproject_pins(tmp_path):
+    (tmp_path / "pyproject.toml").write_text(
+        '[project]\nname = "demo"\ndependencies = ["numpy~=1.26.4", "click[extra]==8.1.7 ; python_version >= \'3.8\'"]\n'
+    )
+    versions = project_versions(str(tmp_path))
+    assert import_versions(["numpy", "click", "pytest"], versions) == {"numpy": "1.26.4", "click": "8.1.7"}
+
+
+def test_ignores_current_interpreter(tmp_path):
+    # pytest 安装在当前解释器中，但项目没有声明或安装它
+    assert project_versions(str(tmp_path)) == {}
+
+
+def test_project_venv(tmp_path):
+    site_packages = tmp_path / ".venv" / "lib" / "python3.12" / "site-packages"
+    dist_info = site_packages / "PyYAML-6.0.2.dist-info"
+    dist_info.mkdir(parents=True)
+    (tmp_path / ".venv" / "pyvenv.cfg").write_text("home = /usr/bin\n")
+    (dist_info / "METADATA").write_text("Metadata-Version: 2.1\nName: PyYAML\nVersion: 6.0.2\n")
+    (dist_info / "top_level.txt").write_text("yaml\n_yaml\n")
+
+    versions = project_versions(str(tmp_path))
+    assert versions["pyyaml"]["source"] == "installed"
+    assert import_versions(["yaml"], versions) == {"yaml": "6.0.2"}
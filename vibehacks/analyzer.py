@@ -3,17 +3,37 @@
 """
 
 import ast
+import mmap
+import re
 import sys
 from collections import Counter, defaultdict
 from pathlib import Path
-from typing import Any, Dict, Set, Tuple
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .profiling import tracer
+
+if TYPE_CHECKING:
+    from .sources import SourceProvider
 
 
 class ImportAnalyzer:
     """分析Python代码中的导入和使用情况"""
 
-    def __init__(self, project_path: str):
+    def __init__(
+        self,
+        project_path: str,
+        verbose: bool = True,
+        packages: Optional[Iterable[str]] = None,
+        source: Optional["SourceProvider"] = None,
+    ):
         self.project_path = Path(project_path)
+        self.verbose = verbose
+        # 指定来源（归档、git版本）时从中读取文件内容，否则遍历 project_path
+        self.source = source
+        # 从来源读取过的全部文件（含被预筛选跳过的）
+        self.source_files: List[str] = []
+        # 只关心指定的包时，解析前先按字节预筛选文件
+        self.packages = sorted(set(packages)) if packages else None
         self.ignore_patterns = {
             "__pycache__",
             ".git",
@@ -125,14 +145,23 @@ class ImportAnalyzer:
         stdlib_modules.update(common_stdlib)
         return stdlib_modules
 
-    def _should_ignore_path(self, path: Path) -> bool:
-        """检查路径是否应该被忽略"""
-        path_str = str(path)
+    def _log(self, message: str):
+        """输出进度信息，静默模式下不输出"""
+        if self.verbose:
+            print(message)
 
-        # 检查目录模式
+    def _should_ignore_name(self, path_str: str) -> bool:
+        """路径字符串是否包含需要忽略的目录模式"""
         for pattern in self.ignore_patterns:
             if pattern in path_str:
                 return True
+        return False
+
+    def _should_ignore_path(self, path: Path) -> bool:
+        """检查路径是否应该被忽略"""
+        # 检查目录模式
+        if self._should_ignore_name(str(path)):
+            return True
 
         # 检查是否为Python文件
         if path.is_file() and not path.suffix == ".py":
@@ -154,18 +183,30 @@ class ImportAnalyzer:
 
         return True
 
-    def analyze_imports(self, file_path: Path) -> Dict[str, Any]:
-        """分析单个文件的导入语句"""
+    def parse_file(self, file_path: Path) -> Optional[ast.AST]:
+        """读取并解析单个文件，无法读取或存在语法错误时返回None"""
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
+            with open(file_path, "rb") as f:
                 content = f.read()
-        except (UnicodeDecodeError, PermissionError):
-            return {}
+        except PermissionError:
+            return None
+        return self.parse_source(content)
 
+    def parse_source(self, content: bytes) -> Optional[ast.AST]:
+        """解析文件内容，不是UTF-8编码或存在语法错误时返回None"""
         try:
-            tree = ast.parse(content)
-        except SyntaxError:
-            return {}
+            return ast.parse(content.decode("utf-8"))
+        except (UnicodeDecodeError, SyntaxError):
+            return None
+
+    def analyze_imports(
+        self, file_path: Path, tree: Optional[ast.AST] = None
+    ) -> Dict[str, Any]:
+        """分析单个文件的导入语句，传入已解析的语法树时不再重复解析"""
+        if tree is None:
+            tree = self.parse_file(file_path)
+            if tree is None:
+                return {}
 
         file_imports = defaultdict(
             lambda: {
@@ -186,7 +227,8 @@ class ImportAnalyzer:
                         file_imports[module_name]["aliases"][alias_name] = module_name
 
             elif isinstance(node, ast.ImportFrom):
-                if node.module and self._is_third_party_module(node.module):
+                # 相对导入（from .server import x）总是项目自身的模块
+                if node.level == 0 and node.module and self._is_third_party_module(node.module):
                     # 获取顶级包名，例如 rich.table -> rich
                     top_level_module = node.module.split(".")[0]
                     full_module_name = node.module
@@ -207,32 +249,15 @@ class ImportAnalyzer:
 
         return dict(file_imports)
 
-    def analyze_usage(self, file_path: Path) -> Dict[str, Counter]:
-        """分析单个文件中的使用情况"""
-        try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read()
-        except (UnicodeDecodeError, PermissionError):
-            return {}
-
-        try:
-            tree = ast.parse(content)
-        except SyntaxError:
-            return {}
+    def iter_usage_sites(
+        self, tree: ast.AST, alias_to_original: Dict[str, str]
+    ) -> Iterator[Tuple[str, str, str, ast.AST]]:
+        """
+        遍历语法树中第三方符号的每一处使用
 
-        usage_counter = defaultdict(
-            lambda: {"functions": Counter(), "classes": Counter(), "modules": Counter()}
-        )
-
-        # 首先获取该文件的导入信息
-        file_imports = self.analyze_imports(file_path)
-
-        # 创建别名到原始名称的映射
-        alias_to_original = {}
-        for module_name, import_data in file_imports.items():
-            alias_to_original.update(import_data["aliases"])
-
-        # 遍历AST节点统计使用情况
+        Yields:
+            (顶级包名, 类别 functions/classes/modules, 符号名, 节点)，节点带有行列号
+        """
         # 用集合记录已处理的节点，避免重复计数
         processed_nodes = set()
 
@@ -247,13 +272,11 @@ class ImportAnalyzer:
                         original_path = alias_to_original[base_name]
                         # 获取顶级包名
                         top_level_module = original_path.split(".")[0]
-                        if attr_name[0].isupper():
-                            usage_counter[top_level_module]["classes"][attr_name] += 1
-                        else:
-                            usage_counter[top_level_module]["functions"][attr_name] += 1
+                        kind = "classes" if attr_name[0].isupper() else "functions"
 
                         # 标记base_name节点已处理，避免重复计数
                         processed_nodes.add(id(node.value))
+                        yield top_level_module, kind, attr_name, node
 
             elif isinstance(node, ast.Name):
                 # 只处理未被Attribute节点处理过的Name节点
@@ -264,70 +287,146 @@ class ImportAnalyzer:
                         if "." in original:
                             # 从完整路径中提取顶级包名和项目名
                             parts = original.split(".")
-                            top_level_module = parts[0]
                             item_name = parts[-1]
-                            if item_name[0].isupper():
-                                usage_counter[top_level_module]["classes"][
-                                    item_name
-                                ] += 1
-                            else:
-                                usage_counter[top_level_module]["functions"][
-                                    item_name
-                                ] += 1
+                            kind = "classes" if item_name[0].isupper() else "functions"
+                            yield parts[0], kind, item_name, node
                         else:
                             # 获取顶级包名
                             top_level_module = original.split(".")[0]
-                            usage_counter[top_level_module]["modules"][
-                                top_level_module
-                            ] += 1
+                            yield top_level_module, "modules", top_level_module, node
+
+    def analyze_usage(
+        self,
+        file_path: Path,
+        tree: Optional[ast.AST] = None,
+        file_imports: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Counter]:
+        """分析单个文件中的使用情况，可复用已解析的语法树和导入信息"""
+        if tree is None:
+            tree = self.parse_file(file_path)
+            if tree is None:
+                return {}
+
+        usage_counter = defaultdict(
+            lambda: {"functions": Counter(), "classes": Counter(), "modules": Counter()}
+        )
+
+        # 首先获取该文件的导入信息
+        if file_imports is None:
+            file_imports = self.analyze_imports(file_path, tree)
+
+        # 遍历AST节点统计使用情况
+        for package, kind, name, _ in self.iter_usage_sites(
+            tree, self.alias_map(file_imports)
+        ):
+            usage_counter[package][kind][name] += 1
 
         return dict(usage_counter)
 
-    def analyze_project(self) -> Tuple[Dict, Dict]:
-        """分析整个项目"""
-        print(f"开始分析项目: {self.project_path}")
+    def alias_map(self, file_imports: Dict[str, Any]) -> Dict[str, str]:
+        """创建别名到原始名称的映射"""
+        alias_to_original = {}
+        for module_name, import_data in file_imports.items():
+            alias_to_original.update(import_data["aliases"])
+        return alias_to_original
 
+    def collect_python_files(self) -> List[Path]:
+        """收集项目中需要分析的Python文件，按路径排序保证结果与文件系统遍历顺序无关"""
         python_files = []
         for py_file in self.project_path.rglob("*.py"):
             if not self._should_ignore_path(py_file):
                 python_files.append(py_file)
+        python_files.sort(key=str)
+        if self.packages:
+            python_files = self.prefilter_files(python_files, self.packages)
+        return python_files
+
+    def prefilter_files(self, files: List[Path], packages: Iterable[str]) -> List[Path]:
+        """
+        按原始字节预筛选可能导入了指定包的文件，只有候选文件才需要 ast.parse
+
+        导入语句中必然以独立单词出现包名（from .pkg 这样的相对导入也一样），
+        因此字节中不含该单词的文件不可能贡献该包的导入或使用，筛选不会漏掉文件。
+        """
+        pattern = self._package_pattern(packages)
+
+        candidates = []
+        with tracer.span("prefilter", "analyzer") as span:
+            for file_path in files:
+                try:
+                    with open(file_path, "rb") as f:
+                        # 空文件无法mmap，也不可能包含导入
+                        if f.seek(0, 2) == 0:
+                            continue
+                        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                            if pattern.search(mapped):
+                                candidates.append(file_path)
+                except (OSError, ValueError):
+                    # 无法映射时交给完整分析处理
+                    candidates.append(file_path)
+            span.attrs["files"] = len(files)
+            span.attrs["candidates"] = len(candidates)
+
+        self._log(f"预筛选: {len(files)} 个文件中 {len(candidates)} 个可能导入了 {', '.join(packages)}")
+        return candidates
+
+    def _package_pattern(self, packages: Iterable[str]) -> "re.Pattern[bytes]":
+        """以独立单词匹配任一包名的字节正则"""
+        return re.compile(
+            rb"(?<!\w)(?:"
+            + b"|".join(re.escape(package.encode("utf-8")) for package in packages)
+            + rb")(?!\w)"
+        )
 
-        print(f"找到 {len(python_files)} 个Python文件")
-
-        # 分析导入
-        for i, file_path in enumerate(python_files, 1):
-            print(
-                f"分析文件 {i}/{len(python_files)}: {file_path.relative_to(self.project_path)}"
+    def analyze_file(self, file_path: Path) -> Tuple[Dict, Dict]:
+        """分析单个文件的导入和使用情况，文件只解析一次"""
+        with tracer.span("parse", "analyzer"):
+            tree = self.parse_file(file_path)
+        return self.analyze_tree(file_path, tree)
+
+    def analyze_source(self, rel_path: str, content: bytes) -> Tuple[Dict, Dict]:
+        """分析来自归档或git对象的文件内容"""
+        with tracer.span("parse", "analyzer"):
+            tree = self.parse_source(content)
+        return self.analyze_tree(Path(rel_path), tree)
+
+    def analyze_tree(self, file_path: Path, tree: Optional[ast.AST]) -> Tuple[Dict, Dict]:
+        """分析已解析的语法树"""
+        if tree is None:
+            return {}, {}
+
+        with tracer.span("imports", "analyzer"):
+            file_imports = self.analyze_imports(file_path, tree)
+        with tracer.span("usage", "analyzer"):
+            file_usage = self.analyze_usage(file_path, tree, file_imports)
+        return file_imports, file_usage
+
+    def merge_file_results(self, rel_path: str, file_imports: Dict, file_usage: Dict):
+        """将单个文件的分析结果合并到项目汇总数据"""
+        # 合并导入数据
+        for module_name, import_data in file_imports.items():
+            self.imports_data[module_name]["functions"].update(
+                import_data["functions"]
+            )
+            self.imports_data[module_name]["classes"].update(import_data["classes"])
+            self.imports_data[module_name]["modules"].update(import_data["modules"])
+            self.imports_data[module_name]["aliases"].update(import_data["aliases"])
+            self.imports_data[module_name]["files"].add(rel_path)
+
+        # 合并使用数据
+        for module_name, usage_data in file_usage.items():
+            self.usage_data[module_name]["functions"].update(
+                usage_data.get("functions", {})
+            )
+            self.usage_data[module_name]["classes"].update(
+                usage_data.get("classes", {})
+            )
+            self.usage_data[module_name]["modules"].update(
+                usage_data.get("modules", {})
             )
 
-            file_imports = self.analyze_imports(file_path)
-            file_usage = self.analyze_usage(file_path)
-
-            # 合并导入数据
-            for module_name, import_data in file_imports.items():
-                self.imports_data[module_name]["functions"].update(
-                    import_data["functions"]
-                )
-                self.imports_data[module_name]["classes"].update(import_data["classes"])
-                self.imports_data[module_name]["modules"].update(import_data["modules"])
-                self.imports_data[module_name]["aliases"].update(import_data["aliases"])
-                self.imports_data[module_name]["files"].add(
-                    str(file_path.relative_to(self.project_path))
-                )
-
-            # 合并使用数据
-            for module_name, usage_data in file_usage.items():
-                self.usage_data[module_name]["functions"].update(
-                    usage_data.get("functions", {})
-                )
-                self.usage_data[module_name]["classes"].update(
-                    usage_data.get("classes", {})
-                )
-                self.usage_data[module_name]["modules"].update(
-                    usage_data.get("modules", {})
-                )
-
-        # 计算总使用次数
+    def update_total_usage(self):
+        """计算每个包的总使用次数"""
         for module_name in self.usage_data:
             total = (
                 sum(self.usage_data[module_name]["functions"].values())
@@ -336,4 +435,83 @@ class ImportAnalyzer:
             )
             self.usage_data[module_name]["total_usage"] = total
 
+    def analyze_project(self) -> Tuple[Dict, Dict]:
+        """分析整个项目"""
+        if self.source is not None:
+            return self.analyze_source_project()
+
+        self._log(f"开始分析项目: {self.project_path}")
+
+        with tracer.span("walk", "analyzer") as walk_span:
+            python_files = self.collect_python_files()
+            walk_span.attrs["files"] = len(python_files)
+
+        self._log(f"找到 {len(python_files)} 个Python文件")
+
+        # 分析导入
+        for i, file_path in enumerate(python_files, 1):
+            rel_path = str(file_path.relative_to(self.project_path))
+            self._log(f"分析文件 {i}/{len(python_files)}: {rel_path}")
+
+            file_imports, file_usage = self.analyze_file(file_path)
+
+            with tracer.span("merge", "analyzer"):
+                self.merge_file_results(rel_path, file_imports, file_usage)
+
+        return self._finish()
+
+    def analyze_source_project(self) -> Tuple[Dict, Dict]:
+        """
+        逐个分析来源提供者产出的文件内容，不落盘
+
+        tar 归档按成员在归档中的顺序流式读取，其余来源按路径排序。
+        """
+        self._log(f"开始分析: {self.source.root}")
+        pattern = self._package_pattern(self.packages) if self.packages else None
+        self.source.add_ignore(self._should_ignore_name)
+
+        analyzed = 0
+        skipped = 0
+        with tracer.span("sources", "analyzer") as span:
+            for rel_path, content in self.source.iter_sources():
+                self.source_files.append(rel_path)
+                # 与目录分析的预筛选相同：内容中不含包名的文件不必解析
+                if pattern is not None and not pattern.search(content):
+                    skipped += 1
+                    continue
+                analyzed += 1
+                self._log(f"分析文件 {analyzed}: {rel_path}")
+
+                file_imports, file_usage = self.analyze_source(rel_path, content)
+                with tracer.span("merge", "analyzer"):
+                    self.merge_file_results(rel_path, file_imports, file_usage)
+            span.attrs["files"] = analyzed + skipped
+            span.attrs["candidates"] = analyzed
+
+        if pattern is not None:
+            self._log(f"预筛选: {analyzed + skipped} 个文件中 {analyzed} 个可能导入了 {', '.join(self.packages)}")
+        self._log(f"共分析 {analyzed} 个Python文件")
+        return self._finish()
+
+    def _finish(self) -> Tuple[Dict, Dict]:
+        # 计算总使用次数
+        self.update_total_usage()
+
+        if self.packages:
+            return select_packages(self.imports_data, self.usage_data, self.packages)
         return dict(self.imports_data), dict(self.usage_data)
+
+
+def select_packages(
+    imports_data: Dict, usage_data: Dict, packages: Iterable[str]
+) -> Tuple[Dict, Dict]:
+    """只保留指定包（按顶级包名匹配，import a.b 记在 a.b 下）的分析结果"""
+    packages = set(packages)
+    return (
+        {
+            name: data
+            for name, data in imports_data.items()
+            if name.split(".")[0] in packages
+        },
+        {name: data for name, data in usage_data.items() if name in packages},
+    )
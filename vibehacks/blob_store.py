@@ -0,0 +1,236 @@
+"""
+内容寻址存储 - 依赖仓库的文件按内容哈希只保存一份
+
+    store = BlobStore("output/.blobs")
+    digest, size, written = store.put_file("rich/console.py")
+    store.save_manifest("textualize/rich", "ea9d4db5d84b", entries)
+    store.gc()
+
+目录结构：
+- objects/<前2位>/<其余哈希>: 文件原始字节，文件名为 sha256
+- manifests/<仓库>/<版本>.json: 某个仓库某个版本的文件列表 [[路径, 哈希, 大小], ...]
+
+多个仓库共用的文件（vendored 代码、许可证、生成的代码）和同一仓库不同版本间没有变化的文件
+只占一份空间；写入前先计算哈希，已存在的对象不会重复写入。
+不被任何清单引用的对象由 gc 删除。
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+_CHUNK_SIZE = 64 * 1024
+
+# gc 不删除最近写入的对象：写入对象与保存引用它的清单之间存在时间窗口
+GC_GRACE_SECONDS = 3600
+
+Entry = Tuple[str, str, int]
+
+
+def _safe_name(name: str) -> str:
+    return re.sub(r"[^\w.+-]", "_", name)
+
+
+class BlobStore:
+    """文件系统上的内容寻址对象库"""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.manifests_dir = self.root / "manifests"
+
+    def blob_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / digest[2:]
+
+    def has(self, digest: str) -> bool:
+        return self.blob_path(digest).is_file()
+
+    def _write_atomic(self, path: Path, chunks: Iterable[bytes]):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def _touch(self, path: Path):
+        # 复用的对象刷新修改时间，避免并发的 gc 在新清单保存前删除它
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def put_bytes(self, data: bytes) -> str:
+        """保存一段内容，返回其哈希"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.blob_path(digest)
+        if path.is_file():
+            self._touch(path)
+        else:
+            self._write_atomic(path, [data])
+        return digest
+
+    def put_file(self, file_path: str) -> Tuple[str, int, bool]:
+        """
+        保存一个文件：先按块计算哈希，对象不存在时才再次读取并写入
+
+        Returns:
+            (哈希, 字节数, 是否新写入)
+        """
+        sha = hashlib.sha256()
+        size = 0
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+                sha.update(chunk)
+                size += len(chunk)
+        digest = sha.hexdigest()
+        path = self.blob_path(digest)
+        if path.is_file():
+            self._touch(path)
+            return digest, size, False
+
+        def chunks():
+            with open(file_path, "rb") as f:
+                yield from iter(lambda: f.read(_CHUNK_SIZE), b"")
+
+        self._write_atomic(path, chunks())
+        return digest, size, True
+
+    def read_bytes(self, digest: str) -> bytes:
+        return self.blob_path(digest).read_bytes()
+
+    def open_blob(self, digest: str):
+        return open(self.blob_path(digest), "rb")
+
+    def manifest_path(self, repository: str, ref: str) -> Path:
+        return self.manifests_dir / _safe_name(repository) / f"{_safe_name(ref)}.json"
+
+    def save_manifest(self, repository: str, ref: str, entries: List[Entry], **meta) -> Path:
+        """保存某个仓库某个版本的文件清单"""
+        path = self.manifest_path(repository, ref)
+        manifest = {
+            "repository": repository,
+            "ref": ref,
+            "created": time.time(),
+            **meta,
+            "entries": [list(entry) for entry in entries],
+        }
+        self._write_atomic(path, [json.dumps(manifest, ensure_ascii=False).encode("utf-8")])
+        return path
+
+    def load_manifest(self, repository: str, ref: str) -> Optional[Dict]:
+        try:
+            with open(self.manifest_path(repository, ref), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def iter_manifests(self) -> Iterator[Tuple[Path, Dict]]:
+        if not self.manifests_dir.is_dir():
+            return
+        for path in sorted(self.manifests_dir.glob("*/*.json")):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    yield path, json.load(f)
+            except (OSError, ValueError):
+                continue
+
+    def remove_manifest(self, repository: str, ref: str) -> bool:
+        try:
+            self.manifest_path(repository, ref).unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
+    def prune(self, keep: int = 1, dry_run: bool = False) -> List[Path]:
+        """每个仓库只保留最新的 keep 个版本清单，返回删除的清单路径"""
+        by_repository: Dict[str, List[Tuple[float, Path]]] = {}
+        for path, manifest in self.iter_manifests():
+            by_repository.setdefault(path.parent.name, []).append((manifest.get("created", 0), path))
+        removed = []
+        for manifests in by_repository.values():
+            manifests.sort(reverse=True)
+            for _, path in manifests[keep:]:
+                if not dry_run:
+                    path.unlink()
+                removed.append(path)
+        return removed
+
+    def iter_blobs(self) -> Iterator[Tuple[str, Path]]:
+        if not self.objects_dir.is_dir():
+            return
+        for prefix in sorted(self.objects_dir.iterdir()):
+            if not prefix.is_dir():
+                continue
+            for path in prefix.iterdir():
+                if not path.name.startswith(".tmp-"):
+                    yield prefix.name + path.name, path
+
+    def gc(self, dry_run: bool = False, grace: float = GC_GRACE_SECONDS) -> Dict:
+        """
+        删除不被任何清单引用的对象（以及遗留的临时文件）
+
+        Returns:
+            {"removed": 删除的对象数, "freed": 释放的字节数, "kept": 保留的对象数}
+        """
+        referenced = set()
+        for _, manifest in self.iter_manifests():
+            referenced.update(entry[1] for entry in manifest.get("entries", ()))
+
+        cutoff = time.time() - grace
+        removed = freed = kept = 0
+        if self.objects_dir.is_dir():
+            for prefix in self.objects_dir.iterdir():
+                if not prefix.is_dir():
+                    continue
+                for path in prefix.iterdir():
+                    digest = prefix.name + path.name
+                    try:
+                        stat = path.stat()
+                    except FileNotFoundError:
+                        continue
+                    if (path.name.startswith(".tmp-") or digest not in referenced) and stat.st_mtime < cutoff:
+                        if not dry_run:
+                            path.unlink(missing_ok=True)
+                        removed += 1
+                        freed += stat.st_size
+                    else:
+                        kept += 1
+        return {"removed": removed, "freed": freed, "kept": kept}
+
+    def stats(self) -> Dict:
+        """对象数、实际占用字节数，以及全部清单展开后的逻辑字节数"""
+        blobs = stored = 0
+        for _, path in self.iter_blobs():
+            blobs += 1
+            stored += path.stat().st_size
+        manifests = logical = 0
+        for _, manifest in self.iter_manifests():
+            manifests += 1
+            logical += sum(entry[2] for entry in manifest.get("entries", ()))
+        return {"manifests": manifests, "blobs": blobs, "stored_bytes": stored, "logical_bytes": logical}
+
+    def export_content(self, entries: Iterable[Entry], output_path: str):
+        """按清单把文件拼回 gitingest 格式的 content.txt"""
+        from .sources import IngestProvider
+
+        separator = IngestProvider.SEPARATOR
+        with open(output_path, "wb") as out:
+            for rel_path, digest, _ in entries:
+                out.write(separator + b"\nFILE: " + rel_path.encode("utf-8") + b"\n" + separator + b"\n")
+                with self.open_blob(digest) as f:
+                    for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+                        out.write(chunk)
+                out.write(b"\n\n")
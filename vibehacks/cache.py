@@ -0,0 +1,53 @@
+"""
+本地缓存目录 - 跨项目复用的测量与分析结果
+
+默认位于 $XDG_CACHE_HOME/vibehacks（未设置时为 ~/.cache/vibehacks），
+可用环境变量 VIBEHACKS_CACHE_DIR 覆盖。缓存内容都可以重新生成，可随时删除。
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+
+
+def cache_dir() -> Path:
+    """缓存根目录（不存在时不创建）"""
+    override = os.getenv("VIBEHACKS_CACHE_DIR")
+    if override:
+        return Path(override).expanduser()
+    base = os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "vibehacks"
+
+
+def cache_path(*parts: str) -> Path:
+    """缓存目录下的路径，自动创建上级目录"""
+    path = cache_dir().joinpath(*parts)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def load_json(*parts: str) -> Optional[Any]:
+    """读取缓存的JSON，不存在或已损坏时返回None"""
+    try:
+        with open(cache_dir().joinpath(*parts), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_json(value: Any, *parts: str):
+    """原子写入JSON缓存，并发写入时读者只会看到完整的文件"""
+    path = cache_path(*parts)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(value, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
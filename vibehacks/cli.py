@@ -2,57 +2,675 @@
 命令行接口 - VibehHacks Python代码库分析工具
 """
 
+import time
 import click
 from pathlib import Path
-from .analyzer import ImportAnalyzer
+from .analyzer import ImportAnalyzer, select_packages
+from .profiling import tracer
 from .reporter import AnalysisReporter
 
 
+def _parse_shard(ctx, param, value):
+    """click回调：解析 --shard i/N"""
+    if value is None:
+        return None
+    from .partial import parse_shard
+    
+    try:
+        return parse_shard(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+
 @click.command()
 @click.argument('project_path', type=click.Path(exists=True, path_type=Path))
 @click.option('--output-markdown', '-md', type=str, help='导出Markdown报告到指定文件')
-@click.option('--package', '-p', type=str, help='显示特定包的详细信息')
+@click.option('--output-parquet', type=str, help='导出列式Parquet文件到指定目录（需要pyarrow）')
+@click.option('--package', '-p', 'packages', multiple=True,
+              help='只分析指定的包，可重复指定；解析前先按字节预筛选文件')
 @click.option('--quiet', '-q', is_flag=True, help='静默模式，只输出结果')
-def analyze(project_path, output_markdown, package, quiet):
+@click.option('--profile', type=str, help='导出运行剖析JSON到指定文件（同时生成Chrome trace）')
+@click.option('--no-daemon', is_flag=True, help='不使用分析守护进程，始终在本进程内分析')
+@click.option('--watch', '-w', is_flag=True, help='监听文件变化，增量更新并刷新报告（Ctrl+C 退出）')
+@click.option('--debounce', type=float, default=0.2, show_default=True, help='监听模式下合并连续保存的静默时间(秒)')
+@click.option('--shard', type=str, callback=_parse_shard, help='只分析第 i 个分片（共 N 个），格式 i/N')
+@click.option('--output-partial', type=str, help='导出可合并的分片结果文件（配合 vibehacks merge 使用）')
+@click.option('--lazy-imports', is_flag=True, help='列出只在函数体内或类型注解中使用的顶层导入（延迟导入候选）')
+@click.option('--import-cost', is_flag=True, help='在独立子进程中测量每个包的导入耗时与内存增量（按版本缓存）')
+@click.option('--python', 'python_path', type=str, help='测量导入耗时使用的解释器，默认为当前解释器')
+@click.option('--rev', type=str, help='分析git仓库中的指定提交/分支/标签（不检出，直接读取对象库）')
+def analyze(project_path, output_markdown, output_parquet, packages, quiet, profile, no_daemon,
+            watch, debounce, shard, output_partial, lazy_imports, import_cost, python_path, rev):
     """
     分析Python项目中第三方包的导入和使用情况
     
-    PROJECT_PATH: Python项目的根目录路径
+    PROJECT_PATH: Python项目的根目录路径，也可以是 wheel/zip/sdist(tar.gz) 归档文件
     """
     if not quiet:
         click.echo(f"开始分析Python项目: {project_path}")
     
-    # 创建分析器并执行分析
-    analyzer = ImportAnalyzer(str(project_path))
+    # 只有要求导出剖析时才记录区间
+    tracer.enabled = bool(profile)
+    
+    if watch and (shard or output_partial):
+        raise click.UsageError("--watch 不能与 --shard/--output-partial 同时使用")
+    if lazy_imports and (watch or shard or output_partial):
+        raise click.UsageError("--lazy-imports 不能与 --watch/--shard/--output-partial 同时使用")
+    
+    source = None
+    if rev is not None or project_path.is_file():
+        if watch or shard or output_partial or lazy_imports:
+            raise click.UsageError("分析归档或git版本时不支持 --watch/--shard/--output-partial/--lazy-imports")
+        from .sources import open_source
+        
+        try:
+            source = open_source(str(project_path), rev)
+        except (ValueError, OSError) as e:
+            raise click.ClickException(str(e))
+    
+    import_profiler = None
+    if import_cost:
+        from .import_cost import ImportCostProfiler
+        
+        import_profiler = ImportCostProfiler(python=python_path)
+    
+    if shard or output_partial:
+        from .partial import PartialResult
+        
+        analyzer = ImportAnalyzer(str(project_path), verbose=not quiet, packages=packages)
+        partial = PartialResult.from_analyzer(analyzer, shard)
+        if output_partial:
+            partial.save(output_partial)
+            if not quiet:
+                click.echo(f"分片结果已导出到: {output_partial}")
+        if not _report(*partial.to_results(), output_markdown, output_parquet, packages, quiet,
+                       import_profiler=import_profiler):
+            return
+    elif watch:
+        _watch_project(project_path, output_markdown, output_parquet, packages, quiet, debounce,
+                       import_profiler)
+    elif source is not None:
+        analyzer = ImportAnalyzer(str(project_path), verbose=not quiet, packages=packages,
+                                  source=source)
+        try:
+            with source:
+                imports_data, usage_data = analyzer.analyze_project()
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        if not _report(imports_data, usage_data, output_markdown, output_parquet, packages, quiet,
+                       import_profiler=import_profiler):
+            return
+    else:
+        imports_data = usage_data = None
+        if not no_daemon:
+            imports_data, usage_data = _fetch_from_daemon(project_path, quiet)
+        
+        if imports_data is None:
+            # 创建分析器并执行分析
+            analyzer = ImportAnalyzer(str(project_path), verbose=not quiet, packages=packages)
+            imports_data, usage_data = analyzer.analyze_project()
+        
+        lazy_result = None
+        if lazy_imports:
+            from .lazy_imports import analyze_lazy_imports
+            
+            lazy_result = analyze_lazy_imports(ImportAnalyzer(str(project_path), verbose=False))
+        
+        if not _report(imports_data, usage_data, output_markdown, output_parquet, packages, quiet,
+                       lazy_result, import_profiler):
+            return
+    
+    if profile:
+        tracer.export_json(profile)
+        tracer.export_chrome_trace(str(Path(profile).with_suffix('.trace.json')))
+        if not quiet:
+            tracer.print_summary()
+    
+    if not quiet:
+        click.echo("分析完成!")
+
+
+@click.command()
+@click.argument('partials', nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option('--output', '-o', type=str, help='将合并结果另存为分片结果文件，可再次参与合并')
+@click.option('--output-markdown', '-md', type=str, help='导出Markdown报告到指定文件')
+@click.option('--output-parquet', type=str, help='导出列式Parquet文件到指定目录（需要pyarrow）')
+@click.option('--package', '-p', 'packages', multiple=True, help='只显示和导出指定的包，可重复指定')
+@click.option('--quiet', '-q', is_flag=True, help='静默模式，只输出结果')
+def merge(partials, output, output_markdown, output_parquet, packages, quiet):
+    """
+    合并多个分片结果，得到与单机完整分析相同的结果
+    
+    PARTIALS: analyze --output-partial 导出的分片结果文件
+    """
+    from .partial import PartialResult, merge_partials
+    
+    try:
+        with tracer.span("merge_partials", "analyzer", partials=len(partials)):
+            merged = merge_partials(PartialResult.load(path) for path in partials)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    
+    missing = merged.missing_shards()
+    if missing:
+        click.echo(f"警告: 缺少分片 {', '.join(map(str, missing))}，结果不完整", err=True)
+    if not quiet:
+        click.echo(f"已合并 {len(partials)} 个分片结果，共 {len(merged.files)} 个文件")
+    
+    if output:
+        merged.save(output)
+        if not quiet:
+            click.echo(f"合并结果已导出到: {output}")
+    
+    _report(*merged.to_results(), output_markdown, output_parquet, packages, quiet)
+
+
+@click.command()
+@click.argument('project_path', type=click.Path(exists=True, file_okay=False, path_type=Path))
+@click.argument('target', required=False)
+@click.option('--file', 'file_path', type=str, help='列出指定文件（相对项目根目录）中的所有使用位置')
+@click.option('--importers', is_flag=True, help='列出导入了 TARGET 包的文件')
+@click.option('--kind', type=click.Choice(['functions', 'classes', 'modules']), help='只显示指定类别的符号')
+@click.option('--limit', type=int, default=None, help='最多显示的使用位置数')
+@click.option('--db', type=click.Path(dir_okay=False), help='索引数据库路径，默认 <项目>/.vibehacks/usage.db')
+@click.option('--no-update', is_flag=True, help='直接查询现有索引，不检查文件变化')
+@click.option('--json', 'as_json', is_flag=True, help='以JSON输出')
+def query(project_path, target, file_path, importers, kind, limit, db, no_update, as_json):
+    """
+    查询第三方符号的使用位置（基于SQLite索引，增量更新）
+    
+    \b
+    TARGET 示例:
+      pandas             包中各符号的使用次数
+      pandas.DataFrame   符号的每一处使用位置（文件:行:列）
+    """
+    import json
+    
+    from .usage_index import UsageIndex
+    
+    if not target and not file_path:
+        raise click.UsageError("需要指定 TARGET 或 --file")
+    
+    with UsageIndex(str(project_path), db) as index:
+        if not no_update:
+            with tracer.span("usage_index.update", "analyzer"):
+                index.update()
+        
+        if file_path:
+            rows = [
+                {"line": line, "col": col + 1, "package": package, "kind": symbol_kind, "name": name}
+                for line, col, package, symbol_kind, name in index.file_occurrences(file_path)
+            ]
+            lines = [f"{file_path}:{r['line']}:{r['col']}  {r['package']}.{r['name']}" for r in rows]
+        elif importers:
+            rows = index.importers(target.split('.')[0])
+            lines = rows
+        elif '.' in target:
+            # pandas.DataFrame / rich.table.Table -> 包名取第一段，符号名取最后一段
+            package, name = target.split('.')[0], target.split('.')[-1]
+            rows = [
+                {"file": path, "line": line, "col": col + 1, "kind": symbol_kind, "name": symbol}
+                for path, line, col, symbol_kind, symbol in index.occurrences(package, name, kind, limit)
+            ]
+            lines = [f"{r['file']}:{r['line']}:{r['col']}  {target}" for r in rows]
+        else:
+            rows = [
+                {"kind": symbol_kind, "name": name, "uses": uses, "files": files}
+                for symbol_kind, name, uses, files in index.symbol_counts(target)
+                if kind is None or symbol_kind == kind
+            ]
+            lines = [
+                f"{r['uses']:>8}  {r['files']:>6} 文件  {r['kind']:<9}  {target}.{r['name']}"
+                for r in rows
+            ]
+    
+    if as_json:
+        click.echo(json.dumps(rows, ensure_ascii=False, indent=2))
+    elif lines:
+        click.echo("\n".join(lines))
+    else:
+        click.echo("未找到匹配的使用位置", err=True)
+
+
+@click.command()
+@click.argument('project_path', type=click.Path(exists=True, file_okay=False, path_type=Path))
+@click.option('--root', type=str, help='最重导入链的起点模块（如入口脚本 main），默认在所有模块中寻找')
+@click.option('--order', is_flag=True, help='输出依赖在前的模块导入顺序')
+@click.option('--stdlib', is_flag=True, help='同时显示标准库模块')
+@click.option('--json', 'as_json', is_flag=True, help='以JSON输出完整的图')
+def graph(project_path, root, order, stdlib, as_json):
+    """
+    构建模块导入图：检测循环导入，找出启动时代价最大的导入链（不执行任何代码）
+    
+    只有模块级导入参与循环检测和导入链计算，函数内导入和 TYPE_CHECKING
+    下的导入单独统计。项目内模块的权重为源文件字节数。
+    """
+    import json
+    
+    from .graph import FIRST_PARTY, STDLIB, ImportGraph
+    
+    with tracer.span("graph.build", "analyzer"):
+        import_graph = ImportGraph.from_project(ImportAnalyzer(str(project_path), verbose=False))
+    
+    if root is not None and root not in import_graph.index:
+        raise click.BadParameter(f"项目中没有模块 {root}", param_hint='--root')
+    
+    if as_json:
+        click.echo(json.dumps(import_graph.to_dict(), ensure_ascii=False, indent=2))
+        return
+    
+    def visible(module):
+        return stdlib or import_graph.node_kinds[import_graph.index[module]] != STDLIB
+    
+    kinds = import_graph.node_kinds
+    counts = import_graph.edge_counts()
+    click.echo(
+        f"模块: {kinds.count(FIRST_PARTY)} 个项目内, {len(kinds) - kinds.count(FIRST_PARTY)} 个外部  "
+        f"导入: {counts['module']} 模块级, {counts['function']} 函数内, "
+        f"{counts['type_checking']} TYPE_CHECKING"
+    )
+    
+    cycles = import_graph.cycles()
+    click.echo(f"\n循环导入: {len(cycles)} 组")
+    for cycle in cycles:
+        click.echo(f"  {len(cycle)} 个模块: " + " -> ".join(import_graph.cycle_path(cycle)))
+    
+    total, chain = import_graph.heaviest_chain(root)
+    click.echo(f"\n最重导入链（共 {total / 1024:.1f} KB 源代码）:")
+    for module, weight in chain:
+        if visible(module):
+            click.echo(f"  {weight / 1024:>8.1f} KB  {module}")
+    
+    if order:
+        click.echo("\n导入顺序（依赖在前）:")
+        for group in import_graph.topological_order():
+            group = [module for module in group if visible(module)]
+            if group:
+                click.echo("  " + ", ".join(group))
+
+
+@click.command()
+@click.argument('project_path', type=click.Path(exists=True, file_okay=False, path_type=Path))
+@click.option('--package', '-p', 'packages', multiple=True, help='只统计指定的包，可重复指定')
+@click.option('--python', 'python_path', type=str, help='统计该解释器环境中安装的包，默认为当前解释器')
+@click.option('--heavy-mb', type=float, default=20.0, show_default=True, help='传递体积超过该值(MB)的包才可能被标记为重')
+@click.option('--max-symbols', type=int, default=2, show_default=True, help='只用到不超过该数量符号的重包会被标记')
+@click.option('--json', 'as_json', is_flag=True, help='以JSON输出')
+def footprint(project_path, packages, python_path, heavy_mb, max_symbols, as_json):
+    """
+    统计项目依赖的安装体积（含传递依赖）与每次使用分摊的字节数
+
+    体积来自各发行版的 RECORD 文件，site-packages 的扫描结果会缓存。
+    """
+    import json
+    import subprocess
+
+    from rich.table import Table
+    
+    from .footprint import FootprintIndex, footprint_report, format_bytes
+    from .graph import first_party_roots
+
+    analyzer = ImportAnalyzer(str(project_path), verbose=False, packages=packages)
     imports_data, usage_data = analyzer.analyze_project()
+
+    paths = None
+    if python_path:
+        result = subprocess.run(
+            [python_path, '-c', 'import json, sys; print(json.dumps(sys.path))'],
+            capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            raise click.ClickException(f"无法读取解释器的 sys.path: {result.stderr.strip()}")
+        paths = [path for path in json.loads(result.stdout) if path]
+
+    with tracer.span("footprint", "footprint"):
+        index = FootprintIndex.load(paths)
+    rows = footprint_report(
+        imports_data, usage_data, index,
+        heavy_bytes=int(heavy_mb * 1024 * 1024), heavy_max_symbols=max_symbols,
+        exclude=first_party_roots(analyzer),
+    )
+
+    if as_json:
+        click.echo(json.dumps(rows, ensure_ascii=False, indent=2))
+        return
+    if not rows:
+        click.echo("未找到已安装的第三方包")
+        return
+
+    table = Table(title="依赖安装体积")
+    for column in ('包名', '发行版', '自身体积', '含传递依赖', '文件数', '使用次数', '每次使用'):
+        table.add_column(column, justify='left' if column in ('包名', '发行版') else 'right')
+    for row in rows:
+        per_usage = format_bytes(row['bytes_per_usage']) if row['bytes_per_usage'] is not None else '-'
+        table.add_row(
+            row['package'], ', '.join(row['distributions']), format_bytes(row['bytes']),
+            format_bytes(row['transitive_bytes']), str(row['transitive_files']),
+            str(row['usage']), per_usage,
+        )
+    AnalysisReporter({}, {}).console.print(table)
+
+    total = {key: index.distributions[key] for row in rows for key in _closure_keys(index, row)}
+    click.echo(
+        f"\n合计（去重）: {format_bytes(sum(d['bytes'] for d in total.values()))}，"
+        f"{sum(d['files'] for d in total.values())} 个文件，{len(total)} 个发行版"
+    )
+
+    heavy = [row for row in rows if row['heavy']]
+    if heavy:
+        click.echo(f"\n重依赖（含传递依赖 ≥ {heavy_mb:g} MB，只用到 ≤ {max_symbols} 个符号）:")
+        for row in heavy:
+            symbols = ', '.join(row['symbols']) or '无'
+            click.echo(
+                f"  {row['package']}: {format_bytes(row['transitive_bytes'])}，"
+                f"只用到 {symbols}，位于 {', '.join(row['files_using'])}"
+            )
+
+
+def _closure_keys(index, row):
+    """报告行对应的发行版及其传递依赖（规范化名称）"""
+    from .footprint import normalize_name
+
+    keys = []
+    for name in row['distributions']:
+        keys.extend(index.closure(normalize_name(name.split('==')[0])))
+    return keys
+
+
+@click.command()
+@click.argument('project_path', type=click.Path(exists=True, file_okay=False, path_type=Path))
+@click.option('--package', '-p', 'packages', multiple=True, help='只从指定的直接依赖出发，可重复指定')
+@click.option('--depth', type=click.IntRange(min=0), default=2, show_default=True,
+              help='分析依赖源码的层数（1 = 只分析直接依赖的源码）')
+@click.option('--ingest-dir', type=click.Path(file_okay=False), default='output', show_default=True,
+              help='仓库内容导出目录（<仓库名>/content.txt），依赖未安装时从这里读取源码')
+@click.option('--prefer-ingested', is_flag=True, help='优先分析导出的仓库内容而不是已安装的发行版')
+@click.option('--no-cache', is_flag=True, help='不读写 (发行版, 版本) 分析结果缓存')
+@click.option('--json', 'as_json', is_flag=True, help='以JSON输出依赖树')
+def deps(project_path, packages, depth, ingest_dir, prefer_ingested, no_cache, as_json):
+    """
+    传递分析依赖的源码，输出多层的依赖使用树
+
+    每个依赖的分析结果按 (发行版, 版本) 缓存，所有项目共用。
+    """
+    import json
+
+    from rich.tree import Tree
+
+    from .graph import first_party_roots
+    from .transitive import DependencyResolver, TransitiveAnalyzer
+
+    analyzer = ImportAnalyzer(str(project_path), verbose=False, packages=packages)
+    imports_data, usage_data = analyzer.analyze_project()
+
+    transitive = TransitiveAnalyzer(
+        DependencyResolver(ingest_dir, prefer_installed=not prefer_ingested),
+        max_depth=depth,
+        use_cache=not no_cache,
+        verbose=not as_json,
+    )
+    with tracer.span("transitive", "analyzer", depth=depth):
+        nodes = transitive.build(imports_data, usage_data, first_party_roots(analyzer))
+
+    if as_json:
+        click.echo(json.dumps(nodes, ensure_ascii=False, indent=2))
+        return
+    if not nodes:
+        click.echo("未发现第三方包导入")
+        return
+
+    tree = Tree(f"[bold]{project_path}[/bold]")
+    _add_dependency_nodes(tree, nodes)
+    AnalysisReporter({}, {}).console.print(tree)
+    click.echo(
+        f"\n分析了 {transitive.analyzed} 个依赖的源码，{transitive.cache_hits} 个来自缓存"
+    )
+
+
+@click.command()
+@click.argument('project_path', type=click.Path(exists=True, file_okay=False, path_type=Path))
+@click.option('--package', '-p', 'packages', multiple=True, help='只检索指定的包，可重复指定')
+@click.option('--ingest-dir', type=click.Path(file_okay=False), default='output', show_default=True,
+              help='get_all_repos_context 导出仓库内容的目录')
+@click.option('--top-k', type=click.IntRange(min=1), default=3, show_default=True, help='每个包最多取的片段数')
+@click.option('--max-tokens', type=click.IntRange(min=0), default=1500, show_default=True,
+              help='所有片段的 token 总预算')
+@click.option('--json', 'as_json', is_flag=True, help='以JSON输出片段')
+def snippets(project_path, packages, ingest_dir, top_k, max_tokens, as_json):
+    """
+    按项目使用的符号检索依赖仓库中的代码片段（即提示词中附带的依赖代码）
+
+    每个导出的仓库单独建立 BM25 索引（<仓库目录>/retrieval.db），内容没有变化时不重建。
+    """
+    import json
+
+    from .graph import first_party_roots
+    from .retrieval import format_context, retrieve
+
+    analyzer = ImportAnalyzer(str(project_path), verbose=False, packages=packages)
+    imports_data, usage_data = analyzer.analyze_project()
+
+    start = time.perf_counter()
+    results = retrieve(
+        usage_data, ingest_dir, max_tokens, top_k, first_party_roots(analyzer)
+    )
+    elapsed = time.perf_counter() - start
+
+    if as_json:
+        click.echo(json.dumps(
+            [{"package": package, "snippets": hits} for package, hits in results],
+            ensure_ascii=False, indent=2,
+        ))
+        return
+    if not results:
+        click.echo(f"没有找到相关的依赖代码（{ingest_dir} 下没有对应的导出仓库？）")
+        return
+
+    click.echo(format_context(results))
+    count = sum(len(hits) for _, hits in results)
+    tokens = sum(hit['tokens'] for _, hits in results for hit in hits)
+    click.echo(
+        f"\n{len(results)} 个包，{count} 个片段，约 {tokens} tokens，用时 {elapsed * 1000:.1f} ms"
+    )
+
+
+@click.command()
+@click.argument('store_path', default='output/.blobs', type=click.Path(file_okay=False))
+@click.option('--keep', type=click.IntRange(min=1), help='每个仓库只保留最新的 N 个版本清单')
+@click.option('--gc', 'collect', is_flag=True, help='删除不被任何清单引用的对象')
+@click.option('--grace', type=float, default=3600, show_default=True, help='不删除最近该秒数内写入的对象')
+@click.option('--dry-run', is_flag=True, help='只显示将要删除的内容')
+def blobs(store_path, keep, collect, grace, dry_run):
+    """
+    查看或清理依赖仓库内容的对象库（INGEST_STORE=blobs 时写入）
+
+    STORE_PATH: 对象库目录，默认 output/.blobs
+    """
+    from .blob_store import BlobStore
+    from .footprint import format_bytes
+
+    store = BlobStore(store_path)
+    action = "将删除" if dry_run else "已删除"
+    if keep:
+        for path in store.prune(keep, dry_run=dry_run):
+            click.echo(f"{action}清单: {path.parent.name}/{path.stem}")
+    if collect:
+        result = store.gc(dry_run=dry_run, grace=grace)
+        click.echo(f"{action} {result['removed']} 个未引用的对象，释放 {format_bytes(result['freed'])}")
+
+    stats = store.stats()
+    saved = stats['logical_bytes'] - stats['stored_bytes']
+    click.echo(
+        f"{stats['manifests']} 个版本清单，{stats['blobs']} 个对象，"
+        f"实际占用 {format_bytes(stats['stored_bytes'])}（展开后 {format_bytes(stats['logical_bytes'])}，"
+        f"去重节省 {format_bytes(max(saved, 0))}）"
+    )
+
+
+def _add_dependency_nodes(parent, nodes):
+    """把依赖树节点添加到 rich Tree"""
+    from rich.markup import escape
+
+    for node in nodes:
+        label = f"[bold]{escape(node['package'])}[/bold]"
+        if node['source'] is None:
+            label += " [dim](未找到源码)[/dim]"
+        else:
+            label += f" {escape(node['version'])} [dim]({'已安装' if node['source'] == 'installed' else '仓库内容'})[/dim]"
+        label += f"  使用 {node['usage']} 次"
+        if node['symbols']:
+            shown = ', '.join(node['symbols'][:5])
+            more = f" 等 {len(node['symbols'])} 个" if len(node['symbols']) > 5 else ''
+            label += f"：{escape(shown)}{more}"
+        if node.get('cycle'):
+            label += " [yellow]↺ 循环依赖[/yellow]"
+        elif node.get('repeated'):
+            label += " [dim]（已在上文展开）[/dim]"
+        _add_dependency_nodes(parent.add(label), node['children'])
+
+
+def _report(imports_data, usage_data, output_markdown, output_parquet, packages, quiet,
+            lazy_imports=None, import_profiler=None):
+    """
+    渲染控制台报告并导出文件，指定了包时只保留这些包，没有第三方包导入时返回False
+    
+    提供 import_profiler 时测量报告中各包的导入开销（已测量的包不会重复测量）
+    """
+    if packages:
+        imports_data, usage_data = select_packages(imports_data, usage_data, packages)
+        if lazy_imports is not None:
+            lazy_imports = {
+                "candidates": [c for c in lazy_imports["candidates"] if c["package"] in packages],
+                "packages": {p: c for p, c in lazy_imports["packages"].items() if p in packages},
+            }
     
     if not imports_data:
         click.echo("未找到任何第三方包导入")
-        return
+        return False
+    
+    import_costs = None
+    if import_profiler is not None:
+        if not quiet:
+            click.echo(f"正在测量 {len(imports_data)} 个包的导入开销...")
+        try:
+            with tracer.span("import_cost", "import_cost", packages=len(imports_data)):
+                import_costs = import_profiler.measure(imports_data)
+        except (OSError, RuntimeError) as e:
+            click.echo(f"导入开销测量失败: {e}", err=True)
     
     # 创建报告生成器
-    reporter = AnalysisReporter(imports_data, usage_data)
+    reporter = AnalysisReporter(imports_data, usage_data, lazy_imports, import_costs)
     
     if not quiet:
         # 显示详细报告
         reporter.print_detailed_report()
         
         # 显示特定包的详细信息
-        if package:
-            if package in imports_data:
-                reporter.print_package_details(package)
-            else:
-                click.echo(f"未找到包: {package}")
+        if packages:
+            for package in packages:
+                if package in imports_data:
+                    reporter.print_package_details(package)
+                else:
+                    click.echo(f"未找到包: {package}")
         else:
             # 显示前5个最常用包的详细信息
             reporter.print_package_details()
+        
+        reporter.print_lazy_import_report()
     
     # 导出markdown报告
     if output_markdown:
-        reporter.export_to_markdown(output_markdown)
+        with tracer.span("export_markdown", "report"):
+            reporter.export_to_markdown(output_markdown)
+    
+    # 导出Parquet
+    if output_parquet:
+        with tracer.span("export_parquet", "report"):
+            reporter.export_to_parquet(output_parquet)
+    
+    return True
+
+
+def _watch_project(project_path, output_markdown, output_parquet, packages, quiet, debounce,
+                   import_profiler=None):
+    """完整分析一次后监听文件变化，只重新分析变化的文件并原地刷新报告"""
+    from .index import ProjectIndex
+    from .watch import watch
+    
+    project_path = Path(project_path).resolve()
+    index = ProjectIndex(
+        str(project_path), ImportAnalyzer(str(project_path), verbose=False, packages=packages)
+    )
+    with tracer.span("index.build", "analyzer"):
+        index.refresh()
+    _report(*index.results(), output_markdown, output_parquet, packages, quiet,
+            import_profiler=import_profiler)
+    
+    def on_change(changes):
+        if not quiet:
+            click.clear()
+        _report(*index.results(), output_markdown, output_parquet, packages, quiet,
+                import_profiler=import_profiler)
+        summary = ", ".join(f"{kind} {len(paths)}" for kind, paths in changes.items() if paths)
+        click.echo(f"[{time.strftime('%H:%M:%S')}] 已更新: {summary}")
     
     if not quiet:
-        click.echo("分析完成!")
+        click.echo(f"正在监听 {index.project_path}（{len(index.files)} 个文件），Ctrl+C 退出")
+    try:
+        watch(index, on_change, debounce=debounce)
+    except KeyboardInterrupt:
+        pass
+
+
+def _fetch_from_daemon(project_path, quiet):
+    """守护进程在运行时从它获取分析结果，未运行或出错时返回 (None, None)"""
+    from .client import DaemonClient
+    
+    client = DaemonClient()
+    if not client.is_running():
+        return None, None
+    
+    try:
+        with tracer.span("daemon.fetch", "analyzer"):
+            results = client.analysis(str(project_path))
+    except Exception as e:
+        if not quiet:
+            click.echo(f"分析守护进程查询失败，改为本地分析: {e}")
+        return None, None
+    
+    if not quiet:
+        click.echo(f"使用分析守护进程: http://{client.host}:{client.port}")
+    return results
+
+
+@click.command()
+@click.option('--host', default='127.0.0.1', show_default=True, help='监听地址（仅限本机）')
+@click.option('--port', type=int, default=None, help='监听端口，默认 8787 或环境变量 VIBEHACKS_PORT')
+@click.option('--project', 'projects', multiple=True, type=click.Path(exists=True, file_okay=False),
+              help='启动时预先加载的项目，可重复指定')
+@click.option('--refresh-interval', type=float, default=0.0, show_default=True,
+              help='两次增量刷新之间的最小间隔(秒)')
+@click.option('--watch', '-w', is_flag=True, help='监听文件变化实时更新索引，查询时不再扫描目录')
+def serve(host, port, projects, refresh_interval, watch):
+    """
+    启动分析守护进程，在内存中常驻项目索引并回答查询
+    """
+    from .client import default_port
+    from .server import AnalysisServer
+    
+    # 守护进程长期运行，不记录剖析区间以免内存持续增长
+    tracer.enabled = False
+    server = AnalysisServer(host, port or default_port(), refresh_interval, watch)
+    for project in projects:
+        index = server.get_index(project)
+        click.echo(f"已加载项目 {index.project_path}（{len(index.files)} 个文件）")
+    
+    click.echo(f"分析守护进程已启动: {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    click.echo("分析守护进程已停止")
 
 
 @click.group()
@@ -62,6 +680,14 @@ def main():
 
 
 main.add_command(analyze)
+main.add_command(serve)
+main.add_command(merge)
+main.add_command(query)
+main.add_command(graph)
+main.add_command(footprint)
+main.add_command(deps)
+main.add_command(blobs)
+main.add_command(snippets)
 
 
 if __name__ == '__main__':
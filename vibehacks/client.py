@@ -0,0 +1,111 @@
+"""
+分析守护进程客户端 - 只依赖标准库的轻量模块，未运行守护进程时探测开销可忽略
+
+守护进程启动时生成一次性令牌，写入缓存目录中仅当前用户可读的文件（0600），
+客户端读取该文件并在每个请求的 Authorization 头中带上令牌。
+"""
+
+import json
+import os
+import socket
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from .cache import cache_dir
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8787
+
+
+def default_port() -> int:
+    """守护进程端口，可通过环境变量 VIBEHACKS_PORT 覆盖"""
+    return int(os.environ.get("VIBEHACKS_PORT", DEFAULT_PORT))
+
+
+def token_path(port: int) -> Path:
+    """端口对应的守护进程令牌文件"""
+    return cache_dir() / "daemon" / f"{port}.token"
+
+
+def read_token(port: int) -> Optional[str]:
+    """读取守护进程令牌，不存在时返回None"""
+    try:
+        return token_path(port).read_text(encoding="utf-8").strip() or None
+    except OSError:
+        return None
+
+
+def decode_results(payload: Dict) -> Tuple[Dict, Dict]:
+    """encode_results 的逆操作，恢复 set 与 Counter"""
+    imports_data = {
+        package: {
+            "functions": set(data["functions"]),
+            "classes": set(data["classes"]),
+            "modules": set(data["modules"]),
+            "aliases": dict(data["aliases"]),
+            "files": set(data["files"]),
+        }
+        for package, data in payload["imports"].items()
+    }
+    usage_data = {
+        package: {
+            "functions": Counter(data["functions"]),
+            "classes": Counter(data["classes"]),
+            "modules": Counter(data["modules"]),
+            "total_usage": data["total_usage"],
+        }
+        for package, data in payload["usage"].items()
+    }
+    return imports_data, usage_data
+
+
+class QueryError(Exception):
+    """查询参数错误，携带HTTP状态码"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class DaemonClient:
+    """CLI客户端模式：守护进程在运行时把查询转发给它"""
+
+    def __init__(self, host: str = DEFAULT_HOST, port: Optional[int] = None,
+                 timeout: float = 60.0):
+        self.host = host
+        self.port = port or default_port()
+        self.timeout = timeout
+
+    def is_running(self, timeout: float = 0.05) -> bool:
+        """快速探测端口是否有守护进程在监听，未运行时几乎没有开销"""
+        try:
+            with socket.create_connection((self.host, self.port), timeout=timeout):
+                return True
+        except OSError:
+            return False
+
+    def request(self, endpoint: str, method: str = "GET", **params) -> Dict:
+        # urllib只在确认守护进程运行后才导入
+        import urllib.error
+        import urllib.request
+        from urllib.parse import urlencode
+
+        url = f"http://{self.host}:{self.port}{endpoint}"
+        if params:
+            url += "?" + urlencode(params)
+        token = read_token(self.port)
+        if token is None:
+            raise QueryError(401, f"找不到守护进程令牌: {token_path(self.port)}")
+        req = urllib.request.Request(url, method=method, headers={"Authorization": f"Bearer {token}"})
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            message = json.loads(e.read() or b"{}").get("error", str(e))
+            raise QueryError(e.code, message) from None
+
+    def analysis(self, project: str) -> Tuple[Dict, Dict]:
+        """从守护进程获取与 analyze_project() 结构一致的分析结果"""
+        payload = self.request("/analysis", project=str(Path(project).resolve()))
+        return decode_results(payload)
@@ -0,0 +1,272 @@
+"""
+依赖安装体积统计 - 根据发行版的 RECORD 文件计算每个依赖（含传递依赖）的磁盘占用
+
+    index = FootprintIndex.load()                    # 扫描 site-packages，结果缓存
+    rows = footprint_report(imports_data, usage_data, index)
+
+对 site-packages 只做一次扫描：每个发行版的文件数与字节数、声明的依赖、提供的顶级导入名。
+扫描结果按 sys.path 中各目录的 mtime 缓存，安装或卸载包后自动重新扫描。
+依赖声明中带 extra 标记的可选依赖不计入；安装了 packaging 时按当前环境求值其余标记，
+否则保守地全部计入。
+"""
+
+import hashlib
+import os
+import re
+import sys
+from collections import defaultdict
+from importlib import metadata
+from typing import Dict, Iterable, List, Optional
+
+from .cache import load_json, save_json
+from .profiling import tracer
+
+FOOTPRINT_CACHE_VERSION = 1
+
+# 默认阈值：传递体积超过 20 MB、却只用到不超过2个符号的包标记为“重”
+HEAVY_BYTES = 20 * 1024 * 1024
+HEAVY_MAX_SYMBOLS = 2
+
+_REQUIREMENT_NAME = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+
+
+def normalize_name(name: str) -> str:
+    """PEP 503 规范化的发行版名称"""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def _requirement_name(requirement: str) -> Optional[str]:
+    """依赖声明中的发行版名称，可选依赖或在当前环境不适用时返回None"""
+    try:
+        from packaging.requirements import InvalidRequirement, Requirement
+    except ImportError:
+        name, _, marker = requirement.partition(";")
+        if "extra" in marker:
+            return None
+        match = _REQUIREMENT_NAME.match(name)
+        return normalize_name(match.group(1)) if match else None
+
+    try:
+        parsed = Requirement(requirement)
+    except InvalidRequirement:
+        return None
+    if parsed.marker is not None and not parsed.marker.evaluate({"extra": ""}):
+        return None
+    return normalize_name(parsed.name)
+
+
+def _top_level_names(dist: metadata.Distribution, files: List) -> List[str]:
+    """发行版提供的顶级导入名：优先 top_level.txt，否则从文件列表推断"""
+    declared = dist.read_text("top_level.txt")
+    if declared:
+        return sorted({name.strip() for name in declared.split() if name.strip()})
+
+    names = set()
+    for path in files:
+        parts = path.parts
+        if not parts or parts[0] in ("..", "__pycache__"):
+            continue
+        if len(parts) > 1:
+            if not parts[0].endswith((".dist-info", ".egg-info", ".data")):
+                names.add(parts[0])
+        elif path.suffix in (".py", ".so", ".pyd"):
+            names.add(parts[0].split(".")[0])
+    return sorted(names)
+
+
+def _scan_distribution(dist: metadata.Distribution) -> Dict:
+    files = list(dist.files or ())
+    total = 0
+    for path in files:
+        # RECORD 中 .pyc 等文件不记录大小，按实际文件补上
+        if path.size is not None:
+            total += path.size
+            continue
+        try:
+            total += os.stat(dist.locate_file(path)).st_size
+        except OSError:
+            pass
+
+    requires = []
+    for requirement in dist.requires or ():
+        name = _requirement_name(requirement)
+        if name and name not in requires:
+            requires.append(name)
+
+    return {
+        "name": dist.metadata["Name"],
+        "version": dist.version,
+        "bytes": total,
+        "files": len(files),
+        "has_record": dist.files is not None,
+        "requires": requires,
+        "top_level": _top_level_names(dist, files),
+    }
+
+
+class FootprintIndex:
+    """已安装发行版的体积索引"""
+
+    def __init__(self, distributions: Dict[str, Dict]):
+        # 规范化名称 -> 扫描结果
+        self.distributions = distributions
+        self.import_names: Dict[str, List[str]] = defaultdict(list)
+        for key, dist in distributions.items():
+            for name in dist["top_level"]:
+                self.import_names[name].append(key)
+        self._closures: Dict[str, List[str]] = {}
+
+    @classmethod
+    def scan(cls, paths: Optional[List[str]] = None) -> "FootprintIndex":
+        """扫描 paths（默认 sys.path）中的全部发行版"""
+        distributions = {}
+        for dist in metadata.distributions(path=paths if paths is not None else sys.path):
+            name = dist.metadata["Name"]
+            if not name:
+                continue
+            key = normalize_name(name)
+            # 同名发行版出现多次时与导入系统一致，取 sys.path 中靠前的
+            if key not in distributions:
+                distributions[key] = _scan_distribution(dist)
+        return cls(distributions)
+
+    @classmethod
+    def load(cls, paths: Optional[List[str]] = None, use_cache: bool = True) -> "FootprintIndex":
+        """读取缓存的扫描结果，site-packages 有变化时重新扫描"""
+        paths = list(paths if paths is not None else sys.path)
+        signature = []
+        for path in paths:
+            try:
+                signature.append([path, os.stat(path).st_mtime_ns])
+            except OSError:
+                continue
+        cache_name = hashlib.sha1("\0".join(paths).encode("utf-8")).hexdigest()[:16] + ".json"
+
+        if use_cache:
+            cached = load_json("footprint", cache_name)
+            if (
+                cached
+                and cached.get("version") == FOOTPRINT_CACHE_VERSION
+                and cached.get("signature") == signature
+            ):
+                return cls(cached["distributions"])
+
+        with tracer.span("footprint.scan", "footprint"):
+            index = cls.scan(paths)
+        if use_cache:
+            save_json(
+                {
+                    "version": FOOTPRINT_CACHE_VERSION,
+                    "signature": signature,
+                    "distributions": index.distributions,
+                },
+                "footprint",
+                cache_name,
+            )
+        return index
+
+    def closure(self, key: str) -> List[str]:
+        """发行版及其全部传递依赖（只含已安装的），广度优先顺序"""
+        if key not in self._closures:
+            seen = [key]
+            visited = {key}
+            for current in seen:
+                for requirement in self.distributions.get(current, {}).get("requires", ()):
+                    if requirement in self.distributions and requirement not in visited:
+                        visited.add(requirement)
+                        seen.append(requirement)
+            self._closures[key] = seen
+        return self._closures[key]
+
+    def footprint(self, import_name: str) -> Optional[Dict]:
+        """导入名对应的发行版及传递依赖的体积，未安装时返回None"""
+        keys = self.import_names.get(import_name.split(".")[0])
+        if not keys:
+            return None
+
+        pulled = []
+        for key in keys:
+            for dependency in self.closure(key):
+                if dependency not in pulled:
+                    pulled.append(dependency)
+        own = [self.distributions[key] for key in keys]
+        return {
+            "distributions": [f"{dist['name']}=={dist['version']}" for dist in own],
+            "bytes": sum(dist["bytes"] for dist in own),
+            "files": sum(dist["files"] for dist in own),
+            "transitive_bytes": sum(self.distributions[key]["bytes"] for key in pulled),
+            "transitive_files": sum(self.distributions[key]["files"] for key in pulled),
+            "dependencies": [
+                self.distributions[key]["name"] for key in pulled if key not in keys
+            ],
+        }
+
+
+def footprint_report(
+    imports_data: Dict,
+    usage_data: Dict,
+    index: FootprintIndex,
+    heavy_bytes: int = HEAVY_BYTES,
+    heavy_max_symbols: int = HEAVY_MAX_SYMBOLS,
+    exclude: Iterable[str] = (),
+) -> List[Dict]:
+    """
+    项目用到的每个已安装包的体积与使用情况，按传递体积降序
+
+    bytes_per_usage 为传递体积除以使用次数；传递体积不小于 heavy_bytes
+    且用到的不同符号不超过 heavy_max_symbols 个的包标记为 heavy。
+    exclude 中的顶级名称（通常是项目自身的模块）不参与统计，避免与同名的已安装包混淆。
+    """
+    exclude = set(exclude)
+    rows = []
+    for package, group in _group_by_top_level(imports_data, usage_data).items():
+        if package in exclude:
+            continue
+        footprint = index.footprint(package)
+        if footprint is None:
+            continue
+        symbols = sorted(group["symbols"])
+        total_usage = group["usage"]
+        rows.append({
+            "package": package,
+            **footprint,
+            "usage": total_usage,
+            "symbols": symbols,
+            "bytes_per_usage": footprint["transitive_bytes"] / total_usage if total_usage else None,
+            # 没有解析到使用的包无法判断用得多少，不标记
+            "heavy": bool(total_usage)
+            and footprint["transitive_bytes"] >= heavy_bytes
+            and len(symbols) <= heavy_max_symbols,
+            "files_using": sorted(group["files"]),
+        })
+    rows.sort(key=lambda row: (-row["transitive_bytes"], row["package"]))
+    return rows
+
+
+def _group_by_top_level(imports_data: Dict, usage_data: Dict) -> Dict[str, Dict]:
+    """
+    按顶级包合并导入与使用
+
+    import a.b as x 的导入记在 a.b 下，而 x.f() 的使用记在 a 下；
+    同一顶级包的体积只计算一次，导入文件与使用在所有键之间合并。
+    """
+    groups: Dict[str, Dict] = {}
+    for package, data in imports_data.items():
+        group = groups.setdefault(package.split(".")[0], {"usage": 0, "symbols": set(), "files": set()})
+        group["files"].update(data.get("files", ()))
+    for package, usage in usage_data.items():
+        group = groups.get(package.split(".")[0])
+        if group is None:
+            continue
+        group["usage"] += usage.get("total_usage", 0)
+        for kind in ("functions", "classes", "modules"):
+            group["symbols"].update(usage.get(kind) or ())
+    return groups
+
+
+def format_bytes(size: float) -> str:
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
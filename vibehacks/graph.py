@@ -0,0 +1,398 @@
+"""
+模块导入图 - 项目内模块之间以及到第三方/标准库的导入关系
+
+    graph = ImportGraph.from_project(ImportAnalyzer(project_path, verbose=False))
+    graph.cycles()              # 模块级导入形成的循环
+    graph.topological_order()   # 依赖在前的导入顺序（循环合并为一组）
+    graph.heaviest_chain()      # 启动时代价最大的导入链
+
+边分为三类：模块级导入（导入时立即执行）、函数内导入（调用时才执行）、
+TYPE_CHECKING 下的导入（运行时不执行）。循环、拓扑顺序和最重导入链只考虑模块级导入。
+邻接关系以CSR数组（indptr/indices）保存，节点按名称排序。
+"""
+
+import ast
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from .analyzer import ImportAnalyzer
+from .profiling import tracer
+
+FIRST_PARTY = "first_party"
+THIRD_PARTY = "third_party"
+STDLIB = "stdlib"
+
+EDGE_MODULE = 0
+EDGE_FUNCTION = 1
+EDGE_TYPE_CHECKING = 2
+EDGE_KINDS = ("module", "function", "type_checking")
+
+_FUNCTION_NODES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)
+
+
+def _is_type_checking(test: ast.AST) -> bool:
+    """if TYPE_CHECKING: / if typing.TYPE_CHECKING:"""
+    if isinstance(test, ast.Name):
+        return test.id == "TYPE_CHECKING"
+    return isinstance(test, ast.Attribute) and test.attr == "TYPE_CHECKING"
+
+
+def iter_import_nodes(tree: ast.AST) -> Iterator[Tuple[ast.AST, int]]:
+    """遍历语法树中的导入语句，产出 (节点, 边类型)"""
+    stack = [(child, EDGE_MODULE) for child in ast.iter_child_nodes(tree)]
+    while stack:
+        node, kind = stack.pop()
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            yield node, kind
+            continue
+        if isinstance(node, _FUNCTION_NODES):
+            # 类型检查块内定义的函数同样不会在运行时执行，保留更晚的类型
+            kind = max(kind, EDGE_FUNCTION)
+        elif isinstance(node, ast.If) and _is_type_checking(node.test):
+            stack.extend((statement, EDGE_TYPE_CHECKING) for statement in node.body)
+            stack.extend((statement, kind) for statement in node.orelse)
+            continue
+        stack.extend((child, kind) for child in ast.iter_child_nodes(node))
+
+
+def module_name(rel_path: Path, strip_src: bool = False) -> Tuple[str, bool]:
+    """由相对路径得到模块名，返回 (模块名, 是否为包的 __init__)"""
+    parts = list(rel_path.with_suffix("").parts)
+    if strip_src and len(parts) > 1 and parts[0] == "src":
+        parts = parts[1:]
+    is_package = parts[-1] == "__init__"
+    if is_package:
+        parts = parts[:-1]
+    return ".".join(parts), is_package
+
+
+def first_party_roots(analyzer: ImportAnalyzer, files: Optional[List[Path]] = None) -> Set[str]:
+    """项目自身模块的顶级名称（用于把项目模块与同名的第三方包区分开）"""
+    if files is None:
+        files = analyzer.collect_python_files()
+    roots = set()
+    for path in files:
+        name = module_name(path.relative_to(analyzer.project_path))[0]
+        if name:
+            roots.add(name.split(".")[0])
+    return roots
+
+
+class ImportGraph:
+    """不可变的导入图（CSR邻接表）"""
+
+    def __init__(
+        self,
+        nodes: List[str],
+        node_kinds: List[str],
+        weights: List[float],
+        edges: Dict[Tuple[int, int], int],
+    ):
+        self.nodes = nodes
+        self.node_kinds = node_kinds
+        self.index = {name: i for i, name in enumerate(nodes)}
+        self.weights = array("d", weights)
+
+        self.indptr = array("I", [0] * (len(nodes) + 1))
+        self.indices = array("I")
+        self.edge_kinds = array("B")
+        for (source, target), kind in sorted(edges.items()):
+            self.indptr[source + 1] += 1
+            self.indices.append(target)
+            self.edge_kinds.append(kind)
+        for i in range(len(nodes)):
+            self.indptr[i + 1] += self.indptr[i]
+
+    # ------------------------------------------------------------------
+    # 构建
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_project(cls, analyzer: ImportAnalyzer) -> "ImportGraph":
+        """解析项目中的每个文件并构建导入图"""
+        project_path = analyzer.project_path
+        strip_src = (project_path / "src").is_dir() and not (
+            project_path / "src" / "__init__.py"
+        ).exists()
+
+        with tracer.span("walk", "analyzer"):
+            files = analyzer.collect_python_files()
+
+        modules = {}
+        for path in files:
+            name, is_package = module_name(path.relative_to(project_path), strip_src)
+            if name:
+                modules[name] = (path, is_package)
+
+        roots = {name.split(".")[0] for name in modules}
+        stdlib = set(sys.stdlib_module_names) | analyzer.stdlib_modules
+
+        def classify(target: str) -> str:
+            top_level = target.split(".")[0]
+            if target in modules or top_level in roots:
+                return FIRST_PARTY
+            if top_level in stdlib:
+                return STDLIB
+            return THIRD_PARTY
+
+        def normalize(target: str) -> str:
+            # 项目内模块取存在的最长前缀；外部依赖只保留顶级包
+            if classify(target) != FIRST_PARTY:
+                return target.split(".")[0]
+            parts = target.split(".")
+            for end in range(len(parts), 0, -1):
+                prefix = ".".join(parts[:end])
+                if prefix in modules:
+                    return prefix
+            return target
+
+        names: Dict[str, int] = {}
+        weights: List[float] = []
+
+        def node_id(name: str) -> int:
+            if name not in names:
+                names[name] = len(names)
+                path = modules.get(name, (None,))[0]
+                weights.append(float(path.stat().st_size) if path else 0.0)
+            return names[name]
+
+        raw_edges: Dict[Tuple[int, int], int] = {}
+        for name, (path, is_package) in modules.items():
+            source = node_id(name)
+            with tracer.span("parse", "analyzer"):
+                tree = analyzer.parse_file(path)
+            if tree is None:
+                continue
+
+            package = name if is_package else name.rpartition(".")[0]
+            ancestors = _parent_packages(name)
+            for node, kind in iter_import_nodes(tree):
+                for target in _import_targets(node, package, modules):
+                    target = normalize(target)
+                    if not target or target == name:
+                        continue
+                    # 导入 pkg.a 会先执行 pkg/__init__.py；导入方自身所在的包已经加载，不计入
+                    targets = [
+                        parent for parent in _parent_packages(target)
+                        if parent in modules and parent not in ancestors
+                    ]
+                    for target in targets + [target]:
+                        edge = (source, node_id(target))
+                        # 同一条边多次出现时取最早执行的类型
+                        raw_edges[edge] = min(kind, raw_edges.get(edge, kind))
+
+        # 节点按名称排序，重新编号
+        sorted_names = sorted(names)
+        remap = {names[name]: i for i, name in enumerate(sorted_names)}
+        return cls(
+            sorted_names,
+            [classify(name) for name in sorted_names],
+            [weights[names[name]] for name in sorted_names],
+            {(remap[s], remap[t]): kind for (s, t), kind in raw_edges.items()},
+        )
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+
+    def successors(self, module: str, eager_only: bool = False) -> List[Tuple[str, str]]:
+        """模块直接导入的模块，返回 (模块名, 边类型)"""
+        i = self.index[module]
+        return [
+            (self.nodes[self.indices[e]], EDGE_KINDS[self.edge_kinds[e]])
+            for e in range(self.indptr[i], self.indptr[i + 1])
+            if not eager_only or self.edge_kinds[e] == EDGE_MODULE
+        ]
+
+    def edges(self) -> Iterator[Tuple[str, str, str]]:
+        """所有边 (导入方, 被导入方, 边类型)"""
+        for i, source in enumerate(self.nodes):
+            for e in range(self.indptr[i], self.indptr[i + 1]):
+                yield source, self.nodes[self.indices[e]], EDGE_KINDS[self.edge_kinds[e]]
+
+    def edge_counts(self) -> Dict[str, int]:
+        counts = dict.fromkeys(EDGE_KINDS, 0)
+        for kind in self.edge_kinds:
+            counts[EDGE_KINDS[kind]] += 1
+        return counts
+
+    def _eager_successors(self, i: int) -> Iterator[int]:
+        for e in range(self.indptr[i], self.indptr[i + 1]):
+            if self.edge_kinds[e] == EDGE_MODULE:
+                yield self.indices[e]
+
+    def strongly_connected_components(self) -> List[List[int]]:
+        """
+        模块级导入图的强连通分量（迭代版Tarjan算法）
+
+        返回顺序为逆拓扑序：每个分量都排在它所导入的分量之后，即依赖在前。
+        """
+        n = len(self.nodes)
+        index_of = [-1] * n
+        lowlink = [0] * n
+        on_stack = [False] * n
+        stack: List[int] = []
+        components: List[List[int]] = []
+        counter = 0
+
+        for root in range(n):
+            if index_of[root] != -1:
+                continue
+            work = [(root, self._eager_successors(root))]
+            index_of[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+
+            while work:
+                node, successors = work[-1]
+                for successor in successors:
+                    if index_of[successor] == -1:
+                        index_of[successor] = lowlink[successor] = counter
+                        counter += 1
+                        stack.append(successor)
+                        on_stack[successor] = True
+                        work.append((successor, self._eager_successors(successor)))
+                        break
+                    if on_stack[successor]:
+                        lowlink[node] = min(lowlink[node], index_of[successor])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[node])
+                    if lowlink[node] == index_of[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack[member] = False
+                            component.append(member)
+                            if member == node:
+                                break
+                        components.append(sorted(component))
+        return components
+
+    def cycles(self) -> List[List[str]]:
+        """模块级导入形成的循环（包含两个及以上模块的强连通分量），按规模降序"""
+        cycles = [
+            [self.nodes[i] for i in component]
+            for component in self.strongly_connected_components()
+            if len(component) > 1
+        ]
+        return sorted(cycles, key=lambda cycle: (-len(cycle), cycle))
+
+    def cycle_path(self, members: List[str]) -> List[str]:
+        """循环中经过第一个模块的一条最短导入路径（首尾相同）"""
+        start = self.index[members[0]]
+        allowed = {self.index[member] for member in members}
+        parent = {start: None}
+        queue = [start]
+        for node in queue:
+            for successor in self._eager_successors(node):
+                if successor == start:
+                    path = [node]
+                    while parent[path[-1]] is not None:
+                        path.append(parent[path[-1]])
+                    return [self.nodes[i] for i in reversed(path)] + [members[0]]
+                if successor in allowed and successor not in parent:
+                    parent[successor] = node
+                    queue.append(successor)
+        return list(members)
+
+    def topological_order(self) -> List[List[str]]:
+        """依赖在前的导入顺序，循环中的模块合并为一组"""
+        return [[self.nodes[i] for i in component] for component in self.strongly_connected_components()]
+
+    def heaviest_chain(
+        self, root: Optional[str] = None, weights: Optional[Dict[str, float]] = None
+    ) -> Tuple[float, List[Tuple[str, float]]]:
+        """
+        模块级导入中累计权重最大的导入链
+
+        Args:
+            root: 起点模块（如入口脚本），默认在所有模块中寻找
+            weights: 模块权重，默认项目内模块为源文件字节数、外部依赖为0；
+                     可传入实测导入耗时等更准确的代价
+
+        Returns:
+            (链的总权重, [(模块名, 权重), ...])，循环按整体计入
+        """
+        node_weight = [
+            weights.get(name, 0.0) if weights is not None else self.weights[i]
+            for i, name in enumerate(self.nodes)
+        ]
+        components = self.strongly_connected_components()
+        component_of = [0] * len(self.nodes)
+        for c, component in enumerate(components):
+            for member in component:
+                component_of[member] = c
+
+        # 分量按依赖在前排列，依次计算从每个分量出发的最重链
+        best = [0.0] * len(components)
+        next_component: List[Optional[int]] = [None] * len(components)
+        for c, component in enumerate(components):
+            best_successor, best_value = None, 0.0
+            for member in component:
+                for successor in self._eager_successors(member):
+                    target = component_of[successor]
+                    if target != c and (best_successor is None or best[target] > best_value):
+                        best_successor, best_value = target, best[target]
+            best[c] = sum(node_weight[m] for m in component) + best_value
+            next_component[c] = best_successor
+
+        if not components:
+            return 0.0, []
+        if root is not None:
+            start = component_of[self.index[root]]
+        else:
+            start = max(range(len(components)), key=best.__getitem__)
+
+        chain = []
+        current = start
+        while current is not None:
+            for member in components[current]:
+                chain.append((self.nodes[member], node_weight[member]))
+            current = next_component[current]
+        return best[start], chain
+
+    def to_dict(self) -> Dict:
+        return {
+            "nodes": [
+                {"module": name, "kind": kind, "weight": weight}
+                for name, kind, weight in zip(self.nodes, self.node_kinds, self.weights)
+            ],
+            "edges": [
+                {"source": source, "target": target, "kind": kind}
+                for source, target, kind in self.edges()
+            ],
+        }
+
+
+def _parent_packages(name: str) -> List[str]:
+    """a.b.c -> [a, a.b]"""
+    parts = name.split(".")
+    return [".".join(parts[:end]) for end in range(1, len(parts))]
+
+
+def _import_targets(node: ast.AST, package: str, modules: Dict) -> List[str]:
+    """导入语句指向的模块名（相对导入按所在包解析）"""
+    if isinstance(node, ast.Import):
+        return [alias.name for alias in node.names]
+
+    if node.level:
+        parts = package.split(".") if package else []
+        if node.level - 1 > len(parts):
+            return []
+        parts = parts[: len(parts) - (node.level - 1)]
+        base = ".".join(parts + ([node.module] if node.module else []))
+    else:
+        base = node.module or ""
+
+    targets = []
+    for alias in node.names:
+        candidate = f"{base}.{alias.name}" if base else alias.name
+        # from pkg import submodule 指向子模块，否则指向 pkg 本身
+        targets.append(candidate if candidate in modules else base)
+    return targets
@@ -0,0 +1,233 @@
+"""
+导入开销测量 - 在独立子进程中用 -X importtime 测量每个包的冷启动导入耗时与内存增量
+
+    profiler = ImportCostProfiler()
+    costs = profiler.measure(["pandas", "rich"])
+    costs["pandas"]["cumulative_us"], costs["pandas"]["rss_delta"]
+
+每个包单独启动一个解释器进程（工作目录为空的临时目录，不会导入项目自身的代码），
+多次运行取最小值。测量按顺序进行，避免并发进程互相干扰耗时。结果按
+(解释器, 包, 已安装版本) 缓存在 vibehacks 缓存目录中，升级包或更换环境后自动重新测量。
+"""
+
+import hashlib
+import json
+import re
+import subprocess
+import sys
+import tempfile
+from typing import Dict, Iterable, List, Optional
+
+from .cache import load_json, save_json
+from .profiling import tracer
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+# 测量脚本在开始导入前向 stderr 写入该标记，之前的导入属于脚本自身
+_MARKER = "--vibehacks-import-cost--"
+
+_VERSIONS_SCRIPT = """
+import json, sys
+from importlib import metadata
+
+names = json.loads(sys.argv[1])
+distributions = metadata.packages_distributions()
+versions = {}
+for name in names:
+    if name in sys.stdlib_module_names or name in sys.builtin_module_names:
+        versions[name] = "stdlib-" + ".".join(map(str, sys.version_info[:3]))
+        continue
+    for dist in distributions.get(name, ()):
+        try:
+            versions[name] = dist + "==" + metadata.version(dist)
+            break
+        except metadata.PackageNotFoundError:
+            pass
+print(json.dumps({
+    "versions": versions,
+    "interpreter": [sys.implementation.name, ".".join(map(str, sys.version_info[:3])), sys.prefix],
+}))
+"""
+
+_MEASURE_SCRIPT = """
+import json, sys
+
+def rss():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+before = rss()
+sys.stderr.write(%r + "\\n")
+sys.stderr.flush()
+# __import__ 经过解释器的导入计时，importlib.import_module 的顶层模块不会被计时
+__import__(sys.argv[1])
+sys.stderr.flush()
+after = rss()
+print(json.dumps({"rss_before": before, "rss_after": after}))
+""" % _MARKER
+
+
+def parse_importtime(stderr: str, package: str) -> Dict:
+    """
+    解析标记之后的 -X importtime 输出
+
+    Returns:
+        {"cumulative_us": 顶层导入累计耗时之和, "self_us": 包本身模块的自身耗时,
+         "modules": 导入的模块数, "heaviest": [[模块, 自身耗时(微秒)], ...] 前5个}
+    """
+    cumulative_us = 0
+    self_us = 0
+    timings = []
+    for line in stderr.split(_MARKER, 1)[-1].splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_time, cumulative, indent, module = (
+            int(match.group(1)), int(match.group(2)), match.group(3), match.group(4)
+        )
+        timings.append((self_time, module))
+        # 缩进为一个空格的是顶层导入，其累计耗时已包含子模块
+        if len(indent) == 1:
+            cumulative_us += cumulative
+        if module == package:
+            self_us = self_time
+    return {
+        "cumulative_us": cumulative_us,
+        "self_us": self_us,
+        "modules": len(timings),
+        "heaviest": [[module, us] for us, module in sorted(timings, reverse=True)[:5]],
+    }
+
+
+class ImportCostProfiler:
+    """逐个包测量导入开销，结果在进程内和磁盘上缓存"""
+
+    def __init__(
+        self,
+        python: Optional[str] = None,
+        repeat: int = 3,
+        timeout: float = 120.0,
+        use_cache: bool = True,
+    ):
+        self.python = python or sys.executable
+        self.repeat = max(1, repeat)
+        self.timeout = timeout
+        self.use_cache = use_cache
+        self._results: Dict[str, Dict] = {}
+
+    def _run(self, args: List[str]) -> subprocess.CompletedProcess:
+        # 在空的临时目录中运行，避免 sys.path 中的当前目录导入到同名的项目模块
+        with tempfile.TemporaryDirectory(prefix="vibehacks-import-cost-") as workdir:
+            return subprocess.run(
+                [self.python, *args],
+                cwd=workdir,
+                capture_output=True,
+                text=True,
+                timeout=self.timeout,
+            )
+
+    def installed_versions(self, packages: Iterable[str]) -> Dict:
+        """
+        在目标解释器中查询包对应的发行版与版本
+
+        Returns:
+            {"versions": {包名: "发行版==版本" 或 "stdlib-3.x.y"}, "interpreter": [...]}，
+            未安装的包不出现在 versions 中
+        """
+        result = self._run(["-c", _VERSIONS_SCRIPT, json.dumps(sorted(packages))])
+        if result.returncode != 0:
+            raise RuntimeError(f"无法查询已安装的包版本: {result.stderr.strip()[-500:]}")
+        return json.loads(result.stdout)
+
+    def measure_one(self, package: str) -> Dict:
+        """测量单个包（不读写缓存），多次运行取累计耗时最小的一次"""
+        best = None
+        for _ in range(self.repeat):
+            try:
+                result = self._run(["-X", "importtime", "-c", _MEASURE_SCRIPT, package])
+            except subprocess.TimeoutExpired:
+                return {"status": "error", "error": f"导入超时（{self.timeout:g} 秒）"}
+            if result.returncode != 0:
+                message = result.stderr.strip().splitlines()
+                return {"status": "error", "error": message[-1] if message else "导入失败"}
+
+            timing = parse_importtime(result.stderr, package)
+            memory = json.loads(result.stdout.strip().splitlines()[-1])
+            timing["rss_delta"] = max(0, memory["rss_after"] - memory["rss_before"])
+            if best is None or timing["cumulative_us"] < best["cumulative_us"]:
+                best = timing
+        best["status"] = "ok"
+        return best
+
+    def measure(self, packages: Iterable[str]) -> Dict[str, Dict]:
+        """
+        测量一组包的导入开销
+
+        Returns:
+            {包名: {"status": "ok"/"not_installed"/"error", "version": ...,
+                    "cumulative_us", "self_us", "rss_delta", "modules", "heaviest"}}
+        """
+        packages = list(dict.fromkeys(packages))
+        pending = [package for package in packages if package not in self._results]
+        if pending:
+            self._measure_pending(pending)
+        return {package: self._results[package] for package in packages}
+
+    def _measure_pending(self, packages: List[str]):
+        with tracer.span("import_cost.versions", "import_cost", packages=len(packages)):
+            # 分析结果中 import a.b 的键为 a.b，版本按顶级包查询
+            lookup = self.installed_versions({package.split(".")[0] for package in packages})
+        versions = lookup["versions"]
+
+        interpreter = lookup["interpreter"]
+        prefix_hash = hashlib.sha1(interpreter[2].encode("utf-8")).hexdigest()[:10]
+        cache_name = f"{interpreter[0]}-{interpreter[1]}-{prefix_hash}.json"
+        cache = (load_json("import_cost", cache_name) or {}) if self.use_cache else {}
+        updated = False
+
+        for package in packages:
+            version = versions.get(package.split(".")[0])
+            if version is None:
+                self._results[package] = {"status": "not_installed", "version": None}
+                continue
+
+            key = f"{package}@{version}"
+            cost = cache.get(key)
+            if cost is None:
+                with tracer.span("import_cost.measure", "import_cost", package=package):
+                    cost = self.measure_one(package)
+                cost["version"] = version
+                # 失败的测量不缓存，下次重试
+                if cost["status"] == "ok":
+                    cache[key] = cost
+                    updated = True
+            self._results[package] = cost
+
+        if updated and self.use_cache:
+            save_json(cache, "import_cost", cache_name)
+
+
+def format_cost(cost: Optional[Dict]) -> str:
+    """报告中“导入耗时”一列的文本"""
+    if cost is None:
+        return "-"
+    if cost["status"] == "not_installed":
+        return "未安装"
+    if cost["status"] != "ok":
+        return "测量失败"
+    return f"{cost['cumulative_us'] / 1000:.1f} ms"
+
+
+def format_memory(cost: Optional[Dict]) -> str:
+    """导入带来的常驻内存增量"""
+    if not cost or cost["status"] != "ok":
+        return "-"
+    return f"{cost['rss_delta'] / (1024 * 1024):.1f} MB"
@@ -0,0 +1,244 @@
+"""
+增量项目索引 - 保存每个文件的分析贡献，文件变化时只重新分析变化的文件
+
+汇总数据通过“减去旧贡献、加上新贡献”维护：
+导入的函数/类/模块使用引用计数，使用次数直接加减Counter，
+因此保存一次文件只需重新解析这一个文件。
+"""
+
+import threading
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .analyzer import ImportAnalyzer
+
+USAGE_KINDS = ("functions", "classes", "modules")
+
+
+class FileEntry:
+    """单个文件的分析贡献"""
+
+    __slots__ = ("signature", "imports", "usage")
+
+    def __init__(self, signature: Tuple[int, int], imports: Dict, usage: Dict):
+        self.signature = signature  # (mtime_ns, size)
+        self.imports = imports
+        self.usage = usage
+
+
+def _subtract(counter: Counter, other: Dict[str, int]):
+    """从计数器中减去另一组计数，并删除归零的键"""
+    for key, value in other.items():
+        remaining = counter[key] - value
+        if remaining > 0:
+            counter[key] = remaining
+        else:
+            del counter[key]
+
+
+class ProjectIndex:
+    """
+    常驻内存的项目分析索引
+
+    refresh() 通过 mtime/size 找出新增、修改和删除的文件，
+    update_paths() 供文件监听直接传入变化的路径。
+    imports_data / usage_data 与 ImportAnalyzer.analyze_project() 的输出结构一致，
+    可直接交给 AnalysisReporter 渲染。多线程访问时需持有 lock。
+    """
+
+    def __init__(self, project_path: str, analyzer: Optional[ImportAnalyzer] = None):
+        self.project_path = Path(project_path).resolve()
+        self.analyzer = analyzer or ImportAnalyzer(str(self.project_path), verbose=False)
+        self.lock = threading.RLock()
+        self.files: Dict[str, FileEntry] = {}
+
+        # 导入数据的引用计数：同一符号被多个文件导入时，只有全部移除后才从汇总中消失
+        self._import_refs = defaultdict(
+            lambda: {
+                "functions": Counter(),
+                "classes": Counter(),
+                "modules": Counter(),
+                "aliases": defaultdict(dict),  # 别名 -> {文件: 目标}
+                "files": set(),
+            }
+        )
+        self._usage = {}
+        self._materialized: Dict[str, Dict] = {}
+        self._dirty = set()
+
+    # ------------------------------------------------------------------
+    # 更新
+    # ------------------------------------------------------------------
+
+    def _rel_path(self, path: Path) -> str:
+        try:
+            return str(path.relative_to(self.project_path))
+        except ValueError:
+            # 分析器以相对路径或未解析的符号链接构造时，列出的文件路径需先解析
+            return str(path.resolve().relative_to(self.project_path))
+
+    def _signature(self, path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _tracked(self, path: Path) -> bool:
+        """路径是否属于索引范围（项目内、未被忽略的 .py 文件）"""
+        if path.suffix != ".py":
+            return False
+        try:
+            path.relative_to(self.project_path)
+        except ValueError:
+            return False
+        return not self.analyzer._should_ignore_path(path)
+
+    def _add_contribution(self, rel_path: str, entry: FileEntry):
+        for package, data in entry.imports.items():
+            refs = self._import_refs[package]
+            for kind in USAGE_KINDS:
+                refs[kind].update(data[kind])
+            for alias, target in data["aliases"].items():
+                refs["aliases"][alias][rel_path] = target
+            refs["files"].add(rel_path)
+            self._dirty.add(package)
+
+        for package, data in entry.usage.items():
+            usage = self._usage.get(package)
+            if usage is None:
+                usage = self._usage[package] = {
+                    "functions": Counter(),
+                    "classes": Counter(),
+                    "modules": Counter(),
+                    "total_usage": 0,
+                }
+            for kind in USAGE_KINDS:
+                counts = data.get(kind, {})
+                usage[kind].update(counts)
+                usage["total_usage"] += sum(counts.values())
+
+    def _remove_contribution(self, rel_path: str, entry: FileEntry):
+        for package, data in entry.imports.items():
+            refs = self._import_refs[package]
+            for kind in USAGE_KINDS:
+                _subtract(refs[kind], dict.fromkeys(data[kind], 1))
+            for alias in data["aliases"]:
+                targets = refs["aliases"][alias]
+                targets.pop(rel_path, None)
+                if not targets:
+                    del refs["aliases"][alias]
+            refs["files"].discard(rel_path)
+            if not refs["files"]:
+                del self._import_refs[package]
+            self._dirty.add(package)
+
+        for package, data in entry.usage.items():
+            usage = self._usage[package]
+            for kind in USAGE_KINDS:
+                counts = data.get(kind, {})
+                _subtract(usage[kind], counts)
+                usage["total_usage"] -= sum(counts.values())
+            if usage["total_usage"] <= 0:
+                del self._usage[package]
+
+    def _update_file(self, path: Path, signature: Optional[Tuple[int, int]]) -> Optional[str]:
+        """重新分析单个文件，返回变化类型 added/modified/removed，未变化时返回None"""
+        rel_path = self._rel_path(path)
+        old = self.files.get(rel_path)
+        if signature is None:
+            if old is None:
+                return None
+            self._remove_contribution(rel_path, old)
+            del self.files[rel_path]
+            return "removed"
+        if old is not None and old.signature == signature:
+            return None
+
+        file_imports, file_usage = self.analyzer.analyze_file(path)
+        entry = FileEntry(signature, file_imports, file_usage)
+        if old is not None:
+            self._remove_contribution(rel_path, old)
+        self._add_contribution(rel_path, entry)
+        self.files[rel_path] = entry
+        return "modified" if old is not None else "added"
+
+    def refresh(self) -> Dict[str, List[str]]:
+        """扫描整个项目，只重新分析 mtime/size 变化的文件"""
+        changes = {"added": [], "modified": [], "removed": []}
+        with self.lock:
+            seen = set()
+            for path in self.analyzer.collect_python_files():
+                rel_path = self._rel_path(path)
+                seen.add(rel_path)
+                change = self._update_file(path, self._signature(path))
+                if change:
+                    changes[change].append(rel_path)
+
+            for rel_path in [p for p in self.files if p not in seen]:
+                self._update_file(self.project_path / rel_path, None)
+                changes["removed"].append(rel_path)
+        return changes
+
+    def update_paths(self, paths: Iterable) -> Dict[str, List[str]]:
+        """只处理给定的路径（新增、修改或删除），供文件监听使用"""
+        changes = {"added": [], "modified": [], "removed": []}
+        with self.lock:
+            for raw_path in paths:
+                path = Path(raw_path)
+                if not path.is_absolute():
+                    path = self.project_path / path
+                if not self._tracked(path):
+                    continue
+                signature = self._signature(path) if path.is_file() else None
+                change = self._update_file(path, signature)
+                if change:
+                    changes[change].append(self._rel_path(path))
+        return changes
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+
+    def _materialize(self, package: str) -> Dict:
+        refs = self._import_refs[package]
+        return {
+            "functions": set(refs["functions"]),
+            "classes": set(refs["classes"]),
+            "modules": set(refs["modules"]),
+            # 同一别名在多个文件中指向不同目标时，取路径最大的文件，结果与扫描顺序无关
+            "aliases": {
+                alias: targets[max(targets)] for alias, targets in refs["aliases"].items()
+            },
+            "files": set(refs["files"]),
+        }
+
+    @property
+    def imports_data(self) -> Dict[str, Dict]:
+        """与 analyze_project() 结构一致的导入汇总，只重建发生变化的包"""
+        with self.lock:
+            for package in self._dirty:
+                if package in self._import_refs:
+                    self._materialized[package] = self._materialize(package)
+                else:
+                    self._materialized.pop(package, None)
+            self._dirty.clear()
+            return dict(self._materialized)
+
+    @property
+    def usage_data(self) -> Dict[str, Dict]:
+        """与 analyze_project() 结构一致的使用汇总"""
+        with self.lock:
+            return dict(self._usage)
+
+    def results(self) -> Tuple[Dict, Dict]:
+        """返回 (imports_data, usage_data)"""
+        with self.lock:
+            return self.imports_data, self.usage_data
+
+    def files_importing(self, package: str) -> List[str]:
+        """导入了指定包的文件"""
+        with self.lock:
+            refs = self._import_refs.get(package)
+            return sorted(refs["files"]) if refs else []
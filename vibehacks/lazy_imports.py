@@ -0,0 +1,310 @@
+"""
+延迟导入候选 - 找出模块顶层导入、但只在函数体内或类型注解中使用的第三方包
+
+    result = analyze_lazy_imports(ImportAnalyzer(project_path, verbose=False))
+    result["candidates"]   # 每个可延迟的导入绑定，附带使用位置计数
+    result["packages"]     # 每个包有多少文件在顶层导入、其中多少可以全部延迟
+
+候选分两类：
+- defer: 运行时只在函数体内使用，可移到使用它的函数中导入
+- type_checking: 只出现在类型注解中，可移到 if TYPE_CHECKING: 下
+  （文件未启用 from __future__ import annotations 时，模块级签名中的注解需改为字符串）
+
+只检查模块顶层的直接导入语句；try/if 中的条件导入、在模块级被重新赋值、
+被 global 声明或列入 __all__ 的名称都不视为候选。
+"""
+
+import ast
+import sys
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+
+from .analyzer import ImportAnalyzer
+from .graph import first_party_roots
+from .profiling import tracer
+
+DEFER = "defer"
+TYPE_CHECKING = "type_checking"
+
+_MODULE = 0
+_FUNCTION = 1
+_ANNOTATION = 2
+
+_FUNCTION_NODES = (ast.FunctionDef, ast.AsyncFunctionDef)
+
+
+def _top_level_bindings(tree: ast.Module, is_third_party: Callable[[str], bool]) -> List[Dict]:
+    """模块顶层的第三方导入，每个绑定的名称一条"""
+    bindings = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                if is_third_party(alias.name):
+                    bindings.append({
+                        # import a.b 绑定的名称是 a
+                        "name": alias.asname or alias.name.split(".")[0],
+                        "module": alias.name,
+                        "statement": ast.unparse(ast.Import(names=[alias])),
+                        "line": node.lineno,
+                    })
+        elif isinstance(node, ast.ImportFrom):
+            if node.level or not node.module or not is_third_party(node.module):
+                continue
+            for alias in node.names:
+                if alias.name == "*":
+                    continue
+                bindings.append({
+                    "name": alias.asname or alias.name,
+                    "module": node.module,
+                    "statement": ast.unparse(
+                        ast.ImportFrom(module=node.module, names=[alias], level=0)
+                    ),
+                    "line": node.lineno,
+                })
+    for binding in bindings:
+        binding["package"] = binding["module"].split(".")[0]
+    return bindings
+
+
+def _exported_names(tree: ast.Module) -> set:
+    """模块级 __all__ 中列出的名称"""
+    names = set()
+    for node in tree.body:
+        targets = node.targets if isinstance(node, ast.Assign) else (
+            [node.target] if isinstance(node, (ast.AnnAssign, ast.AugAssign)) else []
+        )
+        if not any(isinstance(t, ast.Name) and t.id == "__all__" for t in targets):
+            continue
+        if isinstance(node.value, (ast.List, ast.Tuple)):
+            names.update(
+                element.value for element in node.value.elts
+                if isinstance(element, ast.Constant) and isinstance(element.value, str)
+            )
+    return names
+
+
+def _has_postponed_annotations(tree: ast.Module) -> bool:
+    return any(
+        isinstance(node, ast.ImportFrom)
+        and node.module == "__future__"
+        and any(alias.name == "annotations" for alias in node.names)
+        for node in tree.body
+    )
+
+
+def _local_names(body: List[ast.AST]) -> frozenset:
+    """函数体内绑定的局部名称（不含嵌套作用域，去掉 global/nonlocal 声明的名称）"""
+    names = set()
+    declared = set()
+    stack = list(body)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Load):
+            names.add(node.id)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            names.update((alias.asname or alias.name).split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            names.add(node.name)
+        elif isinstance(node, (ast.Global, ast.Nonlocal)):
+            declared.update(node.names)
+        if isinstance(node, (*_FUNCTION_NODES, ast.ClassDef)):
+            names.add(node.name)
+            continue
+        if isinstance(node, ast.Lambda):
+            continue
+        stack.extend(ast.iter_child_nodes(node))
+    return frozenset(names - declared)
+
+
+def _scan_uses(tree: ast.Module, names: set) -> Dict[str, Dict]:
+    """统计每个名称在模块级、函数体内、类型注解中的使用次数"""
+    uses = {
+        name: {"module": 0, "function": 0, "annotation": 0, "functions": set(), "unsafe": False}
+        for name in names
+    }
+    stack = [(node, _MODULE, "", frozenset()) for node in tree.body]
+    while stack:
+        node, context, scope, shadowed = stack.pop()
+
+        if isinstance(node, ast.Name):
+            entry = uses.get(node.id)
+            if entry is None or node.id in shadowed:
+                continue
+            if isinstance(node.ctx, ast.Load):
+                if context == _ANNOTATION:
+                    entry["annotation"] += 1
+                elif context == _FUNCTION:
+                    entry["function"] += 1
+                    entry["functions"].add(scope)
+                else:
+                    entry["module"] += 1
+            elif context == _MODULE:
+                # 模块级重新赋值或删除，延迟导入会改变语义
+                entry["unsafe"] = True
+            continue
+
+        if isinstance(node, ast.Global):
+            for name in node.names:
+                if name in uses:
+                    uses[name]["unsafe"] = True
+            continue
+
+        inner = _ANNOTATION if context == _ANNOTATION else None
+
+        if isinstance(node, (*_FUNCTION_NODES, ast.Lambda)):
+            args = node.args
+            parameters = frozenset(
+                arg.arg
+                for arg in (*args.posonlyargs, *args.args, *args.kwonlyargs, args.vararg, args.kwarg)
+                if arg is not None
+            )
+            # 装饰器和默认值在定义时求值，注解单独归类，函数体在调用时才执行
+            evaluated = [*args.defaults, *(d for d in args.kw_defaults if d is not None)]
+            if isinstance(node, ast.Lambda):
+                name = "<lambda>"
+                body = [node.body]
+            else:
+                name = node.name
+                body = node.body
+                parameters |= _local_names(body)
+                evaluated.extend(node.decorator_list)
+                annotations = [
+                    arg.annotation
+                    for arg in (*args.posonlyargs, *args.args, *args.kwonlyargs, args.vararg, args.kwarg)
+                    if arg is not None and arg.annotation is not None
+                ]
+                if node.returns is not None:
+                    annotations.append(node.returns)
+                stack.extend((a, _ANNOTATION, scope, shadowed) for a in annotations)
+            stack.extend((e, context, scope, shadowed) for e in evaluated)
+            qualname = f"{scope}.{name}" if scope else name
+            stack.extend(
+                (statement, inner or _FUNCTION, qualname, shadowed | parameters)
+                for statement in body
+            )
+            continue
+
+        if isinstance(node, ast.ClassDef):
+            qualname = f"{scope}.{node.name}" if scope else node.name
+            stack.extend(
+                (child, context, scope, shadowed)
+                for child in (*node.bases, *node.keywords, *node.decorator_list)
+            )
+            # 类体在定义时执行，沿用外层的上下文
+            stack.extend((statement, context, qualname, shadowed) for statement in node.body)
+            continue
+
+        if isinstance(node, ast.AnnAssign):
+            stack.append((node.annotation, _ANNOTATION, scope, shadowed))
+            stack.append((node.target, context, scope, shadowed))
+            if node.value is not None:
+                stack.append((node.value, context, scope, shadowed))
+            continue
+
+        stack.extend((child, context, scope, shadowed) for child in ast.iter_child_nodes(node))
+    return uses
+
+
+def find_candidates(
+    tree: ast.Module,
+    is_third_party: Callable[[str], bool],
+    bindings: Optional[List[Dict]] = None,
+) -> List[Dict]:
+    """
+    单个文件中的延迟导入候选
+
+    Returns:
+        候选列表，每项包含 line/package/module/name/statement/action、
+        function_uses/annotation_uses（使用位置数）、functions（使用它的函数）、
+        annotations_postponed（文件是否启用了延迟求值注解）
+    """
+    if bindings is None:
+        bindings = _top_level_bindings(tree, is_third_party)
+    if not bindings:
+        return []
+
+    counts = defaultdict(int)
+    for binding in bindings:
+        counts[binding["name"]] += 1
+    exported = _exported_names(tree)
+    uses = _scan_uses(tree, set(counts))
+    postponed = _has_postponed_annotations(tree)
+
+    candidates = []
+    for binding in bindings:
+        name = binding["name"]
+        entry = uses[name]
+        if counts[name] > 1 or name in exported or entry["unsafe"] or entry["module"]:
+            continue
+        if entry["function"]:
+            action = DEFER
+        elif entry["annotation"]:
+            action = TYPE_CHECKING
+        else:
+            # 未使用的导入可能依赖其副作用（如注册插件），不作为候选
+            continue
+        candidates.append({
+            **binding,
+            "action": action,
+            "function_uses": entry["function"],
+            "annotation_uses": entry["annotation"],
+            "functions": sorted(entry["functions"]),
+            "annotations_postponed": postponed,
+        })
+    return candidates
+
+
+def analyze_lazy_imports(analyzer: ImportAnalyzer, files: Optional[List] = None) -> Dict:
+    """
+    分析项目中的延迟导入候选
+
+    Returns:
+        {"candidates": [...按文件和行号排序，带 file 字段...],
+         "packages": {包名: {"top_level_files": 顶层导入该包的文件数,
+                            "deferrable_files": 其中该包的全部顶层导入都可延迟的文件数}}}
+    """
+    if files is None:
+        with tracer.span("walk", "analyzer"):
+            files = analyzer.collect_python_files()
+
+    # 除分析器的判断外，再排除完整的标准库列表和项目自身的模块
+    first_party = first_party_roots(analyzer, files)
+    stdlib = set(sys.stdlib_module_names)
+
+    def is_third_party(module: str) -> bool:
+        top_level = module.split(".")[0]
+        return (
+            analyzer._is_third_party_module(module)
+            and top_level not in stdlib
+            and top_level not in first_party
+        )
+
+    candidates = []
+    packages = defaultdict(lambda: {"top_level_files": 0, "deferrable_files": 0})
+    for path in files:
+        with tracer.span("parse", "analyzer"):
+            tree = analyzer.parse_file(path)
+        if tree is None:
+            continue
+
+        rel_path = str(path.relative_to(analyzer.project_path))
+        with tracer.span("lazy_imports", "analyzer"):
+            bindings = _top_level_bindings(tree, is_third_party)
+            file_candidates = find_candidates(tree, is_third_party, bindings)
+            top_level = defaultdict(int)
+            for binding in bindings:
+                top_level[binding["package"]] += 1
+
+        deferrable = defaultdict(int)
+        for candidate in file_candidates:
+            candidate["file"] = rel_path
+            deferrable[candidate["package"]] += 1
+        candidates.extend(file_candidates)
+
+        for package, count in top_level.items():
+            packages[package]["top_level_files"] += 1
+            if deferrable[package] == count:
+                packages[package]["deferrable_files"] += 1
+
+    candidates.sort(key=lambda c: (c["file"], c["line"], c["name"]))
+    return {"candidates": candidates, "packages": dict(packages)}
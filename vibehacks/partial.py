@@ -0,0 +1,345 @@
+"""
+分片分析结果 - 可合并的紧凑格式（gzip压缩的JSON，带格式版本）
+
+    vibehacks analyze . --shard 1/4 --output-partial shard-1.json.gz
+    ...
+    vibehacks merge shard-*.json.gz -md report.md
+
+文件按相对路径的哈希值确定性地分配到分片。任意数量的分片结果可以按任意分组
+合并（满足结合律），合并结果与单机 analyze_project() 的输出完全一致，包括包的顺序：
+- 同一别名在多个文件中指向不同目标时，取路径最大的文件（与单机按路径排序后“后者覆盖前者”一致）
+- 包、符号和别名的顺序按 (首次出现的文件, 在该文件中的顺序) 排列，与单机的插入顺序一致，
+  因此使用次数并列时报告中的排列也相同
+"""
+
+import gzip
+import hashlib
+import json
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .analyzer import ImportAnalyzer
+
+PARTIAL_FORMAT = "vibehacks-partial"
+PARTIAL_VERSION = 3
+
+SYMBOL_KINDS = ("functions", "classes", "modules")
+
+
+def shard_of(rel_path: str, shard_count: int) -> int:
+    """文件所属的分片编号（从0开始），只取决于相对路径，跨机器、跨平台稳定"""
+    digest = hashlib.blake2b(
+        Path(rel_path).as_posix().encode("utf-8"), digest_size=8
+    ).digest()
+    return int.from_bytes(digest, "big") % shard_count
+
+
+def _merge_order(*sources: Iterable[Tuple[str, str]]) -> List[str]:
+    """
+    按单机插入顺序合并多个来源的键
+
+    每个来源按自身插入顺序给出 (键, 首次出现的文件)。同一文件只属于一个分片，
+    首次出现的文件相同的键来自同一来源，其相对顺序由来源中的位置决定。
+    """
+    ranks = {}
+    for source in sources:
+        for position, (key, first_file) in enumerate(source):
+            rank = (first_file, position)
+            if key not in ranks or rank < ranks[key]:
+                ranks[key] = rank
+    return sorted(ranks, key=ranks.__getitem__)
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """解析 "i/N" 形式的分片参数（i 从1开始）"""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"分片格式应为 i/N，例如 1/4: {value}") from None
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"分片编号超出范围: {value}")
+    return index, count
+
+
+class PartialResult:
+    """
+    一个或多个分片的分析结果
+
+    imports 的别名保存为 别名 -> (取值所在的文件, 目标, 首次出现的文件)；usage 额外记录包和
+    每个符号首次出现的文件（first_file / first_seen），合并时据此还原单机运行的别名取值和插入顺序。
+    """
+
+    def __init__(
+        self,
+        files: List[str],
+        imports: Dict[str, Dict],
+        usage: Dict[str, Dict],
+        shards: Iterable[Tuple[int, int]] = (),
+    ):
+        self.files = files
+        self.imports = imports
+        self.usage = usage
+        self.shards = sorted(set(tuple(shard) for shard in shards))
+
+    # ------------------------------------------------------------------
+    # 生成
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_analyzer(
+        cls, analyzer: ImportAnalyzer, shard: Optional[Tuple[int, int]] = None
+    ) -> "PartialResult":
+        """分析项目（或其中一个分片）的文件，生成分片结果"""
+        files = []
+        for path in analyzer.collect_python_files():
+            rel_path = str(path.relative_to(analyzer.project_path))
+            if shard is None or shard_of(rel_path, shard[1]) == shard[0] - 1:
+                files.append((rel_path, path))
+
+        if shard:
+            analyzer._log(f"分片 {shard[0]}/{shard[1]}: {len(files)} 个Python文件")
+
+        imports = {}
+        usage = {}
+        for rel_path, path in files:
+            file_imports, file_usage = analyzer.analyze_file(path)
+
+            for package, data in file_imports.items():
+                entry = imports.get(package)
+                if entry is None:
+                    entry = imports[package] = {
+                        "functions": set(),
+                        "classes": set(),
+                        "modules": set(),
+                        "aliases": {},
+                        "files": set(),
+                    }
+                for kind in SYMBOL_KINDS:
+                    entry[kind].update(data[kind])
+                # 文件按路径顺序处理，后处理的文件覆盖先前的别名，别名的位置保持首次出现时的位置
+                for alias, target in data["aliases"].items():
+                    previous = entry["aliases"].get(alias)
+                    entry["aliases"][alias] = (rel_path, target, previous[2] if previous else rel_path)
+                entry["files"].add(rel_path)
+
+            for package, data in file_usage.items():
+                entry = usage.get(package)
+                if entry is None:
+                    entry = usage[package] = {
+                        "first_file": rel_path,
+                        "functions": Counter(),
+                        "classes": Counter(),
+                        "modules": Counter(),
+                        "first_seen": {kind: {} for kind in SYMBOL_KINDS},
+                    }
+                for kind in SYMBOL_KINDS:
+                    counts = data.get(kind, {})
+                    entry[kind].update(counts)
+                    first_seen = entry["first_seen"][kind]
+                    for name in counts:
+                        first_seen.setdefault(name, rel_path)
+
+        return cls([rel_path for rel_path, _ in files], imports, usage, [shard] if shard else [])
+
+    # ------------------------------------------------------------------
+    # 合并
+    # ------------------------------------------------------------------
+
+    def merge(self, other: "PartialResult") -> "PartialResult":
+        """合并两个分片结果，文件集合必须互不相交"""
+        overlap = set(self.files) & set(other.files)
+        if overlap:
+            raise ValueError(f"分片结果包含重复的文件（共 {len(overlap)} 个），例如: {min(overlap)}")
+
+        imports = {}
+        for package in _merge_order(
+            *(
+                ((package, min(data["files"])) for package, data in source.imports.items())
+                for source in (self, other)
+            )
+        ):
+            merged = {
+                "functions": set(),
+                "classes": set(),
+                "modules": set(),
+                "aliases": {},
+                "files": set(),
+            }
+            sources = [s for s in (self.imports.get(package), other.imports.get(package)) if s]
+            for source in sources:
+                for kind in SYMBOL_KINDS:
+                    merged[kind] |= source[kind]
+                merged["files"] |= source["files"]
+            for alias in _merge_order(
+                *(((alias, first) for alias, (_, _, first) in source["aliases"].items()) for source in sources)
+            ):
+                candidates = [source["aliases"][alias] for source in sources if alias in source["aliases"]]
+                file, target, _ = max(candidates)
+                merged["aliases"][alias] = (file, target, min(first for _, _, first in candidates))
+            imports[package] = merged
+
+        usage = {}
+        for package in _merge_order(
+            *(
+                ((package, data["first_file"]) for package, data in source.usage.items())
+                for source in (self, other)
+            )
+        ):
+            sources = [s for s in (self.usage.get(package), other.usage.get(package)) if s]
+            merged = {
+                "first_file": min(source["first_file"] for source in sources),
+                "first_seen": {},
+            }
+            for kind in SYMBOL_KINDS:
+                # first_seen 与计数器的插入顺序一致，合并后仍按合并顺序保存
+                order = _merge_order(*(source["first_seen"][kind].items() for source in sources))
+                merged[kind] = Counter(
+                    {name: sum(source[kind][name] for source in sources) for name in order}
+                )
+                merged["first_seen"][kind] = {
+                    name: min(
+                        source["first_seen"][kind][name]
+                        for source in sources
+                        if name in source["first_seen"][kind]
+                    )
+                    for name in order
+                }
+            usage[package] = merged
+
+        return PartialResult(
+            sorted(self.files + other.files), imports, usage, self.shards + other.shards
+        )
+
+    def missing_shards(self) -> List[int]:
+        """按记录的分片总数检查缺少的分片编号（从1开始）"""
+        counts = {count for _, count in self.shards}
+        if len(counts) != 1:
+            return []
+        count = counts.pop()
+        present = {index for index, _ in self.shards}
+        return [index for index in range(1, count + 1) if index not in present]
+
+    def to_results(self) -> Tuple[Dict, Dict]:
+        """转换为与 analyze_project() 结构一致的 (imports_data, usage_data)"""
+        imports_data = {
+            package: {
+                "functions": set(data["functions"]),
+                "classes": set(data["classes"]),
+                "modules": set(data["modules"]),
+                "aliases": {alias: target for alias, (_, target, _) in data["aliases"].items()},
+                "files": set(data["files"]),
+            }
+            for package, data in self.imports.items()
+        }
+        usage_data = {}
+        for package, data in self.usage.items():
+            entry = {kind: Counter(data[kind]) for kind in SYMBOL_KINDS}
+            entry["total_usage"] = sum(sum(entry[kind].values()) for kind in SYMBOL_KINDS)
+            usage_data[package] = entry
+        return imports_data, usage_data
+
+    # ------------------------------------------------------------------
+    # 序列化
+    # ------------------------------------------------------------------
+
+    def save(self, output_path: str):
+        """写入gzip压缩的JSON，文件路径只存一次，其余位置以下标引用"""
+        file_ids = {rel_path: i for i, rel_path in enumerate(self.files)}
+        payload = {
+            "format": PARTIAL_FORMAT,
+            "version": PARTIAL_VERSION,
+            "shards": self.shards,
+            "files": self.files,
+            "imports": [
+                [
+                    package,
+                    {
+                        "functions": sorted(data["functions"]),
+                        "classes": sorted(data["classes"]),
+                        "modules": sorted(data["modules"]),
+                        "aliases": {
+                            alias: [file_ids[file], target, file_ids[first]]
+                            for alias, (file, target, first) in data["aliases"].items()
+                        },
+                        "files": sorted(file_ids[file] for file in data["files"]),
+                    },
+                ]
+                for package, data in self.imports.items()
+            ],
+            "usage": [
+                [
+                    package,
+                    {
+                        "first_file": file_ids[data["first_file"]],
+                        **{
+                            # [符号, 次数, 首次出现的文件下标]，保持插入顺序
+                            kind: [
+                                [name, count, file_ids[data["first_seen"][kind][name]]]
+                                for name, count in data[kind].items()
+                            ]
+                            for kind in SYMBOL_KINDS
+                        },
+                    },
+                ]
+                for package, data in self.usage.items()
+            ],
+        }
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(output_path, "wt", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, input_path: str) -> "PartialResult":
+        with gzip.open(input_path, "rt", encoding="utf-8") as f:
+            payload = json.load(f)
+
+        if payload.get("format") != PARTIAL_FORMAT:
+            raise ValueError(f"不是分片结果文件: {input_path}")
+        if payload.get("version") != PARTIAL_VERSION:
+            raise ValueError(
+                f"不支持的分片结果版本 {payload.get('version')}（当前版本 {PARTIAL_VERSION}）: {input_path}"
+            )
+
+        files = payload["files"]
+        imports = {
+            package: {
+                "functions": set(data["functions"]),
+                "classes": set(data["classes"]),
+                "modules": set(data["modules"]),
+                "aliases": {
+                    alias: (files[file_id], target, files[first_id])
+                    for alias, (file_id, target, first_id) in data["aliases"].items()
+                },
+                "files": {files[file_id] for file_id in data["files"]},
+            }
+            for package, data in payload["imports"]
+        }
+        usage = {
+            package: {
+                "first_file": files[data["first_file"]],
+                **{
+                    kind: Counter({name: count for name, count, _ in data[kind]})
+                    for kind in SYMBOL_KINDS
+                },
+                "first_seen": {
+                    kind: {name: files[file_id] for name, _, file_id in data[kind]}
+                    for kind in SYMBOL_KINDS
+                },
+            }
+            for package, data in payload["usage"]
+        }
+        return cls(files, imports, usage, payload["shards"])
+
+
+def merge_partials(partials: Iterable[PartialResult]) -> PartialResult:
+    """合并任意数量的分片结果，两两归并，每条记录只被复制 O(log N) 次"""
+    pending = list(partials)
+    if not pending:
+        return PartialResult([], {}, {})
+    while len(pending) > 1:
+        pending = [
+            pending[i].merge(pending[i + 1]) if i + 1 < len(pending) else pending[i]
+            for i in range(0, len(pending), 2)
+        ]
+    return pending[0]
@@ -0,0 +1,245 @@
+"""
+运行剖析 - 记录各阶段耗时、LLM token用量与I/O字节数
+
+用法:
+    from vibehacks.profiling import tracer
+
+    with tracer.span("parse", "analyzer", file="a.py") as s:
+        ...
+        s.attrs["bytes"] = 1024
+
+运行结束后可导出JSON剖析文件、Chrome trace (chrome://tracing / Perfetto)
+或通过rich打印汇总表。默认tracer是关闭的，需要剖析时设置 tracer.enabled = True；
+关闭时 span() 只返回一个可写入 attrs 的空区间，不计时也不保留。
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+
+class Span:
+    """一次计时区间"""
+
+    __slots__ = ("name", "category", "start", "end", "attrs", "thread_id")
+
+    def __init__(self, name: str, category: str, attrs: Dict[str, Any]):
+        self.name = name
+        self.category = category
+        self.attrs = attrs
+        self.start = time.perf_counter()
+        self.end = None
+        self.thread_id = _current_lane()
+
+    @property
+    def duration(self) -> float:
+        """耗时(秒)"""
+        end = self.end if self.end is not None else time.perf_counter()
+        return end - self.start
+
+
+class _NullSpan:
+    """tracer关闭时使用的空区间，调用方仍可写入 attrs"""
+
+    __slots__ = ("attrs",)
+
+    duration = 0.0
+
+    def __init__(self, attrs: Dict[str, Any]):
+        self.attrs = attrs
+
+
+def _current_lane() -> int:
+    """当前执行线路：异步任务内按任务区分，否则按线程区分"""
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    if task is not None:
+        return id(task)
+    return threading.get_ident()
+
+
+class Tracer:
+    """收集运行过程中各阶段的计时区间"""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._spans: List[Span] = []
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self.started_at = time.time()
+
+    def reset(self):
+        """清空已记录的区间"""
+        with self._lock:
+            self._spans = []
+        self._origin = time.perf_counter()
+        self.started_at = time.time()
+
+    @contextmanager
+    def span(self, name: str, category: str = "stage", **attrs):
+        """记录一个计时区间，可在区间内向 span.attrs 写入token数、字节数等指标"""
+        if not self.enabled:
+            yield _NullSpan(attrs)
+            return
+        span = Span(name, category, attrs)
+        try:
+            yield span
+        finally:
+            span.end = time.perf_counter()
+            with self._lock:
+                self._spans.append(span)
+
+    def record_llm_usage(self, span: Span, response: Any):
+        """从OpenAI兼容响应中提取token用量写入区间"""
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return
+        span.attrs["prompt_tokens"] = getattr(usage, "prompt_tokens", 0) or 0
+        span.attrs["completion_tokens"] = getattr(usage, "completion_tokens", 0) or 0
+
+    @property
+    def spans(self) -> List[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """按阶段名汇总：次数、总耗时、平均/最大耗时、token与字节数"""
+        rows = defaultdict(
+            lambda: {
+                "count": 0,
+                "total": 0.0,
+                "max": 0.0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "bytes": 0,
+            }
+        )
+        for span in self.spans:
+            row = rows[(span.category, span.name)]
+            duration = span.duration
+            row["count"] += 1
+            row["total"] += duration
+            row["max"] = max(row["max"], duration)
+            row["prompt_tokens"] += span.attrs.get("prompt_tokens", 0)
+            row["completion_tokens"] += span.attrs.get("completion_tokens", 0)
+            row["bytes"] += span.attrs.get("bytes", 0)
+
+        result = []
+        for (category, name), row in rows.items():
+            result.append(
+                {
+                    "category": category,
+                    "name": name,
+                    "count": row["count"],
+                    "total_ms": round(row["total"] * 1000, 3),
+                    "avg_ms": round(row["total"] * 1000 / row["count"], 3),
+                    "max_ms": round(row["max"] * 1000, 3),
+                    "prompt_tokens": row["prompt_tokens"],
+                    "completion_tokens": row["completion_tokens"],
+                    "bytes": row["bytes"],
+                }
+            )
+        result.sort(key=lambda x: x["total_ms"], reverse=True)
+        return result
+
+    def export_json(self, output_path: str):
+        """导出剖析结果：汇总表与全部区间"""
+        data = {
+            "started_at": self.started_at,
+            "summary": self.summary(),
+            "spans": [
+                {
+                    "name": span.name,
+                    "category": span.category,
+                    "start_ms": round((span.start - self._origin) * 1000, 3),
+                    "duration_ms": round(span.duration * 1000, 3),
+                    "lane": span.thread_id,
+                    "attrs": span.attrs,
+                }
+                for span in self.spans
+            ],
+        }
+        _ensure_parent(output_path)
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+
+    def export_chrome_trace(self, output_path: str):
+        """导出Chrome trace格式，可在 chrome://tracing 或 Perfetto 中查看"""
+        pid = os.getpid()
+        lanes = {}
+        events = []
+        for span in self.spans:
+            tid = lanes.setdefault(span.thread_id, len(lanes) + 1)
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": span.category,
+                    "ph": "X",
+                    "ts": round((span.start - self._origin) * 1_000_000, 1),
+                    "dur": round(span.duration * 1_000_000, 1),
+                    "pid": pid,
+                    "tid": tid,
+                    "args": span.attrs,
+                }
+            )
+        _ensure_parent(output_path)
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events}, f, ensure_ascii=False, default=str)
+
+    def print_summary(self, console: Optional[Any] = None, limit: int = 30):
+        """通过rich打印各阶段耗时汇总表"""
+        from rich import box
+        from rich.console import Console
+        from rich.table import Table
+
+        console = console or Console()
+        table = Table(title="运行剖析", box=box.ROUNDED)
+        table.add_column("类别", style="cyan")
+        table.add_column("阶段", style="green")
+        table.add_column("次数", justify="right")
+        table.add_column("总耗时(ms)", justify="right", style="magenta")
+        table.add_column("平均(ms)", justify="right")
+        table.add_column("最大(ms)", justify="right")
+        table.add_column("输入tokens", justify="right", style="yellow")
+        table.add_column("输出tokens", justify="right", style="yellow")
+        table.add_column("字节数", justify="right", style="blue")
+
+        for row in self.summary()[:limit]:
+            table.add_row(
+                row["category"],
+                row["name"],
+                str(row["count"]),
+                f"{row['total_ms']:.1f}",
+                f"{row['avg_ms']:.1f}",
+                f"{row['max_ms']:.1f}",
+                str(row["prompt_tokens"] or ""),
+                str(row["completion_tokens"] or ""),
+                str(row["bytes"] or ""),
+            )
+
+        console.print(table)
+
+    def export_run_profile(self, output_dir: str = "output", prefix: str = "profile") -> str:
+        """导出本次运行的JSON剖析与Chrome trace，返回JSON文件路径"""
+        timestamp = time.strftime("%Y%m%d_%H%M%S", time.localtime(self.started_at))
+        json_path = os.path.join(output_dir, f"{prefix}_{timestamp}.json")
+        self.export_json(json_path)
+        self.export_chrome_trace(os.path.join(output_dir, f"{prefix}_{timestamp}.trace.json"))
+        return json_path
+
+
+def _ensure_parent(output_path: str):
+    parent = os.path.dirname(output_path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+
+
+# 进程内共享的默认tracer
+tracer = Tracer()
@@ -2,11 +2,13 @@
 报告生成器 - 生成分析结果的详细报告
 """
 
+import heapq
 import json
+from functools import cached_property
 from pathlib import Path
-from typing import Dict
+from types import MappingProxyType
+from typing import Dict, List, Optional, Tuple
 
-import pandas as pd
 from rich import box
 from rich.console import Console
 from rich.panel import Panel
@@ -14,48 +16,122 @@ from rich.table import Table
 from rich.text import Text
 
 
+class ReportSummary:
+    """
+    分析结果的只读汇总视图
+
+    总数与排名只计算一次，由所有渲染方法共享；排名使用堆取前k个，
+    各包的符号排序列表在首次访问时计算并缓存。
+    """
+
+    def __init__(self, imports_data: Dict, usage_data: Dict, top_k: int = 20):
+        self._imports_data = imports_data
+        self._usage_data = usage_data
+        self.top_k = top_k
+
+        self.total_packages = len(imports_data)
+        self.total_functions = sum(
+            len(data["functions"]) for data in imports_data.values()
+        )
+        self.total_classes = sum(len(data["classes"]) for data in imports_data.values())
+        self.total_usage = sum(
+            data.get("total_usage", 0) for data in usage_data.values()
+        )
+
+        # heapq.nlargest 与 sorted(..., reverse=True)[:k] 结果一致（含并列顺序）
+        self.ranked_packages: Tuple[str, ...] = tuple(
+            package
+            for package, _ in heapq.nlargest(
+                top_k,
+                usage_data.items(),
+                key=lambda x: x[1].get("total_usage", 0),
+            )
+        )
+        self._symbol_cache: Dict[Tuple[str, str], Tuple[Tuple[str, int], ...]] = {}
+
+    def package_row(self, package: str) -> Tuple[int, int, int, int]:
+        """返回 (总使用次数, 导入函数数, 导入类数, 使用文件数)"""
+        import_data = self._imports_data.get(package, {})
+        usage = self._usage_data.get(package, {})
+        return (
+            usage.get("total_usage", 0),
+            len(import_data.get("functions", ())),
+            len(import_data.get("classes", ())),
+            len(import_data.get("files", ())),
+        )
+
+    def top_symbols(
+        self, package: str, kind: str, limit: Optional[int] = 20
+    ) -> Tuple[Tuple[str, int], ...]:
+        """返回包中某类符号（functions/classes）按使用次数排序的列表"""
+        key = (package, kind)
+        if key not in self._symbol_cache:
+            counter = self._usage_data.get(package, {}).get(kind) or {}
+            self._symbol_cache[key] = tuple(
+                sorted(counter.items(), key=lambda x: x[1], reverse=True)
+            )
+        ranked = self._symbol_cache[key]
+        return ranked if limit is None else ranked[:limit]
+
+    def sorted_files(self, package: str) -> List[str]:
+        return sorted(self._imports_data.get(package, {}).get("files", ()))
+
+    @property
+    def totals(self) -> MappingProxyType:
+        return MappingProxyType(
+            {
+                "total_packages": self.total_packages,
+                "total_functions": self.total_functions,
+                "total_classes": self.total_classes,
+                "total_usage": self.total_usage,
+            }
+        )
+
+
 class AnalysisReporter:
     """分析结果报告生成器"""
 
-    def __init__(self, imports_data: Dict, usage_data: Dict):
+    def __init__(
+        self,
+        imports_data: Dict,
+        usage_data: Dict,
+        lazy_imports: Optional[Dict] = None,
+        import_costs: Optional[Dict[str, Dict]] = None,
+    ):
         self.imports_data = imports_data
         self.usage_data = usage_data
+        # analyze_lazy_imports() 的结果，提供时报告中增加延迟导入候选部分
+        self.lazy_imports = lazy_imports
+        # ImportCostProfiler.measure() 的结果，提供时表格中增加“导入耗时”一列
+        self.import_costs = import_costs
         self.console = Console()
 
+    @cached_property
+    def summary(self) -> ReportSummary:
+        """所有渲染方法共享的汇总视图"""
+        return ReportSummary(self.imports_data, self.usage_data)
+
     def generate_summary_report(self) -> str:
         """生成摘要报告"""
-        total_packages = len(self.imports_data)
-        total_functions = sum(
-            len(data["functions"]) for data in self.imports_data.values()
-        )
-        total_classes = sum(len(data["classes"]) for data in self.imports_data.values())
-        total_usage = sum(
-            data.get("total_usage", 0) for data in self.usage_data.values()
-        )
+        view = self.summary
 
         summary = f"""
 # Python项目第三方包分析报告
 
 ## 总体统计
-- 第三方包总数: {total_packages}
-- 导入函数总数: {total_functions}
-- 导入类总数: {total_classes}
-- 总使用次数: {total_usage}
+- 第三方包总数: {view.total_packages}
+- 导入函数总数: {view.total_functions}
+- 导入类总数: {view.total_classes}
+- 总使用次数: {view.total_usage}
 
 ## 最常用的包 (按使用次数排序)
 """
 
-        # 按使用次数排序包
-        sorted_packages = sorted(
-            self.usage_data.items(),
-            key=lambda x: x[1].get("total_usage", 0),
-            reverse=True,
+        summary += "".join(
+            f"{i}. {package}: {view.package_row(package)[0]} 次使用\n"
+            for i, package in enumerate(view.ranked_packages[:20], 1)
         )
 
-        for i, (package, usage) in enumerate(sorted_packages[:20], 1):
-            total_usage = usage.get("total_usage", 0)
-            summary += f"{i}. {package}: {total_usage} 次使用\n"
-
         return summary
 
     def print_detailed_report(self):
@@ -67,19 +143,12 @@ class AnalysisReporter:
         stats_table.add_column("指标", style="cyan")
         stats_table.add_column("数量", style="magenta")
 
-        total_packages = len(self.imports_data)
-        total_functions = sum(
-            len(data["functions"]) for data in self.imports_data.values()
-        )
-        total_classes = sum(len(data["classes"]) for data in self.imports_data.values())
-        total_usage = sum(
-            data.get("total_usage", 0) for data in self.usage_data.values()
-        )
+        view = self.summary
 
-        stats_table.add_row("第三方包总数", str(total_packages))
-        stats_table.add_row("导入函数总数", str(total_functions))
-        stats_table.add_row("导入类总数", str(total_classes))
-        stats_table.add_row("总使用次数", str(total_usage))
+        stats_table.add_row("第三方包总数", str(view.total_packages))
+        stats_table.add_row("导入函数总数", str(view.total_functions))
+        stats_table.add_row("导入类总数", str(view.total_classes))
+        stats_table.add_row("总使用次数", str(view.total_usage))
 
         self.console.print(stats_table)
         self.console.print()
@@ -89,22 +158,17 @@ class AnalysisReporter:
         usage_table.add_column("排名", style="cyan", width=6)
         usage_table.add_column("包名", style="green")
         usage_table.add_column("使用次数", style="magenta")
+        if self.import_costs is not None:
+            usage_table.add_column("导入耗时", style="red")
         usage_table.add_column("导入函数数", style="yellow")
         usage_table.add_column("导入类数", style="blue")
 
-        sorted_packages = sorted(
-            self.usage_data.items(),
-            key=lambda x: x[1].get("total_usage", 0),
-            reverse=True,
-        )
-
-        for i, (package, usage) in enumerate(sorted_packages[:20], 1):
-            total_usage = usage.get("total_usage", 0)
-            func_count = len(self.imports_data.get(package, {}).get("functions", set()))
-            class_count = len(self.imports_data.get(package, {}).get("classes", set()))
+        for i, package in enumerate(view.ranked_packages[:20], 1):
+            total_usage, func_count, class_count, _ = view.package_row(package)
 
+            cost = [] if self.import_costs is None else [self._import_cost_text(package)]
             usage_table.add_row(
-                str(i), package, str(total_usage), str(func_count), str(class_count)
+                str(i), package, str(total_usage), *cost, str(func_count), str(class_count)
             )
 
         self.console.print(usage_table)
@@ -112,22 +176,19 @@ class AnalysisReporter:
 
     def print_package_details(self, package_name: str = None):
         """打印特定包的详细信息"""
+        view = self.summary
         if package_name:
             packages_to_show = (
                 [package_name] if package_name in self.imports_data else []
             )
         else:
             # 显示使用次数最多的前5个包的详细信息
-            sorted_packages = sorted(
-                self.usage_data.items(),
-                key=lambda x: x[1].get("total_usage", 0),
-                reverse=True,
-            )
-            packages_to_show = [pkg[0] for pkg in sorted_packages[:5]]
+            packages_to_show = view.ranked_packages[:5]
 
         for package in packages_to_show:
-            import_data = self.imports_data.get(package, {})
-            usage_data = self.usage_data.get(package, {})
+            total_usage, func_count, class_count, file_count = view.package_row(
+                package
+            )
 
             self.console.print(Panel.fit(f"{package} 详细信息", style="bold green"))
 
@@ -136,91 +197,144 @@ class AnalysisReporter:
             info_table.add_column("属性", style="cyan")
             info_table.add_column("值", style="white")
 
-            info_table.add_row("总使用次数", str(usage_data.get("total_usage", 0)))
-            info_table.add_row("使用文件数", str(len(import_data.get("files", set()))))
-            info_table.add_row(
-                "导入函数数", str(len(import_data.get("functions", set())))
-            )
-            info_table.add_row("导入类数", str(len(import_data.get("classes", set()))))
+            info_table.add_row("总使用次数", str(total_usage))
+            info_table.add_row("使用文件数", str(file_count))
+            info_table.add_row("导入函数数", str(func_count))
+            info_table.add_row("导入类数", str(class_count))
+            if self.import_costs is not None:
+                info_table.add_row("导入耗时", self._import_cost_text(package, detailed=True))
+                info_table.add_row("导入内存增量", self._import_memory_text(package))
 
             self.console.print(info_table)
 
             # 函数使用情况
-            if usage_data.get("functions"):
+            top_funcs = view.top_symbols(package, "functions")  # 显示前20个
+            if top_funcs:
                 func_table = Table(title="函数使用情况", box=box.ROUNDED)
                 func_table.add_column("函数名", style="yellow")
                 func_table.add_column("使用次数", style="magenta")
 
-                sorted_funcs = sorted(
-                    usage_data["functions"].items(), key=lambda x: x[1], reverse=True
-                )
-
-                for func_name, count in sorted_funcs[:20]:  # 显示前20个
+                for func_name, count in top_funcs:
                     func_table.add_row(func_name, str(count))
 
                 self.console.print(func_table)
 
             # 类使用情况
-            if usage_data.get("classes"):
+            top_classes = view.top_symbols(package, "classes")  # 显示前20个
+            if top_classes:
                 class_table = Table(title="类使用情况", box=box.ROUNDED)
                 class_table.add_column("类名", style="blue")
                 class_table.add_column("使用次数", style="magenta")
 
-                sorted_classes = sorted(
-                    usage_data["classes"].items(), key=lambda x: x[1], reverse=True
-                )
-
-                for class_name, count in sorted_classes[:20]:  # 显示前20个
+                for class_name, count in top_classes:
                     class_table.add_row(class_name, str(count))
 
                 self.console.print(class_table)
 
             # 使用文件列表
-            if import_data.get("files"):
+            files = view.sorted_files(package)
+            if files:
                 files_text = Text("使用文件:\n", style="bold cyan")
-                for file_path in sorted(import_data["files"]):
+                for file_path in files:
                     files_text.append(f"  - {file_path}\n", style="white")
 
                 self.console.print(Panel(files_text, box=box.ROUNDED))
 
             self.console.print()
 
-    def export_to_json(self, output_path: str):
-        """导出分析结果到JSON文件"""
-        # 转换set为list以便JSON序列化
-        json_data = {
-            "imports": {},
-            "usage": self.usage_data,
-            "summary": {
-                "total_packages": len(self.imports_data),
-                "total_functions": sum(
-                    len(data["functions"]) for data in self.imports_data.values()
-                ),
-                "total_classes": sum(
-                    len(data["classes"]) for data in self.imports_data.values()
-                ),
-                "total_usage": sum(
-                    data.get("total_usage", 0) for data in self.usage_data.values()
-                ),
-            },
-        }
-
-        for package, data in self.imports_data.items():
-            json_data["imports"][package] = {
-                "functions": list(data["functions"]),
-                "classes": list(data["classes"]),
-                "modules": list(data["modules"]),
-                "aliases": data["aliases"],
-                "files": list(data["files"]),
-            }
+    def _import_cost_text(self, package: str, detailed: bool = False) -> str:
+        """包的导入耗时文本，detailed 为 True 时附带包本身的耗时、模块数和版本"""
+        from .import_cost import format_cost
+
+        cost = self.import_costs.get(package)
+        text = format_cost(cost)
+        if detailed and cost and cost["status"] == "ok":
+            text += (
+                f"（累计，包本身 {cost['self_us'] / 1000:.1f} ms，"
+                f"共 {cost['modules']} 个模块，{cost['version']}）"
+            )
+        elif detailed and cost and cost["status"] == "error":
+            text += f"（{cost['error']}）"
+        return text
+
+    def _import_memory_text(self, package: str) -> str:
+        from .import_cost import format_memory
+
+        return format_memory(self.import_costs.get(package))
+
+    def print_lazy_import_report(self):
+        """打印延迟导入候选"""
+        if self.lazy_imports is None:
+            return
+
+        candidates = self.lazy_imports["candidates"]
+        if not candidates:
+            self.console.print("未发现可延迟的顶层导入")
+            return
+
+        package_table = Table(title="可延迟的包", box=box.ROUNDED)
+        package_table.add_column("包名", style="green")
+        package_table.add_column("顶层导入文件数", style="magenta")
+        package_table.add_column("可全部延迟的文件数", style="yellow")
+        for package, counts in _ranked_lazy_packages(self.lazy_imports):
+            package_table.add_row(
+                package, str(counts["top_level_files"]), str(counts["deferrable_files"])
+            )
+        self.console.print(package_table)
+
+        candidate_table = Table(title="延迟导入候选", box=box.ROUNDED)
+        candidate_table.add_column("位置", style="cyan")
+        candidate_table.add_column("导入语句", style="green")
+        candidate_table.add_column("函数内使用", style="magenta")
+        candidate_table.add_column("注解中使用", style="blue")
+        candidate_table.add_column("建议", style="white")
+        for candidate in candidates:
+            candidate_table.add_row(
+                f"{candidate['file']}:{candidate['line']}",
+                candidate["statement"],
+                str(candidate["function_uses"]),
+                str(candidate["annotation_uses"]),
+                _lazy_suggestion(candidate, brief=True),
+            )
+        self.console.print(candidate_table)
+        self.console.print()
 
+    def export_to_json(self, output_path: str):
+        """导出分析结果到JSON文件，按包逐条写入文件缓冲区"""
         with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(json_data, f, indent=2, ensure_ascii=False)
+            f.write("{\n")
+
+            # 转换set为list以便JSON序列化
+            f.write('  "imports": ')
+            _write_json_object(
+                f,
+                (
+                    (
+                        package,
+                        {
+                            "functions": list(data["functions"]),
+                            "classes": list(data["classes"]),
+                            "modules": list(data["modules"]),
+                            "aliases": data["aliases"],
+                            "files": list(data["files"]),
+                        },
+                    )
+                    for package, data in self.imports_data.items()
+                ),
+            )
+            f.write(',\n  "usage": ')
+            _write_json_object(f, self.usage_data.items())
+            f.write(',\n  "summary": ')
+            f.write(_indent_json(dict(self.summary.totals), 1))
+            f.write("\n}")
 
         self.console.print(f"分析结果已导出到: {output_path}")
 
     def export_to_csv(self, output_dir: str):
         """导出分析结果到CSV文件"""
+        # pandas只在导出CSV时才需要，延迟导入以加快CLI启动
+        import pandas as pd
+
         output_path = Path(output_dir)
         output_path.mkdir(exist_ok=True)
 
@@ -273,110 +387,322 @@ class AnalysisReporter:
 
         self.console.print(f"CSV报告已导出到: {output_path}")
 
-    def export_to_markdown(self, output_path: str):
-        """导出分析结果到Markdown文件"""
-        # 计算统计数据
-        total_packages = len(self.imports_data)
-        total_functions = sum(
-            len(data["functions"]) for data in self.imports_data.values()
-        )
-        total_classes = sum(len(data["classes"]) for data in self.imports_data.values())
-        total_usage = sum(
-            data.get("total_usage", 0) for data in self.usage_data.values()
-        )
-
-        # 构建markdown内容
-        markdown_content = f"""# Python项目第三方包分析报告
+    def export_to_parquet(
+        self,
+        output_dir: str,
+        compression: str = "zstd",
+        row_group_size: int = 100_000,
+    ):
+        """
+        导出列式Parquet文件，直接由分析结果按列构建，不逐行生成字典
+
+        - usage.parquet: package / kind / symbol / usage_count
+        - files.parquet: package / file
+        - packages.parquet: 每个包的汇总统计
+
+        package/symbol/file 列为字典编码；行按包名排序，行组按包边界切分，
+        查询时可依据行组统计信息跳过无关的包。需要安装 pyarrow。
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("导出Parquet需要安装pyarrow: pip install pyarrow")
 
-## 📊 总体统计
-
-| 指标 | 数量 |
-|------|------|
-| 第三方包总数 | {total_packages} |
-| 导入函数总数 | {total_functions} |
-| 导入类总数 | {total_classes} |
-| 总使用次数 | {total_usage} |
+        output_path = Path(output_dir)
+        output_path.mkdir(parents=True, exist_ok=True)
+        packages = sorted(set(self.imports_data) | set(self.usage_data))
 
-## 🏆 最常用的包 (Top 20)
+        def dictionary(values, index):
+            """由取值列表和索引列构建字典编码列"""
+            return pa.DictionaryArray.from_arrays(
+                pa.array(index, type=pa.int32()), pa.array(values, type=pa.string())
+            )
 
-| 排名 | 包名 | 使用次数 | 导入函数数 | 导入类数 |
-|------|------|----------|------------|----------|
-"""
+        usage_schema = pa.schema(
+            [
+                ("package", pa.dictionary(pa.int32(), pa.string())),
+                ("kind", pa.dictionary(pa.int32(), pa.string())),
+                ("symbol", pa.dictionary(pa.int32(), pa.string())),
+                ("usage_count", pa.int64()),
+            ]
+        )
+        files_schema = pa.schema(
+            [
+                ("package", pa.dictionary(pa.int32(), pa.string())),
+                ("file", pa.dictionary(pa.int32(), pa.string())),
+            ]
+        )
+        kinds = ["function", "class", "module"]
 
-        # 添加最常用包的排行
-        sorted_packages = sorted(
-            self.usage_data.items(),
-            key=lambda x: x[1].get("total_usage", 0),
-            reverse=True,
+        usage_writer = pq.ParquetWriter(
+            output_path / "usage.parquet", usage_schema, compression=compression
+        )
+        files_writer = pq.ParquetWriter(
+            output_path / "files.parquet", files_schema, compression=compression
+        )
+        try:
+            chunk_packages = []
+            package_idx, kind_idx, symbol_idx, counts = [], [], [], []
+            symbol_ids: Dict[str, int] = {}
+            file_package_idx, file_idx = [], []
+            file_ids: Dict[str, int] = {}
+
+            def flush():
+                if counts:
+                    usage_writer.write_table(
+                        pa.Table.from_arrays(
+                            [
+                                dictionary(chunk_packages, package_idx),
+                                dictionary(kinds, kind_idx),
+                                dictionary(list(symbol_ids), symbol_idx),
+                                pa.array(counts, type=pa.int64()),
+                            ],
+                            schema=usage_schema,
+                        ),
+                        row_group_size=len(counts),
+                    )
+                if file_idx:
+                    files_writer.write_table(
+                        pa.Table.from_arrays(
+                            [
+                                dictionary(chunk_packages, file_package_idx),
+                                dictionary(list(file_ids), file_idx),
+                            ],
+                            schema=files_schema,
+                        ),
+                        row_group_size=len(file_idx),
+                    )
+
+            for package in packages:
+                usage = self.usage_data.get(package, {})
+                pkg = len(chunk_packages)
+                chunk_packages.append(package)
+
+                for kind, key in enumerate(("functions", "classes", "modules")):
+                    counter = usage.get(key) or {}
+                    for symbol, count in counter.items():
+                        package_idx.append(pkg)
+                        kind_idx.append(kind)
+                        symbol_idx.append(symbol_ids.setdefault(symbol, len(symbol_ids)))
+                        counts.append(count)
+
+                for file_path in sorted(
+                    self.imports_data.get(package, {}).get("files", ())
+                ):
+                    file_package_idx.append(pkg)
+                    file_idx.append(file_ids.setdefault(file_path, len(file_ids)))
+
+                # 行组在包边界处切分，同一个包不会跨行组
+                if len(counts) >= row_group_size or len(file_idx) >= row_group_size:
+                    flush()
+                    chunk_packages = []
+                    package_idx, kind_idx, symbol_idx, counts = [], [], [], []
+                    symbol_ids = {}
+                    file_package_idx, file_idx = [], []
+                    file_ids = {}
+
+            flush()
+        finally:
+            usage_writer.close()
+            files_writer.close()
+
+        view = self.summary
+        rows = [view.package_row(package) for package in packages]
+        pq.write_table(
+            pa.Table.from_arrays(
+                [
+                    pa.array(packages, type=pa.string()),
+                    pa.array([row[0] for row in rows], type=pa.int64()),
+                    pa.array([row[1] for row in rows], type=pa.int32()),
+                    pa.array([row[2] for row in rows], type=pa.int32()),
+                    pa.array([row[3] for row in rows], type=pa.int32()),
+                ],
+                names=[
+                    "package",
+                    "total_usage",
+                    "function_count",
+                    "class_count",
+                    "file_count",
+                ],
+            ),
+            output_path / "packages.parquet",
+            compression=compression,
         )
 
-        for i, (package, usage) in enumerate(sorted_packages[:20], 1):
-            total_usage_count = usage.get("total_usage", 0)
-            func_count = len(self.imports_data.get(package, {}).get("functions", set()))
-            class_count = len(self.imports_data.get(package, {}).get("classes", set()))
+        self.console.print(f"Parquet报告已导出到: {output_path}")
 
-            markdown_content += f"| {i} | {package} | {total_usage_count} | {func_count} | {class_count} |\n"
+    def export_to_markdown(self, output_path: str):
+        """导出分析结果到Markdown文件，内容逐段写入文件缓冲区"""
+        view = self.summary
 
-        # 添加详细包信息
-        markdown_content += "\n## 📦 包详细信息\n\n"
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(f"""# Python项目第三方包分析报告
 
-        # 显示使用次数最多的前5个包的详细信息
-        for package, _ in sorted_packages[:5]:
-            import_data = self.imports_data.get(package, {})
-            usage_data = self.usage_data.get(package, {})
+## 📊 总体统计
 
-            markdown_content += f"### {package}\n\n"
-            markdown_content += "**基本信息:**\n"
-            markdown_content += f"- 总使用次数: {usage_data.get('total_usage', 0)}\n"
-            markdown_content += (
-                f"- 使用文件数: {len(import_data.get('files', set()))}\n"
-            )
-            markdown_content += (
-                f"- 导入函数数: {len(import_data.get('functions', set()))}\n"
-            )
-            markdown_content += (
-                f"- 导入类数: {len(import_data.get('classes', set()))}\n\n"
-            )
+| 指标 | 数量 |
+|------|------|
+| 第三方包总数 | {view.total_packages} |
+| 导入函数总数 | {view.total_functions} |
+| 导入类总数 | {view.total_classes} |
+| 总使用次数 | {view.total_usage} |
 
-            # 函数使用情况
-            if usage_data.get("functions"):
-                markdown_content += "**🔧 函数使用情况:**\n\n"
-                markdown_content += "| 函数名 | 使用次数 |\n"
-                markdown_content += "|--------|----------|\n"
+## 🏆 最常用的包 (Top 20)
 
-                sorted_funcs = sorted(
-                    usage_data["functions"].items(), key=lambda x: x[1], reverse=True
+""")
+            with_costs = self.import_costs is not None
+            if with_costs:
+                f.write("| 排名 | 包名 | 使用次数 | 导入耗时 | 导入函数数 | 导入类数 |\n")
+                f.write("|------|------|----------|----------|------------|----------|\n")
+            else:
+                f.write("| 排名 | 包名 | 使用次数 | 导入函数数 | 导入类数 |\n")
+                f.write("|------|------|----------|------------|----------|\n")
+
+            # 添加最常用包的排行
+            for i, package in enumerate(view.ranked_packages[:20], 1):
+                total_usage_count, func_count, class_count, _ = view.package_row(
+                    package
                 )
-
-                for func_name, count in sorted_funcs[:20]:
-                    markdown_content += f"| {func_name} | {count} |\n"
-                markdown_content += "\n"
-
-            # 类使用情况
-            if usage_data.get("classes"):
-                markdown_content += "**🏗️ 类使用情况:**\n\n"
-                markdown_content += "| 类名 | 使用次数 |\n"
-                markdown_content += "|------|----------|\n"
-
-                sorted_classes = sorted(
-                    usage_data["classes"].items(), key=lambda x: x[1], reverse=True
+                cost = f" {self._import_cost_text(package)} |" if with_costs else ""
+                f.write(
+                    f"| {i} | {package} | {total_usage_count} |{cost} {func_count} | {class_count} |\n"
                 )
 
-                for class_name, count in sorted_classes[:20]:
-                    markdown_content += f"| {class_name} | {count} |\n"
-                markdown_content += "\n"
+            # 添加详细包信息
+            f.write("\n## 📦 包详细信息\n\n")
 
-            # 使用文件列表
-            if import_data.get("files"):
-                markdown_content += "**📁 使用文件:**\n\n"
-                for file_path in sorted(import_data["files"]):
-                    markdown_content += f"- {file_path}\n"
-                markdown_content += "\n"
-
-            markdown_content += "---\n\n"
+            # 显示使用次数最多的前5个包的详细信息
+            for package in view.ranked_packages[:5]:
+                total_usage_count, func_count, class_count, file_count = (
+                    view.package_row(package)
+                )
 
-        # 写入文件
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(markdown_content)
+                f.write(f"### {package}\n\n")
+                f.write("**基本信息:**\n")
+                f.write(f"- 总使用次数: {total_usage_count}\n")
+                f.write(f"- 使用文件数: {file_count}\n")
+                f.write(f"- 导入函数数: {func_count}\n")
+                f.write(f"- 导入类数: {class_count}\n")
+                if with_costs:
+                    f.write(f"- 导入耗时: {self._import_cost_text(package, detailed=True)}\n")
+                    f.write(f"- 导入内存增量: {self._import_memory_text(package)}\n")
+                f.write("\n")
+
+                # 函数使用情况
+                top_funcs = view.top_symbols(package, "functions")
+                if top_funcs:
+                    f.write("**🔧 函数使用情况:**\n\n")
+                    f.write("| 函数名 | 使用次数 |\n")
+                    f.write("|--------|----------|\n")
+                    for func_name, count in top_funcs:
+                        f.write(f"| {func_name} | {count} |\n")
+                    f.write("\n")
+
+                # 类使用情况
+                top_classes = view.top_symbols(package, "classes")
+                if top_classes:
+                    f.write("**🏗️ 类使用情况:**\n\n")
+                    f.write("| 类名 | 使用次数 |\n")
+                    f.write("|------|----------|\n")
+                    for class_name, count in top_classes:
+                        f.write(f"| {class_name} | {count} |\n")
+                    f.write("\n")
+
+                # 使用文件列表
+                files = view.sorted_files(package)
+                if files:
+                    f.write("**📁 使用文件:**\n\n")
+                    for file_path in files:
+                        f.write(f"- {file_path}\n")
+                    f.write("\n")
+
+                f.write("---\n\n")
+
+            if self.lazy_imports is not None:
+                self._write_lazy_imports_markdown(f)
 
         self.console.print(f"Markdown报告已导出到: {output_path}")
+
+    def _write_lazy_imports_markdown(self, f):
+        """写入延迟导入候选部分"""
+        f.write("## 💤 延迟导入候选\n\n")
+        candidates = self.lazy_imports["candidates"]
+        if not candidates:
+            f.write("未发现可延迟的顶层导入。\n")
+            return
+
+        f.write("| 包名 | 顶层导入文件数 | 可全部延迟的文件数 |\n")
+        f.write("|------|----------------|--------------------|\n")
+        for package, counts in _ranked_lazy_packages(self.lazy_imports):
+            f.write(
+                f"| {package} | {counts['top_level_files']} | {counts['deferrable_files']} |\n"
+            )
+        f.write("\n")
+
+        current_file = None
+        for candidate in candidates:
+            if candidate["file"] != current_file:
+                if current_file is not None:
+                    f.write("\n")
+                current_file = candidate["file"]
+                f.write(f"### {current_file}\n\n")
+                f.write("| 行 | 导入语句 | 函数内使用 | 注解中使用 | 建议 |\n")
+                f.write("|----|----------|------------|------------|------|\n")
+            f.write(
+                f"| {candidate['line']} | `{candidate['statement']}` | "
+                f"{candidate['function_uses']} | {candidate['annotation_uses']} | "
+                f"{_lazy_suggestion(candidate)} |\n"
+            )
+        f.write("\n")
+
+
+def _ranked_lazy_packages(lazy_imports: Dict) -> List[Tuple[str, Dict]]:
+    """有候选的包，可全部延迟的文件数多者在前"""
+    return sorted(
+        (
+            (package, counts)
+            for package, counts in lazy_imports["packages"].items()
+            if counts["deferrable_files"]
+        ),
+        key=lambda x: (-x[1]["deferrable_files"], -x[1]["top_level_files"], x[0]),
+    )
+
+
+def _lazy_suggestion(candidate: Dict, brief: bool = False) -> str:
+    """候选的修改建议，brief 为 True 时只给出简短说明（用于控制台表格）"""
+    if brief:
+        if candidate["action"] == "type_checking":
+            return "移到 TYPE_CHECKING 下"
+        return f"移到 {len(candidate['functions'])} 个函数内"
+
+    if candidate["action"] == "type_checking":
+        suggestion = "移到 if TYPE_CHECKING: 下"
+    else:
+        functions = candidate["functions"]
+        suggestion = "移到函数内: " + ", ".join(functions[:3])
+        if len(functions) > 3:
+            suggestion += f" 等 {len(functions)} 个函数"
+        if candidate["annotation_uses"]:
+            suggestion += "；注解所需的导入放到 if TYPE_CHECKING: 下"
+    if candidate["annotation_uses"] and not candidate["annotations_postponed"]:
+        suggestion += "（注解需改为字符串或启用 from __future__ import annotations）"
+    return suggestion
+
+
+def _indent_json(value, level: int) -> str:
+    """按 json.dump(indent=2) 的格式序列化嵌套在第level层的值"""
+    text = json.dumps(value, indent=2, ensure_ascii=False)
+    return text.replace("\n", "\n" + "  " * level)
+
+
+def _write_json_object(f, items):
+    """逐个成员写入第1层的JSON对象，避免一次性构建完整字符串"""
+    first = True
+    for key, value in items:
+        f.write("{\n    " if first else ",\n    ")
+        f.write(json.dumps(key, ensure_ascii=False))
+        f.write(": ")
+        f.write(_indent_json(value, 2))
+        first = False
+    f.write("{}" if first else "\n  }")
@@ -0,0 +1,498 @@
+"""
+依赖代码检索 - 在导出的依赖仓库上建立 BM25 倒排索引，为提示词挑选相关的代码片段
+
+    index = SnippetIndex("output/rich")
+    index.update()                                  # 仓库内容没有变化时不重建
+    index.search(["console", "table"], top_k=3)     # 按 BM25 得分排序的片段
+    dependency_context(usage_data, max_tokens=1500) # 按项目实际使用的符号取片段，拼成 Markdown
+
+每个导出仓库（output/<仓库名>/ 下的 content.txt，或对象库模式的 manifest.json）单独一个
+SQLite FTS5 索引 retrieval.db，内容变化时只重建该仓库的索引。片段按顶层 def/class 切分，
+索引中只保存分词结果（contentless 表）和片段在源文件中的字节位置，查询时再按位置读取原文。
+
+分词按标识符进行：print_json 记为 print_json、print、json，ConsoleRenderable 记为
+consolerenderable、console、renderable；片段中定义的函数和类名单独成列，得分权重更高。
+"""
+
+import json
+import keyword
+import os
+import re
+import sqlite3
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .profiling import tracer
+from .sources import BlobManifestProvider, IngestProvider
+from .transitive import DependencyResolver, _ingest_content
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    blob TEXT,
+    offset INTEGER NOT NULL
+);
+CREATE TABLE snippets (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files(id),
+    start_line INTEGER NOT NULL,
+    end_line INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL
+);
+CREATE VIRTUAL TABLE fts USING fts5(
+    defs, body, content='', tokenize="unicode61 tokenchars '_'"
+);
+"""
+
+# 定义列（片段中定义的函数、类名）相对正文的 BM25 权重
+DEFS_WEIGHT = 4.0
+
+DEFAULT_MAX_TOKENS = 1500
+DEFAULT_TOP_K = 3
+MAX_QUERY_TERMS = 24
+
+# 片段行数：过短的片段与后一个合并，过长的片段按固定行数切开
+MIN_SNIPPET_LINES = 8
+MAX_SNIPPET_LINES = 60
+
+# 测试代码大量重复被测的名称，会挤掉真正的实现；examples 保留，它们正是用法示例
+_SKIP_DIRS = {"tests", "test"}
+
+_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_WORD = re.compile(r"[A-Z]+(?=[A-Z][a-z]|\b|_|\d)|[A-Z]?[a-z]+|[A-Z]+|\d+")
+_BLOCK_START = re.compile(rb"(?:@|(?:async\s+)?def\s|class\s)")
+_DEFINITION = re.compile(rb"^[ \t]*(?:async[ \t]+)?(?:def|class)[ \t]+(\w+)", re.MULTILINE)
+# 导入语句（尤其是 __init__.py 中成片的重新导出）只罗列名称，不计入正文
+_IMPORT_LINE = re.compile(
+    rb"^[ \t]*(?:from[ \t]+\S+[ \t]+)?import[ \t](?:[^(\n]*\([^)]*\)|.*)$", re.MULTILINE
+)
+
+_STOPWORDS = {word.lower() for word in keyword.kwlist} | {
+    "self", "cls", "args", "kwargs", "none", "true", "false",
+}
+
+
+def identifier_tokens(text: str) -> List[str]:
+    """按标识符分词：完整标识符（小写）以及按下划线、大小写切分出的各个单词"""
+    tokens = []
+    for identifier in _IDENTIFIER.findall(text):
+        lowered = identifier.lower()
+        if len(lowered) < 2 or lowered in _STOPWORDS:
+            continue
+        tokens.append(lowered)
+        words = [word.lower() for part in identifier.split("_") for word in _WORD.findall(part)]
+        if len(words) > 1:
+            tokens.extend(word for word in words if len(word) > 1 and word not in _STOPWORDS)
+    return tokens
+
+
+def split_snippets(content: bytes) -> Iterator[Tuple[int, int, int, int]]:
+    """
+    把一个源文件切成片段：顶层 def/class（连同装饰器）各自成段，其间的模块级代码单独成段
+
+    Returns:
+        (起始行, 结束行, 字节偏移, 字节长度)，行号从1开始
+    """
+    lines = content.splitlines(keepends=True)
+    starts = [0]
+    for number, line in enumerate(lines):
+        if number and _BLOCK_START.match(line) and not lines[number - 1].startswith(b"@"):
+            starts.append(number)
+    starts.append(len(lines))
+
+    blocks = []
+    for begin, end in zip(starts, starts[1:]):
+        if begin == end:
+            continue
+        for window in range(begin, end, MAX_SNIPPET_LINES):
+            blocks.append([window, min(window + MAX_SNIPPET_LINES, end)])
+    merged = []
+    for block in blocks:
+        if merged and merged[-1][1] - merged[-1][0] < MIN_SNIPPET_LINES \
+                and block[1] - merged[-1][0] <= MAX_SNIPPET_LINES:
+            merged[-1][1] = block[1]
+        else:
+            merged.append(block)
+
+    offsets = [0]
+    for line in lines:
+        offsets.append(offsets[-1] + len(line))
+    for begin, end in merged:
+        if content[offsets[begin]:offsets[end]].strip():
+            yield begin + 1, end, offsets[begin], offsets[end] - offsets[begin]
+
+
+def _skip_path(rel_path: str) -> bool:
+    return any(part in _SKIP_DIRS for part in rel_path.split("/")[:-1])
+
+
+def estimate_tokens(size: int) -> int:
+    """按每4字节一个 token 估算（与导出摘要中的估算一致）"""
+    return size // 4
+
+
+class SnippetIndex:
+    """单个导出仓库的 BM25 片段索引，仓库内容变化时整体重建"""
+
+    def __init__(self, repo_dir: str, db_path: Optional[str] = None):
+        self.repo_dir = Path(repo_dir)
+        self.db_path = Path(db_path) if db_path else self.repo_dir / "retrieval.db"
+        self.conn: Optional[sqlite3.Connection] = None
+        self._meta: Dict[str, str] = {}
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ------------------------------------------------------------------
+    # 构建
+    # ------------------------------------------------------------------
+
+    def _signature(self) -> Optional[str]:
+        content = _ingest_content(self.repo_dir)
+        if content is None:
+            return None
+        stat = content.stat()
+        return f"{content.name}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    def _open(self) -> Dict[str, str]:
+        if self.conn is None:
+            self._meta = {}
+            if not self.db_path.is_file():
+                return self._meta
+            self.conn = sqlite3.connect(str(self.db_path))
+            try:
+                self._meta = dict(self.conn.execute("SELECT key, value FROM meta"))
+            except sqlite3.DatabaseError:
+                self.close()
+        return self._meta
+
+    def is_current(self) -> bool:
+        meta = self._open()
+        return (
+            meta.get("schema_version") == str(SCHEMA_VERSION)
+            and meta.get("signature") == self._signature()
+        )
+
+    def update(self, force: bool = False) -> bool:
+        """
+        仓库内容（content.txt / manifest.json）的大小或修改时间变化时重建索引
+
+        Returns:
+            bool: 是否重建
+        """
+        if not force and self.is_current():
+            return False
+        signature = self._signature()
+        if signature is None:
+            raise FileNotFoundError(f"没有导出的仓库内容: {self.repo_dir}")
+
+        self.close()
+        # 先写到临时文件再替换，查询方不会读到构建到一半的索引
+        tmp_path = self.db_path.with_name(self.db_path.name + ".tmp")
+        tmp_path.unlink(missing_ok=True)
+        with tracer.span("retrieval.build", "index", repo=self.repo_dir.name) as span:
+            conn = sqlite3.connect(str(tmp_path))
+            try:
+                conn.execute("PRAGMA journal_mode=OFF")
+                conn.execute("PRAGMA synchronous=OFF")
+                conn.executescript(SCHEMA)
+                with conn:
+                    meta = self._build(conn)
+                    meta.update(schema_version=str(SCHEMA_VERSION), signature=signature)
+                    conn.executemany("INSERT INTO meta(key, value) VALUES (?, ?)", meta.items())
+                    conn.execute("INSERT INTO fts(fts) VALUES ('optimize')")
+                conn.execute("VACUUM")
+            finally:
+                conn.close()
+            span.attrs["snippets"] = int(meta["snippets"])
+        os.replace(tmp_path, self.db_path)
+        return True
+
+    def _iter_files(self) -> Iterator[Tuple[str, Optional[str], int, bytes]]:
+        """产出 (相对路径, 对象哈希, 文件在 content.txt 中的偏移, 内容)"""
+        content = _ingest_content(self.repo_dir)
+        if content.name == "manifest.json":
+            provider = BlobManifestProvider(str(content), _skip_path)
+            for rel_path in provider.iter_files():
+                try:
+                    yield rel_path, provider.entries[rel_path], 0, provider.read_bytes(rel_path)
+                except OSError:
+                    continue
+        else:
+            for rel_path, offset, data in IngestProvider(str(content), _skip_path).iter_entries():
+                yield rel_path, None, offset, data
+
+    def _build(self, conn: sqlite3.Connection) -> Dict[str, str]:
+        meta = {"source": _ingest_content(self.repo_dir).name}
+        if meta["source"] == "manifest.json":
+            with open(self.repo_dir / "manifest.json", encoding="utf-8") as f:
+                meta["store"] = json.load(f)["store"]
+
+        file_count = snippet_count = 0
+        for rel_path, blob, file_offset, data in self._iter_files():
+            file_id = conn.execute(
+                "INSERT INTO files(path, blob, offset) VALUES (?, ?, ?)",
+                (rel_path, blob, file_offset),
+            ).lastrowid
+            file_count += 1
+            # 路径中的模块名也参与检索（rich/table.py 与 Table 相关）
+            path_tokens = identifier_tokens(rel_path[:-3] if rel_path.endswith(".py") else rel_path)
+            for start_line, end_line, offset, length in split_snippets(data):
+                text = data[offset:offset + length]
+                snippet_id = conn.execute(
+                    "INSERT INTO snippets(file_id, start_line, end_line, offset, length) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (file_id, start_line, end_line, offset, length),
+                ).lastrowid
+                defs = " ".join(
+                    identifier_tokens(" ".join(
+                        name.decode("ascii", "replace") for name in _DEFINITION.findall(text)
+                    ))
+                )
+                body = " ".join(
+                    path_tokens + identifier_tokens(_IMPORT_LINE.sub(b"", text).decode("utf-8", "replace"))
+                )
+                conn.execute(
+                    "INSERT INTO fts(rowid, defs, body) VALUES (?, ?, ?)",
+                    (snippet_id, defs, body),
+                )
+                snippet_count += 1
+        meta.update(files=str(file_count), snippets=str(snippet_count))
+        return meta
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+
+    def search(self, terms: Iterable[str], top_k: int = DEFAULT_TOP_K) -> List[Dict]:
+        """
+        按 BM25 得分返回最相关的 top_k 个片段（不含原文，原文用 read() 读取）
+
+        Returns:
+            [{"path", "start_line", "end_line", "score", "tokens", ...}]
+        """
+        # 检索词只取完整标识符，切分出的单词（print、json）过于常见
+        tokens = list(dict.fromkeys(
+            identifier.lower()
+            for term in terms
+            for identifier in _IDENTIFIER.findall(term)
+            if len(identifier) > 1 and identifier.lower() not in _STOPWORDS
+        ))
+        self._open()
+        if not tokens or self.conn is None:
+            return []
+        query = " OR ".join(f'"{token}"' for token in tokens)
+        rows = self.conn.execute(
+            """
+            WITH hits AS (
+                SELECT rowid AS id, bm25(fts, ?, 1.0) AS score
+                FROM fts WHERE fts MATCH ? ORDER BY score LIMIT ?
+            )
+            SELECT f.path, f.blob, f.offset + s.offset, s.length, s.start_line, s.end_line, hits.score
+            FROM hits
+            JOIN snippets s ON s.id = hits.id
+            JOIN files f ON f.id = s.file_id
+            ORDER BY hits.score
+            """,
+            (DEFS_WEIGHT, query, top_k),
+        ).fetchall()
+        return [
+            {
+                "repository": self.repo_dir.name,
+                "path": path,
+                "blob": blob,
+                "offset": offset,
+                "length": length,
+                "start_line": start_line,
+                "end_line": end_line,
+                # FTS5 的 bm25() 越相关越小（负数）
+                "score": round(-score, 4),
+                "tokens": estimate_tokens(length),
+            }
+            for path, blob, offset, length, start_line, end_line, score in rows
+        ]
+
+    def read(self, hit: Dict) -> str:
+        """按索引中记录的位置读取片段原文"""
+        if hit["blob"]:
+            from .blob_store import BlobStore
+
+            path = BlobStore(str(self.repo_dir / self._meta["store"])).blob_path(hit["blob"])
+        else:
+            path = self.repo_dir / "content.txt"
+        with open(path, "rb") as f:
+            f.seek(hit["offset"])
+            return f.read(hit["length"]).decode("utf-8", "replace")
+
+    def stats(self) -> Dict[str, int]:
+        meta = self._open()
+        return {
+            "files": int(meta.get("files", 0)),
+            "snippets": int(meta.get("snippets", 0)),
+            "bytes": self.db_path.stat().st_size if self.db_path.is_file() else 0,
+        }
+
+
+def usage_terms(entry: Dict, limit: int = MAX_QUERY_TERMS) -> List[str]:
+    """一个包在 usage_data 中使用过的符号，按使用次数排序，作为检索词"""
+    counts: Counter = Counter()
+    for kind in ("functions", "classes", "modules"):
+        for name, count in entry.get(kind, {}).items():
+            for part in name.split("."):
+                if part.lower() not in _STOPWORDS and _IDENTIFIER.fullmatch(part):
+                    counts[part] += count
+    return [term for term, _ in counts.most_common(limit)]
+
+
+def build_indexes(ingest_dir: str = "output") -> Dict[str, bool]:
+    """
+    为 ingest_dir 下每个导出的仓库建立或更新索引
+
+    Returns:
+        dict: 仓库名 -> 是否重建
+    """
+    root = Path(ingest_dir)
+    if not root.is_dir():
+        return {}
+    results = {}
+    for repo_dir in sorted(root.iterdir()):
+        if repo_dir.is_dir() and _ingest_content(repo_dir) is not None:
+            with SnippetIndex(str(repo_dir)) as index:
+                results[repo_dir.name] = index.update()
+    return results
+
+
+def retrieve(
+    usage_data: Dict,
+    ingest_dir: str = "output",
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    top_k: int = DEFAULT_TOP_K,
+    exclude: Iterable[str] = (),
+) -> List[Tuple[str, List[Dict]]]:
+    """
+    按项目对每个第三方包实际使用的符号检索该包仓库中的片段，总量不超过 max_tokens
+
+    使用次数多的包优先；各个包轮流取下一个最相关的片段，放不下的片段跳过。
+
+    Returns:
+        [(包名, [片段, ...])]，片段带 "text"
+    """
+    if max_tokens <= 0:
+        return []
+    excluded = set(exclude) | set(sys.stdlib_module_names)
+    resolver = DependencyResolver(ingest_dir)
+    indexes: Dict[str, SnippetIndex] = {}
+    candidates = []
+    try:
+        with tracer.span("retrieval.search", "index") as span:
+            ranked = sorted(usage_data.items(), key=lambda item: -item[1].get("total_usage", 0))
+            for package, entry in ranked:
+                terms = usage_terms(entry)
+                if package in excluded or not terms:
+                    continue
+                resolved = resolver.ingested(package)
+                if resolved is None:
+                    continue
+                repo_dir = str(Path(resolved["path"]).parent)
+                index = indexes.get(repo_dir)
+                if index is None:
+                    index = indexes[repo_dir] = SnippetIndex(repo_dir)
+                    index.update()
+                hits = index.search([package] + terms, top_k)
+                if hits:
+                    candidates.append((package, index, hits))
+            span.attrs["packages"] = len(candidates)
+
+        selected: Dict[str, List[Dict]] = {package: [] for package, _, _ in candidates}
+        seen = set()
+        budget = max_tokens
+        for rank in range(top_k):
+            for package, index, hits in candidates:
+                if rank >= len(hits):
+                    continue
+                hit = hits[rank]
+                key = (hit["repository"], hit["path"], hit["start_line"])
+                if key in seen or hit["tokens"] > budget:
+                    continue
+                seen.add(key)
+                budget -= hit["tokens"]
+                selected[package].append(dict(hit, text=index.read(hit)))
+        return [(package, hits) for package, hits in selected.items() if hits]
+    finally:
+        for index in indexes.values():
+            index.close()
+
+
+def format_context(results: List[Tuple[str, List[Dict]]]) -> str:
+    """把检索结果拼成提示词中的 Markdown"""
+    sections = []
+    for package, hits in results:
+        lines = [f"### {package}"]
+        for hit in hits:
+            lines.append(
+                f"`{hit['repository']}/{hit['path']}` (lines {hit['start_line']}-{hit['end_line']})"
+            )
+            lines.append(f"```python\n{hit['text'].rstrip()}\n```")
+        sections.append("\n\n".join(lines))
+    return "\n\n".join(sections)
+
+
+def dependency_context(usage_data: Dict, ingest_dir: str = "output",
+                       max_tokens: int = DEFAULT_MAX_TOKENS, top_k: int = DEFAULT_TOP_K,
+                       exclude: Iterable[str] = ()) -> str:
+    """retrieve() 的结果拼成 Markdown，没有可用的导出仓库时返回空字符串"""
+    return format_context(retrieve(usage_data, ingest_dir, max_tokens, top_k, exclude))
+
+
+def usage_path(report_file: str) -> str:
+    """报告对应的使用数据文件：report.md -> report.usage.json"""
+    return os.path.splitext(report_file)[0] + ".usage.json"
+
+
+def save_usage(usage_data: Dict, report_file: str, exclude: Iterable[str] = (),
+               versions: Optional[Dict[str, str]] = None):
+    """
+    保存第三方包的使用数据，供之后的阶段按报告检索依赖代码
+
+    给出 versions（导入名 -> 被分析项目中的版本）时一并写入各条目的 "version"。
+    """
+    excluded = set(exclude) | set(sys.stdlib_module_names)
+    versions = versions or {}
+    with open(usage_path(report_file), "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                package: {**entry, "version": versions[package]} if package in versions else entry
+                for package, entry in usage_data.items()
+                if package not in excluded
+            },
+            f, ensure_ascii=False,
+        )
+
+
+def context_for_report(report_file: str, ingest_dir: str = "output",
+                       max_tokens: int = DEFAULT_MAX_TOKENS, top_k: int = DEFAULT_TOP_K) -> str:
+    """按报告旁保存的使用数据检索依赖代码片段；没有使用数据或导出的仓库时返回空字符串"""
+    try:
+        with open(usage_path(report_file), encoding="utf-8") as f:
+            usage_data = json.load(f)
+    except (OSError, ValueError):
+        return ""
+    return dependency_context(usage_data, ingest_dir, max_tokens, top_k)
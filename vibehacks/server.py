@@ -0,0 +1,321 @@
+"""
+分析守护进程 - 在内存中常驻一个或多个项目的分析索引，通过本机HTTP回答查询
+
+    vibehacks serve --port 8787
+    vibehacks analyze /path/to/project          # CLI 客户端自动读取令牌并转发查询
+
+接口（均返回JSON）:
+    GET  /health                              运行状态与已加载的项目
+    GET  /summary?project=PATH&top=20         总体统计与最常用的包
+    GET  /package?project=PATH&name=PKG       单个包的导入与使用详情
+    GET  /files?project=PATH&package=PKG      导入了某个包的文件
+    GET  /analysis?project=PATH               完整的 imports/usage 数据（CLI客户端模式使用）
+    POST /refresh?project=PATH                强制重新扫描
+    POST /shutdown                            停止守护进程
+
+每次查询前按 mtime/size 增量刷新索引，只重新解析发生变化的文件；
+启用 watch 时改由文件监听线程实时更新，查询不再扫描目录。
+
+守护进程只监听本机地址，并且每个请求都需要认证：启动时生成一次性令牌写入
+<缓存目录>/daemon/<端口>.token（权限0600），请求须带 "Authorization: Bearer <令牌>"。
+Host 不是本机地址或带有 Origin 头（浏览器发出的跨站请求）的请求一律拒绝。
+
+    curl -H "Authorization: Bearer $(cat ~/.cache/vibehacks/daemon/8787.token)" \
+        'http://127.0.0.1:8787/health'
+"""
+
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+from . import __version__
+from .client import DEFAULT_HOST, DEFAULT_PORT, QueryError, token_path
+from .index import ProjectIndex
+from .reporter import ReportSummary
+
+LOCAL_HOSTS = {"127.0.0.1", "localhost", "::1"}
+
+
+def encode_results(imports_data: Dict, usage_data: Dict) -> Dict:
+    """将分析结果转换为可JSON序列化的结构（set -> 排序列表），与 client.decode_results 互逆"""
+    return {
+        "imports": {
+            package: {
+                "functions": sorted(data["functions"]),
+                "classes": sorted(data["classes"]),
+                "modules": sorted(data["modules"]),
+                "aliases": data["aliases"],
+                "files": sorted(data["files"]),
+            }
+            for package, data in imports_data.items()
+        },
+        "usage": {
+            package: {
+                "functions": dict(data["functions"]),
+                "classes": dict(data["classes"]),
+                "modules": dict(data["modules"]),
+                "total_usage": data["total_usage"],
+            }
+            for package, data in usage_data.items()
+        },
+    }
+
+
+class AnalysisServer:
+    """常驻内存的分析服务，按项目路径缓存 ProjectIndex"""
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 refresh_interval: float = 0.0, watch: bool = False):
+        self.refresh_interval = refresh_interval
+        self.watch = watch
+        self.projects: Dict[str, ProjectIndex] = {}
+        self._last_refresh: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._stop_watching = threading.Event()
+        self.started_at = time.time()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread = None
+        self.token = secrets.token_urlsafe(32)
+        self.token_path = token_path(self.httpd.server_address[1])
+        self._write_token()
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _write_token(self):
+        """写入令牌文件，只有当前用户可读写"""
+        self.token_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.token_path.with_name(f".{self.token_path.name}.{os.getpid()}.tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(self.token)
+        os.replace(tmp_path, self.token_path)
+
+    def _remove_token(self):
+        """删除令牌文件（已被之后启动的守护进程覆盖时保留）"""
+        try:
+            if self.token_path.read_text(encoding="utf-8").strip() == self.token:
+                self.token_path.unlink()
+        except OSError:
+            pass
+
+    def authorize(self, headers) -> None:
+        """校验请求来源与令牌，不通过时抛出 QueryError"""
+        host = (headers.get("Host") or "").rsplit(":", 1)[0].strip("[]")
+        if host not in LOCAL_HOSTS or headers.get("Origin") is not None:
+            raise QueryError(403, "只接受来自本机客户端的请求")
+        scheme, _, token = (headers.get("Authorization") or "").partition(" ")
+        if scheme != "Bearer" or not hmac.compare_digest(token.encode(), self.token.encode()):
+            raise QueryError(401, "缺少或错误的守护进程令牌")
+
+    # ------------------------------------------------------------------
+    # 索引管理
+    # ------------------------------------------------------------------
+
+    def get_index(self, project: Optional[str], refresh: bool = True) -> ProjectIndex:
+        """获取项目索引，首次访问时完整分析，之后按间隔增量刷新"""
+        if not project:
+            raise QueryError(400, "缺少参数: project")
+        path = Path(project).resolve()
+        if not path.is_dir():
+            raise QueryError(404, f"项目目录不存在: {project}")
+
+        key = str(path)
+        with self._lock:
+            index = self.projects.get(key)
+            created = index is None
+            if created:
+                index = self.projects[key] = ProjectIndex(key)
+                # 初次分析在全局锁之外进行；先持有索引锁，其他请求查询该项目时等待分析完成
+                index.lock.acquire()
+
+        if created:
+            try:
+                index.refresh()
+                self._last_refresh[key] = time.monotonic()
+            except BaseException:
+                # 不缓存初次分析失败的空索引，下一次查询重新分析
+                with self._lock:
+                    self.projects.pop(key, None)
+                raise
+            finally:
+                index.lock.release()
+            if self.watch:
+                self._start_watching(index)
+            return index
+
+        if refresh and not self.watch:
+            now = time.monotonic()
+            if now - self._last_refresh.get(key, float("-inf")) >= self.refresh_interval:
+                index.refresh()
+                self._last_refresh[key] = now
+        return index
+
+    def _start_watching(self, index: ProjectIndex):
+        from .watch import watch
+
+        threading.Thread(
+            target=watch,
+            args=(index, lambda changes: None),
+            kwargs={"stop_event": self._stop_watching},
+            daemon=True,
+        ).start()
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+
+    def handle(self, method: str, endpoint: str, params: Dict[str, str]) -> Dict:
+        """处理一次查询，返回JSON响应体"""
+        if method == "GET" and endpoint == "/health":
+            return {
+                "status": "ok",
+                "version": __version__,
+                "uptime_s": round(time.time() - self.started_at, 1),
+                "projects": {key: len(index.files) for key, index in list(self.projects.items())},
+            }
+
+        if method == "POST" and endpoint == "/refresh":
+            index = self.get_index(params.get("project"), refresh=False)
+            changes = index.refresh()
+            self._last_refresh[str(index.project_path)] = time.monotonic()
+            return {"project": str(index.project_path), "changes": changes}
+
+        if method != "GET":
+            raise QueryError(404, f"未知接口: {method} {endpoint}")
+
+        index = self.get_index(params.get("project"))
+        with index.lock:
+            if endpoint == "/analysis":
+                return encode_results(*index.results())
+            if endpoint == "/summary":
+                return self._summary(index, int(params.get("top", 20)))
+            if endpoint == "/package":
+                return self._package(index, params.get("name"))
+            if endpoint == "/files":
+                package = params.get("package")
+                if not package:
+                    raise QueryError(400, "缺少参数: package")
+                return {"package": package, "files": index.files_importing(package)}
+        raise QueryError(404, f"未知接口: {endpoint}")
+
+    def _summary(self, index: ProjectIndex, top: int) -> Dict:
+        imports_data, usage_data = index.results()
+        view = ReportSummary(imports_data, usage_data, top_k=top)
+        packages = []
+        for package in view.ranked_packages:
+            total_usage, func_count, class_count, file_count = view.package_row(package)
+            packages.append({
+                "package": package,
+                "total_usage": total_usage,
+                "functions": func_count,
+                "classes": class_count,
+                "files": file_count,
+            })
+        return {
+            "project": str(index.project_path),
+            "files": len(index.files),
+            "totals": dict(view.totals),
+            "packages": packages,
+        }
+
+    def _package(self, index: ProjectIndex, package: Optional[str]) -> Dict:
+        if not package:
+            raise QueryError(400, "缺少参数: name")
+        imports_data, usage_data = index.results()
+        if package not in imports_data and package not in usage_data:
+            raise QueryError(404, f"未找到包: {package}")
+        encoded = encode_results(
+            {package: imports_data[package]} if package in imports_data else {},
+            {package: usage_data[package]} if package in usage_data else {},
+        )
+        return {
+            "package": package,
+            "imports": encoded["imports"].get(package),
+            "usage": encoded["usage"].get(package),
+        }
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _dispatch(self, method):
+                url = urlparse(self.path)
+                params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                endpoint = url.path.rstrip("/") or "/"
+
+                try:
+                    server.authorize(self.headers)
+                except QueryError as e:
+                    self._send_json(e.status, {"error": str(e)})
+                    return
+
+                if method == "POST" and endpoint == "/shutdown":
+                    self._send_json(200, {"status": "stopping"})
+                    threading.Thread(target=server.httpd.shutdown, daemon=True).start()
+                    return
+
+                try:
+                    payload = server.handle(method, endpoint, params)
+                except QueryError as e:
+                    self._send_json(e.status, {"error": str(e)})
+                except Exception as e:
+                    self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+                else:
+                    self._send_json(200, payload)
+
+            def do_GET(self):
+                self._dispatch("GET")
+
+            def do_POST(self):
+                self._dispatch("POST")
+
+            def _send_json(self, status, payload):
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+    def serve_forever(self):
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self._stop_watching.set()
+            self.httpd.server_close()
+            self._remove_token()
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop_watching.set()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self._remove_token()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
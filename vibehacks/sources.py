@@ -0,0 +1,400 @@
+"""
+源代码提供者 - 不解压归档、不检出版本，直接把 .py 文件内容交给分析器
+
+    with open_source("dist/requests-2.31.0-py3-none-any.whl") as source:
+        analyzer = ImportAnalyzer(source.root, source=source)
+        imports_data, usage_data = analyzer.analyze_project()
+
+支持的来源：
+- 目录（FilesystemProvider）
+- zip / wheel / egg（ZipProvider）：按成员名读取，解压只发生在内存中
+- tar / tar.gz / tar.bz2 / tar.xz，如 sdist（TarProvider）：流式单次读取，不需要随机访问
+- git 仓库的任意提交（GitTreeProvider）：git ls-tree 列出文件，
+  一个常驻的 git cat-file --batch 进程按顺序输出文件内容，无需检出
+- gitingest 导出的 content.txt（IngestProvider）：逐行流式切分出各个文件
+- 已安装的发行版（DistributionProvider）：按 RECORD 中的文件列表读取
+- 对象库模式的流式导出（BlobManifestProvider）：按 manifest.json 的条目从内容寻址对象库读取
+
+所有提供者都以 (相对路径, 字节内容) 的形式产出文件，相对路径使用 / 分隔。
+"""
+
+import json
+import os
+import subprocess
+import tarfile
+import threading
+import zipfile
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple
+
+ARCHIVE_SUFFIXES = {
+    ".zip": "zip",
+    ".whl": "zip",
+    ".egg": "zip",
+    ".tar": "tar",
+    ".tgz": "tar",
+    ".tar.gz": "tar",
+    ".tar.bz2": "tar",
+    ".tar.xz": "tar",
+}
+
+IgnoreFunc = Callable[[str], bool]
+
+
+class SourceProvider:
+    """源代码提供者基类"""
+
+    def __init__(self, root: str, ignore: Optional[IgnoreFunc] = None):
+        # 用于显示的来源名称（目录、归档路径或 仓库@版本）
+        self.root = root
+        self.ignores: List[IgnoreFunc] = [ignore] if ignore else []
+
+    def add_ignore(self, ignore: IgnoreFunc):
+        """追加一个忽略规则，同一规则只添加一次"""
+        if ignore not in self.ignores:
+            self.ignores.append(ignore)
+
+    def iter_files(self) -> List[str]:
+        """全部待分析 .py 文件的相对路径"""
+        return [rel_path for rel_path, _ in self.iter_sources()]
+
+    def iter_sources(self) -> Iterator[Tuple[str, bytes]]:
+        """逐个产出 (相对路径, 字节内容)"""
+        raise NotImplementedError
+
+    def read_bytes(self, rel_path: str) -> bytes:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _wanted(self, rel_path: str) -> bool:
+        return rel_path.endswith(".py") and not any(ignore(rel_path) for ignore in self.ignores)
+
+
+class FilesystemProvider(SourceProvider):
+    """本地目录"""
+
+    def __init__(self, path: str, ignore: Optional[IgnoreFunc] = None):
+        super().__init__(str(path), ignore)
+        self.path = Path(path)
+
+    def iter_files(self) -> List[str]:
+        return sorted(
+            rel_path
+            for rel_path in (p.relative_to(self.path).as_posix() for p in self.path.rglob("*.py"))
+            if self._wanted(rel_path)
+        )
+
+    def iter_sources(self) -> Iterator[Tuple[str, bytes]]:
+        for rel_path in self.iter_files():
+            try:
+                yield rel_path, self.read_bytes(rel_path)
+            except OSError:
+                continue
+
+    def read_bytes(self, rel_path: str) -> bytes:
+        return (self.path / rel_path).read_bytes()
+
+
+class ZipProvider(SourceProvider):
+    """zip 归档（wheel、egg 也是 zip 格式）"""
+
+    def __init__(self, path: str, ignore: Optional[IgnoreFunc] = None):
+        super().__init__(str(path), ignore)
+        try:
+            self.archive = zipfile.ZipFile(path)
+        except zipfile.BadZipFile as e:
+            raise ValueError(f"无法读取zip归档 {path}: {e}") from e
+
+    def iter_files(self) -> List[str]:
+        return sorted(
+            info.filename for info in self.archive.infolist()
+            if not info.is_dir() and self._wanted(info.filename)
+        )
+
+    def iter_sources(self) -> Iterator[Tuple[str, bytes]]:
+        for rel_path in self.iter_files():
+            yield rel_path, self.archive.read(rel_path)
+
+    def read_bytes(self, rel_path: str) -> bytes:
+        return self.archive.read(rel_path)
+
+    def close(self):
+        self.archive.close()
+
+
+class TarProvider(SourceProvider):
+    """
+    tar 归档（含 gzip/bz2/xz 压缩），如 sdist
+
+    iter_sources 以流模式单次读取，成员按归档中的顺序产出；
+    read_bytes 需要随机访问，只适合少量读取。
+    """
+
+    def __init__(self, path: str, ignore: Optional[IgnoreFunc] = None):
+        super().__init__(str(path), ignore)
+        self.path = str(path)
+
+    def iter_sources(self) -> Iterator[Tuple[str, bytes]]:
+        try:
+            with tarfile.open(self.path, "r|*") as archive:
+                for member in archive:
+                    # tar -C dir . 打包的成员带有 ./ 前缀
+                    rel_path = member.name.removeprefix("./")
+                    if not member.isfile() or not self._wanted(rel_path):
+                        continue
+                    extracted = archive.extractfile(member)
+                    if extracted is not None:
+                        yield rel_path, extracted.read()
+        except tarfile.TarError as e:
+            raise ValueError(f"无法读取tar归档 {self.path}: {e}") from e
+
+    def read_bytes(self, rel_path: str) -> bytes:
+        with tarfile.open(self.path, "r:*") as archive:
+            extracted = archive.extractfile(rel_path)
+            if extracted is None:
+                raise KeyError(rel_path)
+            return extracted.read()
+
+
+class GitTreeProvider(SourceProvider):
+    """git 仓库中某个提交的文件树，不需要检出"""
+
+    def __init__(
+        self,
+        repo: str,
+        rev: str = "HEAD",
+        subdir: Optional[str] = None,
+        ignore: Optional[IgnoreFunc] = None,
+    ):
+        super().__init__(f"{repo}@{rev}", ignore)
+        self.repo = str(repo)
+        self.rev = rev
+        self.subdir = subdir.strip("/") + "/" if subdir else ""
+        self._entries: Optional[List[Tuple[str, str]]] = None
+
+    def _git(self, *args: str) -> bytes:
+        result = subprocess.run(
+            ["git", "-C", self.repo, *args], capture_output=True
+        )
+        if result.returncode != 0:
+            raise ValueError(
+                f"git {' '.join(args)} 失败: {result.stderr.decode('utf-8', 'replace').strip()}"
+            )
+        return result.stdout
+
+    def entries(self) -> List[Tuple[str, str]]:
+        """(相对路径, blob对象ID) 列表，按路径排序"""
+        if self._entries is None:
+            output = self._git("ls-tree", "-r", "-z", "--full-tree", self.rev)
+            entries = []
+            for record in output.split(b"\0"):
+                if not record:
+                    continue
+                meta, _, path = record.partition(b"\t")
+                mode, object_type, object_id = meta.split()
+                # 跳过符号链接(120000)和子模块
+                if object_type != b"blob" or mode == b"120000":
+                    continue
+                rel_path = os.fsdecode(path)
+                if not rel_path.startswith(self.subdir):
+                    continue
+                rel_path = rel_path[len(self.subdir):]
+                if self._wanted(rel_path):
+                    entries.append((rel_path, object_id.decode("ascii")))
+            self._entries = sorted(entries)
+        return self._entries
+
+    def iter_files(self) -> List[str]:
+        return [rel_path for rel_path, _ in self.entries()]
+
+    def iter_sources(self) -> Iterator[Tuple[str, bytes]]:
+        entries = self.entries()
+        if not entries:
+            return
+        process = subprocess.Popen(
+            ["git", "-C", self.repo, "cat-file", "--batch"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+
+        # 单独的线程写入请求，主线程按相同顺序读取输出，避免管道缓冲区写满后互相等待
+        def feed():
+            try:
+                for _, object_id in entries:
+                    process.stdin.write(object_id.encode("ascii") + b"\n")
+                process.stdin.close()
+            except (BrokenPipeError, ValueError):
+                pass
+
+        writer = threading.Thread(target=feed, daemon=True)
+        writer.start()
+        try:
+            for rel_path, _ in entries:
+                header = process.stdout.readline().split()
+                if len(header) != 3:
+                    # "<对象ID> missing"：对象不存在
+                    continue
+                size = int(header[2])
+                content = process.stdout.read(size)
+                process.stdout.read(1)
+                yield rel_path, content
+        finally:
+            process.stdout.close()
+            process.kill()
+            process.wait()
+            writer.join()
+
+    def read_bytes(self, rel_path: str) -> bytes:
+        return self._git("cat-file", "blob", f"{self.rev}:{self.subdir}{rel_path}")
+
+
+class IngestProvider(SourceProvider):
+    """
+    gitingest 导出的 content.txt
+
+    文件之间以“分隔线 / FILE: 路径 / 分隔线”三行开头，逐行读取，内存占用与单个文件大小相当。
+    """
+
+    SEPARATOR = b"=" * 48
+
+    def __init__(self, path: str, ignore: Optional[IgnoreFunc] = None):
+        super().__init__(str(path), ignore)
+        self.path = str(path)
+
+    def iter_entries(self) -> Iterator[Tuple[str, int, bytes]]:
+        """产出 (相对路径, 文件内容在 content.txt 中的字节偏移, 内容)"""
+        rel_path = None
+        offset = position = 0
+        chunks: List[bytes] = []
+        # 最多缓存两行，用于识别三行的文件头
+        pending: List[bytes] = []
+        with open(self.path, "rb") as f:
+            for line in f:
+                pending.append(line)
+                position += len(line)
+                if len(pending) < 3:
+                    continue
+                if (
+                    pending[0].rstrip(b"\r\n") == self.SEPARATOR
+                    and pending[1].startswith(b"FILE: ")
+                    and pending[2].rstrip(b"\r\n") == self.SEPARATOR
+                ):
+                    if rel_path is not None:
+                        yield rel_path, offset, b"".join(chunks)
+                    name = pending[1][len(b"FILE: "):].rstrip(b"\r\n").decode("utf-8", "replace")
+                    rel_path = name if self._wanted(name) else None
+                    offset = position
+                    chunks = []
+                    pending = []
+                    continue
+                if rel_path is not None:
+                    chunks.append(pending[0])
+                pending.pop(0)
+        if rel_path is not None:
+            chunks.extend(pending)
+            yield rel_path, offset, b"".join(chunks)
+
+    def iter_sources(self) -> Iterator[Tuple[str, bytes]]:
+        for rel_path, _, content in self.iter_entries():
+            yield rel_path, content
+
+    def read_bytes(self, rel_path: str) -> bytes:
+        for name, content in self.iter_sources():
+            if name == rel_path:
+                return content
+        raise KeyError(rel_path)
+
+
+class DistributionProvider(SourceProvider):
+    """已安装的发行版（importlib.metadata.Distribution），只读取 RECORD 中列出的文件"""
+
+    def __init__(self, distribution, ignore: Optional[IgnoreFunc] = None):
+        super().__init__(
+            f"{distribution.metadata['Name']}=={distribution.version}", ignore
+        )
+        self.distribution = distribution
+
+    def iter_files(self) -> List[str]:
+        return sorted(
+            rel_path
+            for rel_path in (path.as_posix() for path in self.distribution.files or ())
+            # 安装到 site-packages 之外的文件（如 bin/ 下的脚本）以 .. 开头
+            if not rel_path.startswith("../") and self._wanted(rel_path)
+        )
+
+    def iter_sources(self) -> Iterator[Tuple[str, bytes]]:
+        for rel_path in self.iter_files():
+            try:
+                yield rel_path, self.read_bytes(rel_path)
+            except OSError:
+                continue
+
+    def read_bytes(self, rel_path: str) -> bytes:
+        return Path(self.distribution.locate_file(rel_path)).read_bytes()
+
+
+class BlobManifestProvider(SourceProvider):
+    """流式导出（对象库模式）的 manifest.json，文件内容从内容寻址对象库读取"""
+
+    def __init__(self, manifest_path: str, ignore: Optional[IgnoreFunc] = None):
+        from .blob_store import BlobStore
+
+        super().__init__(str(manifest_path), ignore)
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        # 对象库路径相对于 manifest.json 所在目录记录
+        self.store = BlobStore(str(Path(manifest_path).parent / manifest["store"]))
+        self.entries = {rel_path: digest for rel_path, digest, _ in manifest["entries"]}
+
+    def iter_files(self) -> List[str]:
+        return sorted(rel_path for rel_path in self.entries if self._wanted(rel_path))
+
+    def iter_sources(self) -> Iterator[Tuple[str, bytes]]:
+        for rel_path in self.iter_files():
+            try:
+                yield rel_path, self.read_bytes(rel_path)
+            except OSError:
+                continue
+
+    def read_bytes(self, rel_path: str) -> bytes:
+        return self.store.read_bytes(self.entries[rel_path])
+
+
+def archive_kind(path: str) -> Optional[str]:
+    """按文件名判断归档类型（zip/tar），不是归档时返回None"""
+    name = Path(path).name.lower()
+    for suffix in sorted(ARCHIVE_SUFFIXES, key=len, reverse=True):
+        if name.endswith(suffix):
+            return ARCHIVE_SUFFIXES[suffix]
+    return None
+
+
+def open_source(
+    path: str, rev: Optional[str] = None, ignore: Optional[IgnoreFunc] = None
+) -> SourceProvider:
+    """
+    根据路径选择提供者
+
+    Args:
+        path: 目录、归档文件，或指定 rev 时的 git 仓库目录
+        rev: git 提交、分支或标签
+        ignore: 接收相对路径、返回是否跳过的函数
+    """
+    if rev is not None:
+        return GitTreeProvider(path, rev, ignore=ignore)
+    if Path(path).is_dir():
+        return FilesystemProvider(path, ignore)
+    kind = archive_kind(path)
+    if kind == "zip":
+        return ZipProvider(path, ignore)
+    if kind == "tar":
+        return TarProvider(path, ignore)
+    raise ValueError(f"不支持的来源（需要目录、zip/wheel/tar.gz 归档或配合 --rev 的git仓库）: {path}")
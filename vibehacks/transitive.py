@@ -0,0 +1,347 @@
+"""
+依赖的传递分析 - 对每个依赖自身的源码运行 ImportAnalyzer，得到多层的依赖使用树
+
+    resolver = DependencyResolver(ingest_dir="output")
+    tree = TransitiveAnalyzer(resolver, max_depth=2).build(imports_data, usage_data, exclude)
+
+依赖的源码优先取当前环境中已安装的发行版（版本确定，只含发布的文件），
+没有安装时再取 get_all_repos_context 导出到 output/<仓库名>/ 的仓库内容
+（content.txt，或对象库模式下 manifest.json 引用的对象）。
+每个 (发行版, 版本) 的分析结果缓存在 vibehacks 缓存目录中，所有项目、每次运行共用，
+pydantic、httpx、typing_extensions 这类常见依赖只会分析一次。
+"""
+
+import hashlib
+import json
+import re
+import sys
+from functools import lru_cache
+from importlib import metadata
+from pathlib import Path, PurePosixPath
+from typing import Dict, Iterable, List, Optional, Set
+
+from .analyzer import ImportAnalyzer
+from .cache import load_json, save_json
+from .footprint import normalize_name
+from .graph import module_name
+from .profiling import tracer
+from .sources import BlobManifestProvider, DistributionProvider, IngestProvider, SourceProvider
+
+TRANSITIVE_CACHE_VERSION = 2
+
+# 测试、文档、示例目录（仓库内容中常见，部分发行版也会带上 tests）的导入不属于依赖运行时的依赖
+_SKIP_DIRS = {"tests", "test", "docs", "doc", "examples", "benchmarks"}
+
+_COMMIT_LINE = re.compile(r"^Commit:\s*([0-9a-f]{7,40})", re.MULTILINE)
+
+
+@lru_cache(maxsize=None)
+def _packages_distributions() -> Dict[str, List[str]]:
+    """导入名 -> 发行版名；扫描全部已安装发行版的元数据，整个进程只执行一次"""
+    return metadata.packages_distributions()
+
+
+def _skip_dependency_path(rel_path: str) -> bool:
+    return any(part in _SKIP_DIRS for part in rel_path.split("/")[:-1])
+
+
+class DependencyResolver:
+    """把导入名解析为可分析的依赖源码（已安装的发行版或导出的仓库内容）"""
+
+    def __init__(self, ingest_dir: Optional[str] = "output", prefer_installed: bool = True):
+        self.ingest_dir = Path(ingest_dir) if ingest_dir else None
+        self.prefer_installed = prefer_installed
+        self._ingest_packages: Optional[Dict[str, str]] = None
+
+    def _packages_distributions(self) -> Dict[str, List[str]]:
+        return _packages_distributions()
+
+    def installed(self, package: str) -> Optional[Dict]:
+        for name in self._packages_distributions().get(package, ()):
+            try:
+                dist = metadata.distribution(name)
+            except metadata.PackageNotFoundError:
+                continue
+            return {
+                "source": "installed",
+                "distribution": dist.metadata["Name"],
+                "version": dist.version,
+                "dist": dist,
+            }
+        return None
+
+    def _ingest_repos(self) -> List[Path]:
+        if self.ingest_dir is None or not self.ingest_dir.is_dir():
+            return []
+        return sorted(
+            path for path in self.ingest_dir.iterdir()
+            if _ingest_content(path) is not None
+        )
+
+    def _ingest_paths(self, repo: Path) -> Iterable[str]:
+        content = _ingest_content(repo)
+        if content.name == "manifest.json":
+            with open(content, encoding="utf-8") as f:
+                yield from (entry[0] for entry in json.load(f)["entries"])
+            return
+        with open(content, "rb") as f:
+            for line in f:
+                if line.startswith(b"FILE: "):
+                    yield line[len(b"FILE: "):].strip().decode("utf-8", "replace")
+
+    def _ingest_index(self) -> Dict[str, str]:
+        """仓库内容中顶级包名 -> 仓库目录，只读取文件路径"""
+        if self._ingest_packages is None:
+            index = {}
+            for repo in self._ingest_repos():
+                for rel_path in self._ingest_paths(repo):
+                    parts = rel_path.split("/")
+                    if parts[0] == "src":
+                        parts = parts[1:]
+                    if len(parts) == 2 and parts[1] == "__init__.py":
+                        index.setdefault(parts[0], str(repo))
+                    elif len(parts) == 1 and parts[0].endswith(".py"):
+                        index.setdefault(parts[0][:-3], str(repo))
+            self._ingest_packages = index
+        return self._ingest_packages
+
+    def ingested(self, package: str) -> Optional[Dict]:
+        # 先按仓库目录名匹配（导入名或发行版名，如 dotenv -> python-dotenv），再按仓库中的包目录匹配
+        names = {normalize_name(package)}
+        names.update(normalize_name(name) for name in self._packages_distributions().get(package, ()))
+        repo = None
+        for path in self._ingest_repos():
+            if normalize_name(path.name) in names:
+                repo = path
+                break
+        if repo is None and package in self._ingest_index():
+            repo = Path(self._ingest_index()[package])
+        if repo is None:
+            return None
+        return {
+            "source": "ingested",
+            "distribution": repo.name,
+            "version": _ingest_version(repo),
+            "path": str(_ingest_content(repo)),
+        }
+
+    def resolve(self, package: str) -> Optional[Dict]:
+        """
+        Returns:
+            {"source": "installed"/"ingested", "distribution", "version", ...}，找不到源码时返回None
+        """
+        lookups = (self.installed, self.ingested) if self.prefer_installed else (self.ingested, self.installed)
+        for lookup in lookups:
+            resolved = lookup(package)
+            if resolved is not None:
+                return resolved
+        return None
+
+
+def _ingest_content(repo: Path) -> Optional[Path]:
+    """导出仓库的内容文件：content.txt，或对象库模式下带 entries 的 manifest.json"""
+    if (repo / "content.txt").is_file():
+        return repo / "content.txt"
+    manifest = repo / "manifest.json"
+    try:
+        with open(manifest, encoding="utf-8") as f:
+            if "entries" in json.load(f):
+                return manifest
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _ingest_version(repo: Path) -> str:
+    """导出仓库的版本：summary.txt 中的提交，没有时用 content.txt 的大小与修改时间"""
+    try:
+        match = _COMMIT_LINE.search((repo / "summary.txt").read_text(encoding="utf-8"))
+    except (OSError, UnicodeDecodeError):
+        match = None
+    if match:
+        return f"git-{match.group(1)[:12]}"
+    stat = _ingest_content(repo).stat()
+    return "content-" + hashlib.sha1(f"{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()[:12]
+
+
+def own_module_names(rel_paths: Iterable[str]) -> Set[str]:
+    """源码自身模块的顶级名称（与 first_party_roots 相同的规则）"""
+    names = set()
+    for rel_path in rel_paths:
+        name = module_name(PurePosixPath(rel_path), strip_src=True)[0]
+        if name:
+            names.add(name.split(".")[0])
+    return names
+
+
+def summarize_dependencies(
+    imports_data: Dict, usage_data: Dict, exclude: Iterable[str] = ()
+) -> Dict[str, Dict]:
+    """
+    按顶级包汇总分析结果，去掉标准库与 exclude 中的名称
+
+    Returns:
+        {顶级包名: {"usage": 使用次数, "symbols": [符号...], "files": 导入它的文件数}}
+    """
+    exclude = set(exclude)
+    summary: Dict[str, Dict] = {}
+    for package, import_data in imports_data.items():
+        top_level = package.split(".")[0]
+        if top_level in exclude or top_level in sys.stdlib_module_names or not top_level:
+            continue
+        entry = summary.setdefault(top_level, {"usage": 0, "symbols": set(), "files": set()})
+        entry["files"].update(import_data.get("files", ()))
+    # 使用按顶级包读取：import a.b as x 的导入键为 a.b，x.f() 的使用记在 a 下
+    for package, usage in usage_data.items():
+        entry = summary.get(package.split(".")[0])
+        if entry is None:
+            continue
+        entry["usage"] += usage.get("total_usage", 0)
+        for kind in ("functions", "classes", "modules"):
+            entry["symbols"].update(usage.get(kind) or ())
+    return {
+        package: {
+            "usage": entry["usage"],
+            "symbols": sorted(entry["symbols"]),
+            "files": len(entry["files"]),
+        }
+        for package, entry in sorted(summary.items())
+    }
+
+
+class TransitiveAnalyzer:
+    """逐层分析依赖的源码，构建依赖使用树"""
+
+    def __init__(
+        self,
+        resolver: Optional[DependencyResolver] = None,
+        max_depth: int = 2,
+        use_cache: bool = True,
+        verbose: bool = False,
+    ):
+        self.resolver = resolver or DependencyResolver()
+        self.max_depth = max_depth
+        self.use_cache = use_cache
+        self.verbose = verbose
+        self._memo: Dict[str, Dict] = {}
+        self.cache_hits = 0
+        self.analyzed = 0
+
+    def _log(self, message: str):
+        if self.verbose:
+            print(message)
+
+    def _open(self, resolved: Dict) -> SourceProvider:
+        if resolved["source"] == "installed":
+            return DistributionProvider(resolved["dist"], _skip_dependency_path)
+        if resolved["path"].endswith("manifest.json"):
+            return BlobManifestProvider(resolved["path"], _skip_dependency_path)
+        return IngestProvider(resolved["path"], _skip_dependency_path)
+
+    def analyze_dependency(self, resolved: Dict) -> Dict:
+        """
+        分析一个依赖的源码，结果按 (发行版, 版本) 在进程内与磁盘上缓存
+
+        Returns:
+            {"distribution", "version", "source", "files": 分析的文件数,
+             "dependencies": summarize_dependencies 的结果}
+        """
+        key = f"{resolved['source']}-{normalize_name(resolved['distribution'])}-{resolved['version']}"
+        cache_name = re.sub(r"[^\w.+-]", "_", key) + ".json"
+        if key in self._memo:
+            return self._memo[key]
+
+        cached = load_json("transitive", cache_name) if self.use_cache else None
+        if cached and cached.get("version") == TRANSITIVE_CACHE_VERSION:
+            self.cache_hits += 1
+            self._memo[key] = cached["result"]
+            return cached["result"]
+
+        self._log(f"分析依赖源码: {resolved['distribution']} {resolved['version']}")
+        with tracer.span("transitive.analyze", "analyzer", package=resolved["distribution"]) as span:
+            with self._open(resolved) as source:
+                analyzer = ImportAnalyzer(source.root, verbose=False, source=source)
+                # 项目目录的忽略规则按子串匹配（如 env 会匹配 dotenv/），不适用于依赖的源码
+                analyzer.ignore_patterns = set()
+                imports_data, usage_data = analyzer.analyze_project()
+            rel_paths = analyzer.source_files
+            span.attrs["files"] = len(rel_paths)
+
+        result = {
+            "distribution": resolved["distribution"],
+            "version": resolved["version"],
+            "source": resolved["source"],
+            "files": len(rel_paths),
+            "dependencies": summarize_dependencies(
+                imports_data, usage_data, own_module_names(rel_paths)
+            ),
+        }
+        self.analyzed += 1
+        self._memo[key] = result
+        if self.use_cache:
+            save_json({"version": TRANSITIVE_CACHE_VERSION, "result": result}, "transitive", cache_name)
+        return result
+
+    def build(self, imports_data: Dict, usage_data: Dict, exclude: Iterable[str] = ()) -> List[Dict]:
+        """
+        从项目的分析结果出发构建依赖使用树
+
+        每个节点：{"package", "usage", "symbols", "files", "source", "distribution",
+        "version", "children"}；source 为None表示找不到源码。
+        同一个包在树中只展开一次，之后出现时 "repeated" 为True；
+        导入链回到祖先时 "cycle" 为True；达到 max_depth 的节点不再展开。
+        """
+        expanded: Set[str] = set()
+        direct = summarize_dependencies(imports_data, usage_data, exclude)
+        return [
+            self._node(package, entry, 1, (), expanded)
+            for package, entry in _by_usage(direct)
+        ]
+
+    def _node(self, package: str, entry: Dict, depth: int, ancestors: tuple, expanded: Set[str]) -> Dict:
+        node = {
+            "package": package,
+            "usage": entry["usage"],
+            "symbols": entry["symbols"],
+            "files": entry["files"],
+            "source": None,
+            "distribution": None,
+            "version": None,
+            "children": [],
+        }
+        resolved = self.resolver.resolve(package)
+        if resolved is None:
+            return node
+        node.update(
+            source=resolved["source"],
+            distribution=resolved["distribution"],
+            version=resolved["version"],
+        )
+
+        if package in ancestors:
+            node["cycle"] = True
+            return node
+        if depth > self.max_depth:
+            return node
+        if package in expanded:
+            node["repeated"] = True
+            return node
+        expanded.add(package)
+
+        dependencies = self.analyze_dependency(resolved)["dependencies"]
+        node["children"] = [
+            self._node(child, child_entry, depth + 1, ancestors + (package,), expanded)
+            for child, child_entry in _by_usage(dependencies)
+        ]
+        return node
+
+
+def _by_usage(dependencies: Dict[str, Dict]):
+    return sorted(dependencies.items(), key=lambda item: (-item[1]["usage"], item[0]))
+
+
+def iter_tree(nodes: List[Dict], depth: int = 0):
+    """深度优先遍历依赖树，产出 (深度, 节点)"""
+    for node in nodes:
+        yield depth, node
+        yield from iter_tree(node["children"], depth + 1)
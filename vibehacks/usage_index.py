@@ -0,0 +1,296 @@
+"""
+可查询的使用位置索引 - 基于SQLite保存每一处第三方符号使用的文件、行、列
+
+    index = UsageIndex("/path/to/project")
+    index.update()                                   # 只重新分析 mtime/size 变化的文件
+    index.occurrences("pandas", "DataFrame")         # pandas.DataFrame 的所有使用位置
+    index.importers("rich")                          # 导入了 rich 的文件
+
+默认数据库位于 <项目>/.vibehacks/usage.db。写入按文件批量进行并放在同一事务中，
+常用查询都有对应索引，十万文件规模的仓库上查询也只需毫秒级。
+"""
+
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .analyzer import ImportAnalyzer
+from .profiling import tracer
+
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS packages (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS symbols (
+    id INTEGER PRIMARY KEY,
+    package_id INTEGER NOT NULL REFERENCES packages(id),
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    UNIQUE (package_id, kind, name)
+);
+CREATE INDEX IF NOT EXISTS symbols_name ON symbols(name);
+CREATE TABLE IF NOT EXISTS file_imports (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    package_id INTEGER NOT NULL REFERENCES packages(id),
+    PRIMARY KEY (package_id, file_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS file_imports_file ON file_imports(file_id);
+CREATE TABLE IF NOT EXISTS occurrences (
+    symbol_id INTEGER NOT NULL REFERENCES symbols(id),
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    line INTEGER NOT NULL,
+    col INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS occurrences_symbol ON occurrences(symbol_id, file_id);
+CREATE INDEX IF NOT EXISTS occurrences_file ON occurrences(file_id);
+"""
+
+
+class UsageIndex:
+    """项目的使用位置索引，支持增量更新"""
+
+    def __init__(self, project_path: str, db_path: Optional[str] = None,
+                 analyzer: Optional[ImportAnalyzer] = None):
+        self.project_path = Path(project_path).resolve()
+        self.db_path = Path(db_path) if db_path else self.project_path / ".vibehacks" / "usage.db"
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.analyzer = analyzer or ImportAnalyzer(str(self.project_path), verbose=False)
+
+        self.conn = self._connect()
+        self._init_schema()
+
+        self._package_ids: Dict[str, int] = dict(
+            self.conn.execute("SELECT name, id FROM packages")
+        )
+        self._symbol_ids: Dict[Tuple[int, str, str], int] = {
+            (package_id, kind, name): symbol_id
+            for symbol_id, package_id, kind, name in self.conn.execute(
+                "SELECT id, package_id, kind, name FROM symbols"
+            )
+        }
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_path))
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def _init_schema(self):
+        version = None
+        try:
+            row = self.conn.execute(
+                "SELECT value FROM meta WHERE key = 'schema_version'"
+            ).fetchone()
+            version = int(row[0]) if row else None
+        except sqlite3.OperationalError:
+            pass
+
+        if version is not None and version != SCHEMA_VERSION:
+            # 结构变化时重建索引，索引内容可随时由源代码重新生成
+            self.conn.close()
+            self.db_path.unlink()
+            self.conn = self._connect()
+
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta(key, value) VALUES ('schema_version', ?)",
+                (str(SCHEMA_VERSION),),
+            )
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ------------------------------------------------------------------
+    # 更新
+    # ------------------------------------------------------------------
+
+    def _package_id(self, name: str) -> int:
+        package_id = self._package_ids.get(name)
+        if package_id is None:
+            package_id = self.conn.execute(
+                "INSERT INTO packages(name) VALUES (?)", (name,)
+            ).lastrowid
+            self._package_ids[name] = package_id
+        return package_id
+
+    def _symbol_id(self, package: str, kind: str, name: str) -> int:
+        package_id = self._package_id(package)
+        key = (package_id, kind, name)
+        symbol_id = self._symbol_ids.get(key)
+        if symbol_id is None:
+            symbol_id = self.conn.execute(
+                "INSERT INTO symbols(package_id, kind, name) VALUES (?, ?, ?)", key
+            ).lastrowid
+            self._symbol_ids[key] = symbol_id
+        return symbol_id
+
+    def _index_file(self, rel_path: str, path: Path, signature: Tuple[int, int]):
+        """重新分析单个文件并写入其导入与使用位置（调用方负责事务）"""
+        self.conn.execute("DELETE FROM files WHERE path = ?", (rel_path,))
+        file_id = self.conn.execute(
+            "INSERT INTO files(path, mtime_ns, size) VALUES (?, ?, ?)",
+            (rel_path, *signature),
+        ).lastrowid
+
+        with tracer.span("parse", "analyzer"):
+            tree = self.analyzer.parse_file(path)
+        if tree is None:
+            return
+
+        file_imports = self.analyzer.analyze_imports(path, tree)
+        self.conn.executemany(
+            "INSERT INTO file_imports(file_id, package_id) VALUES (?, ?)",
+            [(file_id, self._package_id(package)) for package in file_imports],
+        )
+
+        alias_to_original = self.analyzer.alias_map(file_imports)
+        self.conn.executemany(
+            "INSERT INTO occurrences(symbol_id, file_id, line, col) VALUES (?, ?, ?, ?)",
+            [
+                (self._symbol_id(package, kind, name), file_id, node.lineno, node.col_offset)
+                for package, kind, name, node in self.analyzer.iter_usage_sites(
+                    tree, alias_to_original
+                )
+            ],
+        )
+
+    def update(self) -> Dict[str, List[str]]:
+        """扫描项目，只重新索引新增或 mtime/size 变化的文件，并删除已不存在的文件"""
+        changes = {"added": [], "modified": [], "removed": []}
+        indexed = {
+            path: (mtime_ns, size)
+            for path, mtime_ns, size in self.conn.execute(
+                "SELECT path, mtime_ns, size FROM files"
+            )
+        }
+
+        with self.conn:
+            seen = set()
+            for path in self.analyzer.collect_python_files():
+                rel_path = str(path.relative_to(self.project_path))
+                seen.add(rel_path)
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                signature = (stat.st_mtime_ns, stat.st_size)
+                old = indexed.get(rel_path)
+                if old == signature:
+                    continue
+                self._index_file(rel_path, path, signature)
+                changes["modified" if old else "added"].append(rel_path)
+
+            removed = [path for path in indexed if path not in seen]
+            self.conn.executemany(
+                "DELETE FROM files WHERE path = ?", [(path,) for path in removed]
+            )
+            changes["removed"] = removed
+        return changes
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+
+    def occurrences(
+        self,
+        package: str,
+        name: Optional[str] = None,
+        kind: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Tuple[str, int, int, str, str]]:
+        """符号的使用位置，返回 (文件, 行, 列, 类别, 符号名)，按文件和行号排序"""
+        query = """
+            SELECT f.path, o.line, o.col, s.kind, s.name
+            FROM symbols s
+            JOIN packages p ON p.id = s.package_id
+            JOIN occurrences o ON o.symbol_id = s.id
+            JOIN files f ON f.id = o.file_id
+            WHERE p.name = ?
+        """
+        params = [package]
+        if name is not None:
+            query += " AND s.name = ?"
+            params.append(name)
+        if kind is not None:
+            query += " AND s.kind = ?"
+            params.append(kind)
+        query += " ORDER BY f.path, o.line, o.col"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        return self.conn.execute(query, params).fetchall()
+
+    def symbol_counts(self, package: str) -> List[Tuple[str, str, int, int]]:
+        """包中每个符号的 (类别, 符号名, 使用次数, 使用文件数)，按次数降序"""
+        return self.conn.execute(
+            """
+            SELECT s.kind, s.name, COUNT(*) AS uses, COUNT(DISTINCT o.file_id)
+            FROM symbols s
+            JOIN packages p ON p.id = s.package_id
+            JOIN occurrences o ON o.symbol_id = s.id
+            WHERE p.name = ?
+            GROUP BY s.id
+            ORDER BY uses DESC, s.name
+            """,
+            (package,),
+        ).fetchall()
+
+    def importers(self, package: str) -> List[str]:
+        """导入了指定包的文件"""
+        return [
+            row[0]
+            for row in self.conn.execute(
+                """
+                SELECT f.path
+                FROM file_imports i
+                JOIN packages p ON p.id = i.package_id
+                JOIN files f ON f.id = i.file_id
+                WHERE p.name = ?
+                ORDER BY f.path
+                """,
+                (package,),
+            )
+        ]
+
+    def file_occurrences(self, rel_path: str) -> List[Tuple[int, int, str, str, str]]:
+        """单个文件中的所有使用位置，返回 (行, 列, 包名, 类别, 符号名)"""
+        return self.conn.execute(
+            """
+            SELECT o.line, o.col, p.name, s.kind, s.name
+            FROM files f
+            JOIN occurrences o ON o.file_id = f.id
+            JOIN symbols s ON s.id = o.symbol_id
+            JOIN packages p ON p.id = s.package_id
+            WHERE f.path = ?
+            ORDER BY o.line, o.col
+            """,
+            (rel_path,),
+        ).fetchall()
+
+    def stats(self) -> Dict[str, int]:
+        """索引规模"""
+        return {
+            table: self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("files", "packages", "symbols", "occurrences")
+        }
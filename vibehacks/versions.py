@@ -0,0 +1,137 @@
+"""
+被分析项目的依赖版本 - 从项目自身的环境与声明中读取，而不是运行 vibehacks 的解释器
+
+    versions = project_versions("/path/to/project")
+    versions = import_versions(usage_data, versions)   # 导入名 -> 版本
+
+按以下顺序取第一个有结果的来源（同一发行版以先找到的为准）：
+1. 项目内的虚拟环境（.venv / venv / env 等含 pyvenv.cfg 的目录）中安装的发行版，
+   或调用方给出的 site-packages 路径（例如 --python 解释器的 sys.path）
+2. 锁文件 uv.lock / poetry.lock / pylock.toml 中解析出的版本
+3. requirements*.txt 与 pyproject.toml [project].dependencies 中的精确版本（== / ~= / ===）
+找不到版本的依赖不出现在结果中。
+"""
+
+import re
+import tomllib
+from importlib import metadata
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from .footprint import _top_level_names, normalize_name
+
+LOCK_FILES = ("uv.lock", "poetry.lock", "pylock.toml")
+
+_VENV_DIRS = (".venv", "venv", "env", ".env")
+_PIN = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)\s*(?:\[[^\]]*\])?\s*(?:==|~=|===)\s*([0-9][^\s,;#]*)")
+
+
+def _venv_site_packages(project: Path) -> List[str]:
+    paths = []
+    for name in _VENV_DIRS:
+        venv = project / name
+        if not (venv / "pyvenv.cfg").is_file():
+            continue
+        paths.extend(str(path) for path in sorted(venv.glob("lib/python*/site-packages")))
+        if (venv / "Lib" / "site-packages").is_dir():
+            paths.append(str(venv / "Lib" / "site-packages"))
+    return paths
+
+
+def _installed(paths: List[str]) -> Dict[str, Dict]:
+    """site-packages 中的发行版：规范名 -> {version, top_level}"""
+    installed = {}
+    for dist in metadata.distributions(path=paths):
+        name = dist.metadata["Name"]
+        if not name or normalize_name(name) in installed:
+            continue
+        installed[normalize_name(name)] = {
+            "version": dist.version,
+            "top_level": _top_level_names(dist, list(dist.files or ())),
+        }
+    return installed
+
+
+def _locked(project: Path) -> Dict[str, str]:
+    """锁文件中的 规范名 -> 版本"""
+    for name in LOCK_FILES:
+        try:
+            with open(project / name, "rb") as f:
+                data = tomllib.load(f)
+        except (OSError, tomllib.TOMLDecodeError):
+            continue
+        return {
+            normalize_name(package["name"]): str(package["version"])
+            for package in data.get("package", data.get("packages", []))
+            if package.get("name") and package.get("version")
+        }
+    return {}
+
+
+def _pinned(project: Path) -> Dict[str, str]:
+    """requirements 与 pyproject 中精确固定的 规范名 -> 版本"""
+    requirements = []
+    for path in sorted(project.glob("requirements*.txt")):
+        try:
+            requirements.extend(path.read_text(encoding="utf-8").splitlines())
+        except (OSError, UnicodeDecodeError):
+            continue
+    try:
+        with open(project / "pyproject.toml", "rb") as f:
+            requirements.extend(tomllib.load(f).get("project", {}).get("dependencies", []))
+    except (OSError, tomllib.TOMLDecodeError):
+        pass
+
+    pins = {}
+    for requirement in requirements:
+        match = _PIN.match(requirement)
+        if match:
+            pins.setdefault(normalize_name(match.group(1)), match.group(2))
+    return pins
+
+
+def project_versions(project_path: str, paths: Optional[Iterable[str]] = None) -> Dict[str, Dict]:
+    """
+    项目依赖的版本
+
+    Args:
+        project_path: 项目根目录
+        paths: 要读取的 site-packages 路径，默认使用项目内的虚拟环境
+
+    Returns:
+        规范化发行版名 -> {"version", "source": "installed"/"lock"/"pinned", "top_level": [...]}
+    """
+    project = Path(project_path)
+    versions = {}
+    site_packages = list(paths) if paths is not None else _venv_site_packages(project)
+    if site_packages:
+        for name, info in _installed(site_packages).items():
+            versions[name] = {"source": "installed", **info}
+    for source, found in (("lock", _locked(project)), ("pinned", _pinned(project))):
+        for name, version in found.items():
+            versions.setdefault(name, {"version": version, "source": source, "top_level": []})
+    return versions
+
+
+def import_versions(packages: Iterable[str], versions: Dict[str, Dict]) -> Dict[str, str]:
+    """
+    把导入名映射到项目中的版本
+
+    先按已安装发行版声明的顶级导入名匹配（如 yaml -> PyYAML），
+    再按规范化名称匹配（导入名与发行版名相同的常见情况）。
+    """
+    by_import = {}
+    for info in versions.values():
+        for top_level in info.get("top_level", ()):
+            by_import.setdefault(top_level, info["version"])
+
+    result = {}
+    for package in packages:
+        top_level = package.split(".")[0]
+        version = by_import.get(top_level)
+        if version is None:
+            info = versions.get(normalize_name(top_level))
+            version = info["version"] if info else None
+        if version is not None:
+            result[package] = version
+    return result
@@ -0,0 +1,219 @@
+"""
+文件监听 - 基于inotify（ctypes调用，无第三方依赖），不可用时退化为轮询
+
+    index = ProjectIndex(project_path)
+    index.refresh()
+    watch(index, on_change=lambda changes: ...)
+
+一连串保存会先去抖动合并，再只把变化的 .py 文件交给 ProjectIndex 增量更新。
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set
+
+from .index import ProjectIndex
+
+# <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = (
+    IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+)
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+# 返回该值表示无法确定具体变化，需要完整重新扫描
+RESCAN = None
+
+
+class InotifyWatcher:
+    """递归监听项目目录，返回发生变化的路径"""
+
+    def __init__(self, index: ProjectIndex):
+        self.index = index
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 失败")
+        self._dirs: Dict[int, Path] = {}
+        self.add_tree(index.project_path)
+
+    def _add_watch(self, directory: Path):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(str(directory)), WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            # ENOENT: 目录在添加监听前已被删除
+            if errno != 2:
+                raise OSError(errno, f"inotify_add_watch 失败: {directory}")
+            return
+        self._dirs[wd] = directory
+
+    def add_tree(self, root: Path):
+        """监听目录及其所有未被忽略的子目录"""
+        analyzer = self.index.analyzer
+        for current, dirnames, _ in os.walk(root):
+            current_path = Path(current)
+            if analyzer._should_ignore_path(current_path):
+                dirnames[:] = []
+                continue
+            self._add_watch(current_path)
+
+    def read(self, timeout: Optional[float]) -> Optional[Set[Path]]:
+        """等待事件，返回变化的路径集合；超时返回空集合，事件队列溢出返回 RESCAN"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        changed = set()
+        try:
+            buffer = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+
+        offset = 0
+        while offset < len(buffer):
+            wd, mask, _, name_len = _EVENT_HEADER.unpack_from(buffer, offset)
+            offset += _EVENT_HEADER.size
+            name = buffer[offset:offset + name_len].rstrip(b"\0")
+            offset += name_len
+
+            if mask & IN_Q_OVERFLOW:
+                return RESCAN
+            if mask & IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+
+            directory = self._dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = directory / os.fsdecode(name)
+            changed.add(path)
+            # 新建或移入的目录需要补充监听
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                try:
+                    self.add_tree(path)
+                except OSError:
+                    # 监听数超过 max_user_watches 上限，本批改为完整扫描
+                    return RESCAN
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """inotify不可用时的轮询实现，每次交给 ProjectIndex.refresh() 做 mtime/size 比较"""
+
+    def __init__(self, index: ProjectIndex, interval: float = 1.0):
+        self.index = index
+        self.interval = interval
+        self._next_scan = time.monotonic() + interval
+
+    def read(self, timeout: Optional[float]) -> Optional[Set[Path]]:
+        remaining = self._next_scan - time.monotonic()
+        if timeout is not None and remaining > timeout:
+            time.sleep(timeout)
+            return set()
+        time.sleep(max(0.0, remaining))
+        self._next_scan = time.monotonic() + self.interval
+        return RESCAN
+
+    def close(self):
+        pass
+
+
+def create_watcher(index: ProjectIndex, poll_interval: float = 1.0, use_inotify: bool = True):
+    """优先使用inotify，不支持的平台或监听数超限时退化为轮询"""
+    if use_inotify:
+        try:
+            return InotifyWatcher(index)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(index, poll_interval)
+
+
+def _expand_paths(index: ProjectIndex, paths: Set[Path]) -> List[Path]:
+    """目录事件展开为其中的 .py 文件，并包含已索引的、位于该目录下的文件（处理删除/移出）"""
+    expanded = set()
+    for path in paths:
+        if path.suffix == ".py":
+            expanded.add(path)
+            continue
+        if path.is_dir():
+            expanded.update(path.rglob("*.py"))
+        try:
+            prefix = str(path.relative_to(index.project_path)) + os.sep
+        except ValueError:
+            continue
+        expanded.update(
+            index.project_path / rel_path for rel_path in index.files if rel_path.startswith(prefix)
+        )
+    return sorted(expanded)
+
+
+def watch(
+    index: ProjectIndex,
+    on_change: Callable[[Dict[str, List[str]]], None],
+    debounce: float = 0.2,
+    poll_interval: float = 1.0,
+    use_inotify: bool = True,
+    stop_event: Optional[threading.Event] = None,
+):
+    """
+    监听项目并增量更新索引，每批变化处理完后调用 on_change(changes)
+
+    Args:
+        index: 已完成初次扫描的项目索引
+        on_change: 回调，参数为 {"added": [...], "modified": [...], "removed": [...]}
+        debounce: 最后一个事件之后等待的静默时间(秒)，用于合并连续保存
+        poll_interval: 轮询模式下的扫描间隔(秒)
+        use_inotify: 为False时强制使用轮询
+        stop_event: 设置后退出监听
+    """
+    watcher = create_watcher(index, poll_interval, use_inotify)
+    stop_event = stop_event or threading.Event()
+    try:
+        while not stop_event.is_set():
+            paths = watcher.read(timeout=0.5)
+            if paths is not RESCAN and not paths:
+                continue
+
+            # 去抖动：持续收集事件，直到静默 debounce 秒
+            rescan = paths is RESCAN
+            pending = set() if rescan else set(paths)
+            while not rescan:
+                more = watcher.read(timeout=debounce)
+                if more is RESCAN:
+                    rescan = True
+                elif more:
+                    pending |= more
+                else:
+                    break
+
+            if rescan:
+                changes = index.refresh()
+            else:
+                changes = index.update_paths(_expand_paths(index, pending))
+
+            if any(changes.values()):
+                on_change(changes)
+    finally:
+        watcher.close()